@@ -0,0 +1,187 @@
+import time
+import numpy as np
+
+DEFAULT_FPS = 60
+DEFAULT_SPRITE = "car.png"
+SPRITE_SIZE = (50, 30)
+MIN_SPRITE_HEIGHT = 4
+
+# Sprites compartidos: la imagen PIL escalada se guarda por tamaño y la PhotoImage por
+# intérprete de Tk, así car.png se abre y se escala una sola vez en todo el proceso
+_scaled_sprites = {}
+_photo_sprites = {}
+
+
+def scaled_sprite(path=DEFAULT_SPRITE, size=SPRITE_SIZE):
+    # Solo PIL: se puede llamar desde un hilo de trabajo
+    key = (path, tuple(size))
+    image = _scaled_sprites.get(key)
+    if image is None:
+        from PIL import Image
+
+        with Image.open(path) as source:
+            image = _scaled_sprites[key] = source.resize(tuple(size))
+    return image
+
+
+def sprite(widget, path=DEFAULT_SPRITE, size=SPRITE_SIZE):
+    # PhotoImage compartida por todos los ítems del mismo intérprete de Tk (hilo de Tk)
+    key = (id(widget.tk), path, tuple(size))
+    photo = _photo_sprites.get(key)
+    if photo is None:
+        from PIL import ImageTk
+
+        photo = _photo_sprites[key] = ImageTk.PhotoImage(scaled_sprite(path, size), master=widget)
+    return photo
+
+
+def to_pixels(positions, width, margin=0):
+    # Escala las posiciones (m) al ancho disponible del lienzo (px); la escala es común a todos los cuerpos
+    positions = np.asarray(positions, dtype=float)
+    # NaN o infinito no tienen píxel: convertirlos a int32 daría basura
+    if not np.isfinite(positions).all():
+        raise ValueError("La trayectoria tiene posiciones no finitas (fuera del intervalo calculado)")
+    low = positions.min()
+    span = positions.max() - low
+    if span == 0:
+        return np.full(positions.shape, float(margin))
+    return margin + (positions - low) / span * (width - 2 * margin)
+
+
+class FleetAnimation:
+    # Animación con paso de tiempo fijo programada con root.after, para uno o varios cuerpos.
+    # Las posiciones de todos los cuadros y cuerpos se calculan de una vez en un arreglo
+    # (cuadros, cuerpos) de píxeles enteros; en cada cuadro solo se mueven los ítems cuya
+    # posición cambió. Si un cuadro llega tarde se salta al que corresponde según el reloj.
+    def __init__(self, root, canvas, fps=DEFAULT_FPS, sprite_width=SPRITE_SIZE[0], sprite_path=DEFAULT_SPRITE):
+        self.root = root
+        self.canvas = canvas
+        self.fps = fps
+        self.sprite_width = sprite_width
+        self.sprite_path = sprite_path
+        self.items = []
+        self.lanes = []
+        self.frames = None
+        self.frames_drawn = 0
+        self.frames_dropped = 0
+        self.item_updates = 0
+        self._drawn = None
+        self._after_id = None
+        self._started_at = None
+        self._finished_at = None
+        self._last_frame = -1
+        self._on_finish = None
+
+    def show(self, count):
+        # Un carril por cuerpo; los ítems se reutilizan entre carreras y los sobrantes se ocultan
+        height = int(self.canvas.cget("height"))
+        lane = height / count
+        sprite_height = int(max(MIN_SPRITE_HEIGHT, min(SPRITE_SIZE[1], lane - 2)))
+        size = (round(sprite_height * SPRITE_SIZE[0] / SPRITE_SIZE[1]), sprite_height)
+        image = sprite(self.canvas, self.sprite_path, size)
+        self.sprite_width = size[0]
+
+        while len(self.items) < count:
+            self.items.append(self.canvas.create_image(0, 0, anchor="nw", image=image))
+        for index, item in enumerate(self.items):
+            if index < count:
+                self.canvas.itemconfig(item, image=image, state="normal")
+            else:
+                self.canvas.itemconfig(item, state="hidden")
+        self.lanes = [int(index * lane + (lane - sprite_height) / 2) for index in range(count)]
+        self._drawn = None
+
+    @property
+    def bodies(self):
+        return len(self.lanes)
+
+    def start(self, position_func, duration, t_start=0.0, on_finish=None):
+        # position_func(tiempos) devuelve (cuadros,) o (cuadros, cuerpos)
+        self.stop()
+        if duration <= 0:
+            raise ValueError("La duración de la animación debe ser positiva")
+
+        frame_count = max(2, int(round(duration * self.fps)) + 1)
+        # El redondeo puede dejar el último cuadro después del final: se recorta a t_start + duration
+        # (una trayectoria integrada justo hasta ese instante no tiene datos más allá)
+        times = np.minimum(t_start + np.arange(frame_count) / self.fps, t_start + duration)
+        width = int(self.canvas.cget("width")) - self.sprite_width
+        positions = np.asarray(position_func(times), dtype=float).reshape(frame_count, -1)
+        if positions.shape[1] != self.bodies:
+            raise ValueError(f"Se esperaban {self.bodies} trayectorias y llegaron {positions.shape[1]}")
+        self.frames = np.rint(to_pixels(positions, width)).astype(np.int32)
+
+        self.frames_drawn = 0
+        self.frames_dropped = 0
+        self.item_updates = 0
+        self._drawn = None
+        self._last_frame = -1
+        self._on_finish = on_finish
+        self._finished_at = None
+        self._started_at = time.perf_counter()
+        self._tick()
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    @property
+    def running(self):
+        return self._after_id is not None
+
+    def achieved_fps(self):
+        if self._started_at is None or self.frames_drawn == 0:
+            return 0.0
+        end = self._finished_at if self._finished_at is not None else time.perf_counter()
+        elapsed = end - self._started_at
+        return self.frames_drawn / elapsed if elapsed > 0 else 0.0
+
+    def _draw(self, row):
+        # Solo los cuerpos que cambiaron de píxel generan una llamada a Tk
+        if self._drawn is None:
+            changed = range(len(row))
+        else:
+            changed = np.flatnonzero(row != self._drawn)
+        for index in changed:
+            self.canvas.coords(self.items[index], int(row[index]), self.lanes[index])
+        self.item_updates += len(changed)
+        self._drawn = row
+
+    def _tick(self):
+        self._after_id = None
+        elapsed = time.perf_counter() - self._started_at
+        frame = min(int(elapsed * self.fps), len(self.frames) - 1)
+
+        if frame != self._last_frame:
+            self.frames_dropped += max(0, frame - self._last_frame - 1)
+            self._draw(self.frames[frame])
+            self.frames_drawn += 1
+            self._last_frame = frame
+
+        if frame >= len(self.frames) - 1:
+            self._finished_at = time.perf_counter()
+            if self._on_finish is not None:
+                self._on_finish(self)
+            return
+
+        # Próximo cuadro según el reloj real, no según el retraso acumulado
+        delay = (frame + 1) / self.fps - (time.perf_counter() - self._started_at)
+        self._after_id = self.root.after(max(1, int(delay * 1000)), self._tick)
+
+
+class CarAnimation(FleetAnimation):
+    # Un solo auto en una altura fija; el ítem lo crea la aplicación
+    def __init__(self, root, canvas, item, fps=DEFAULT_FPS, y=50, sprite_width=SPRITE_SIZE[0]):
+        super().__init__(root, canvas, fps, sprite_width)
+        self.items = [item]
+        self.lanes = [y]
+
+    @property
+    def item(self):
+        return self.items[0]
+
+    @item.setter
+    def item(self, item):
+        self.items = [item]
+        self._drawn = None
@@ -0,0 +1,85 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundRunner:
+    # Ejecuta cálculos fuera del hilo de Tk y entrega los resultados con root.after.
+    # Cada tarea tiene una clave; una nueva tarea con la misma clave deja obsoleta la anterior.
+    def __init__(self, root, poll_ms=15, max_workers=1):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mruv-worker")
+        self._results = queue.Queue()
+        self._generations = {}
+        self._futures = {}
+        self._pending = 0
+        self._poll_id = None
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, on_done, on_error=None, *args, **kwargs):
+        with self._lock:
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+
+        # Si la tarea anterior aún no empezó, se descarta directamente
+        previous = self._futures.get(key)
+        if previous is not None:
+            previous.cancel()
+
+        future = self._executor.submit(func, *args, **kwargs)
+        self._futures[key] = future
+        self._pending += 1
+        future.add_done_callback(
+            lambda f: self._results.put((key, generation, f, on_done, on_error))
+        )
+        self._schedule_poll()
+        return generation
+
+    def cancel(self, key):
+        # Los resultados que lleguen después para esta clave se ignoran
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+        future = self._futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def is_current(self, key, generation):
+        with self._lock:
+            return self._generations.get(key) == generation
+
+    def _schedule_poll(self):
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        # Se ejecuta en el hilo de Tk: aquí es seguro tocar widgets
+        self._poll_id = None
+        try:
+            while True:
+                try:
+                    key, generation, future, on_done, on_error = self._results.get_nowait()
+                except queue.Empty:
+                    break
+
+                self._pending -= 1
+                if future.cancelled() or not self.is_current(key, generation):
+                    continue
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+
+                error = future.exception()
+                if error is None:
+                    on_done(future.result())
+                elif on_error is not None:
+                    on_error(error)
+        finally:
+            # Aunque un callback falle, los demás resultados se siguen entregando
+            if self._pending > 0:
+                self._schedule_poll()
+
+    def shutdown(self):
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
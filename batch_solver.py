@@ -0,0 +1,244 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import numpy as np
+import kinematics
+import trajectory_file
+
+# Campos de entrada que necesita cada fórmula (mismos nombres que la interfaz)
+REQUIRED_FIELDS = {
+    "position": ("x0", "v0", "a", "time"),
+    "velocity": ("v0", "a", "time"),
+    "acceleration": ("a",),
+}
+
+OUTPUT_FIELDS = (
+    "formula", "x0", "v0", "a", "time",
+    "position", "velocity", "acceleration",
+    "position_formula", "velocity_formula",
+)
+
+DEFAULT_BATCH_SIZE = 10_000
+
+
+def build_entry(formula, x0, v0, a, t_val, pos, vel):
+    # Entrada de historial con el mismo formato que MRUVApp.calculate
+    if formula == "position":
+        return {
+            "formula": "position",
+            "position_formula": kinematics.format_position(x0, v0, a),
+            "velocity_formula": kinematics.format_velocity(v0, a),
+            "time": t_val,
+            "position": pos,
+            "velocity": vel
+        }
+    if formula == "velocity":
+        return {
+            "formula": "velocity",
+            "velocity_formula": kinematics.format_velocity(v0, a),
+            "time": t_val,
+            "velocity": vel
+        }
+    if formula == "acceleration":
+        return {
+            "formula": "acceleration",
+            "acceleration": a
+        }
+    raise ValueError(f"Fórmula desconocida: {formula}")
+
+
+def format_result(entry):
+    # Texto de resultados que muestra la aplicación
+    formula = entry["formula"]
+    if formula == "position":
+        t_val = entry["time"]
+        return (
+            f"Fórmula de posición: s(t) = {entry['position_formula']}\n"
+            f"Fórmula de velocidad: v(t) = {entry['velocity_formula']}\n"
+            f"\nResultados:\n"
+            f"Posición en t={t_val}: {entry['position']:.2f} m\n"
+            f"Velocidad en t={t_val}: {entry['velocity']:.2f} m/s\n"
+        )
+    if formula == "velocity":
+        t_val = entry["time"]
+        return (
+            f"Fórmula de velocidad: v(t) = {entry['velocity_formula']}\n"
+            f"\nResultados:\n"
+            f"Velocidad en t={t_val}: {entry['velocity']:.2f} m/s\n"
+        )
+    return f"La aceleración es constante y su valor es: {entry['acceleration']:.2f} m/s²"
+
+
+def solve_entry(formula, x0=0.0, v0=0.0, a=0.0, t_val=0.0):
+    # Cálculo de un único conjunto de parámetros, sin interfaz gráfica
+    pos = kinematics.position(x0, v0, a, t_val)
+    vel = kinematics.velocity(v0, a, t_val)
+    entry = build_entry(formula, x0, v0, a, t_val, pos, vel)
+    return entry, format_result(entry)
+
+
+def solve_batch(formulas, x0, v0, a, t_vals):
+    # Evalúa un lote completo con operaciones vectorizadas de NumPy
+    x0 = np.asarray(x0, dtype=float)
+    v0 = np.asarray(v0, dtype=float)
+    a = np.asarray(a, dtype=float)
+    t_vals = np.asarray(t_vals, dtype=float)
+
+    positions = kinematics.position(x0, v0, a, t_vals).tolist()
+    velocities = kinematics.velocity(v0, a, t_vals).tolist()
+
+    columns = zip(formulas, x0.tolist(), v0.tolist(), a.tolist(), t_vals.tolist(), positions, velocities)
+    return [build_entry(*row) for row in columns]
+
+
+def _parse_row(row, line_number):
+    # Una línea JSON válida que no es un objeto (p. ej. [1, 2] o 3) es una fila inválida más
+    if not isinstance(row, dict):
+        raise ValueError(f"Fila {line_number}: se esperaba un objeto y llegó {type(row).__name__}")
+    formula = row.get("formula") or "position"
+    if not isinstance(formula, str):
+        raise ValueError(f"Fila {line_number}: la fórmula debe ser texto: {formula!r}")
+    formula = formula.strip()
+    if formula not in REQUIRED_FIELDS:
+        raise ValueError(f"Fila {line_number}: fórmula desconocida '{formula}'")
+
+    values = []
+    for field in ("x0", "v0", "a", "time"):
+        value = row.get(field)
+        if value is None or value == "":
+            if field in REQUIRED_FIELDS[formula]:
+                raise ValueError(f"Fila {line_number}: falta el campo '{field}'")
+            value = 0.0
+        try:
+            values.append(float(value))
+        except (TypeError, ValueError):
+            raise ValueError(f"Fila {line_number}: valor no numérico en '{field}': {value!r}")
+    return formula, values
+
+
+def read_rows(path, file_format):
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        if file_format == "csv":
+            for line_number, row in enumerate(csv.DictReader(file), start=2):
+                yield _parse_row(row, line_number)
+        else:
+            for line_number, line in enumerate(file, start=1):
+                if line.strip():
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        raise ValueError(f"Fila {line_number}: JSON inválido: {e}")
+                    yield _parse_row(row, line_number)
+
+
+def read_batches(path, file_format, batch_size=DEFAULT_BATCH_SIZE):
+    formulas = []
+    params = []
+    for formula, values in read_rows(path, file_format):
+        formulas.append(formula)
+        params.append(values)
+        if len(formulas) >= batch_size:
+            yield formulas, np.array(params, dtype=float)
+            formulas, params = [], []
+    if formulas:
+        yield formulas, np.array(params, dtype=float)
+
+
+def write_batch(file, writer, entries, params, file_format):
+    # Cada fila de salida incluye los parámetros de entrada junto al resultado
+    for entry, (x0, v0, a, t_val) in zip(entries, params.tolist()):
+        row = {"formula": entry["formula"], "x0": x0, "v0": v0, "a": a, "time": t_val}
+        row.update(entry)
+        if file_format == "csv":
+            writer.writerow(row)
+        else:
+            file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def detect_format(path, explicit=None):
+    if explicit:
+        return explicit
+    extension = os.path.splitext(path)[1].lower()
+    return "csv" if extension == ".csv" else "jsonl"
+
+
+def run(input_path, output_path, input_format=None, output_format=None, batch_size=DEFAULT_BATCH_SIZE):
+    input_format = detect_format(input_path, input_format)
+    output_format = detect_format(output_path, output_format)
+
+    total = 0
+    with open(output_path, "w", encoding="utf-8", newline="") as file:
+        writer = None
+        if output_format == "csv":
+            writer = csv.DictWriter(file, fieldnames=OUTPUT_FIELDS, restval="")
+            writer.writeheader()
+
+        for formulas, params in read_batches(input_path, input_format, batch_size):
+            entries = solve_batch(formulas, *params.T)
+            write_batch(file, writer, entries, params, output_format)
+            total += len(entries)
+    return total
+
+
+def write_trajectories(input_path, output_path, input_format=None, t_end=10.0,
+                       samples=trajectory_file.DEFAULT_SAMPLES, batch_size=DEFAULT_BATCH_SIZE):
+    # Una trayectoria completa en [0, t_end] por fila de entrada, en formato binario mapeable.
+    # Primero se cuentan las filas para reservar el archivo; luego se escribe lote a lote.
+    input_format = detect_format(input_path, input_format)
+    total = sum(1 for _ in read_rows(input_path, input_format))
+    if not total:
+        raise ValueError("El archivo de entrada no tiene filas")
+
+    output = trajectory_file.TrajectoryFile.create(
+        output_path, np.linspace(0.0, t_end, samples), total, {"model": "constant", "source": os.path.basename(input_path)}
+    )
+    start = 0
+    for _, params in read_batches(input_path, input_format, batch_size):
+        x0, v0, a, _ = params.T
+        output.write_kinematics(start, x0, v0, a)
+        start += len(params)
+    output.flush()
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolución por lotes de problemas MRUV sin interfaz gráfica")
+    parser.add_argument("input", help="Archivo CSV o JSONL con columnas formula, x0, v0, a, time")
+    parser.add_argument("output", help="Archivo de resultados (CSV o JSONL)")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"))
+    parser.add_argument("--output-format", choices=("csv", "jsonl"))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--trajectories", help="Guardar además la trayectoria de cada fila en este archivo binario (.mrtj)")
+    parser.add_argument("--t-end", type=float, default=10.0, help="Tiempo final de las trayectorias")
+    parser.add_argument("--samples", type=int, default=trajectory_file.DEFAULT_SAMPLES, help="Muestras por trayectoria")
+    args = parser.parse_args(argv)
+
+    if args.batch_size < 1:
+        parser.error("--batch-size debe ser mayor que 0")
+    if args.trajectories and (args.t_end <= 0 or args.samples < 2):
+        parser.error("--t-end debe ser positivo y --samples al menos 2")
+
+    try:
+        total = run(args.input, args.output, args.input_format, args.output_format, args.batch_size)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{total} filas procesadas -> {args.output}")
+
+    if args.trajectories:
+        try:
+            total = write_trajectories(
+                args.input, args.trajectories, args.input_format, args.t_end, args.samples, args.batch_size
+            )
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        print(f"{total} trayectorias -> {args.trajectories}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
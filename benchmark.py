@@ -0,0 +1,393 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+# Banco de pruebas sin ventana: mide lo que cuesta cada parte de un clic en MRUVApp.
+# Uso: python benchmark.py [--filter texto] [--save-baseline] [--baseline archivo]
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_TOLERANCE = 0.25        # Regresión si p50 empeora más de un 25 %
+MIN_REGRESSION_MS = 0.05        # Diferencias menores se consideran ruido
+
+HISTORY_SIZES = (1_000, 10_000, 100_000)
+HISTORY_ENTRY = {
+    "formula": "position",
+    "position_formula": "2.0*t**2 + 3.0*t + 1.0",
+    "velocity_formula": "4.0*t + 3.0",
+    "time": 2.0,
+    "position": 15.0,
+    "velocity": 11.0,
+}
+
+# Cada caso es (nombre, repeticiones, preparación); la preparación devuelve la función a medir
+CASES = []
+
+
+def case(name, repeat=50):
+    def register(setup):
+        CASES.append((name, repeat, setup))
+        return setup
+    return register
+
+
+# --- Ruta simbólica (diff / solve / integrate / lambdify como en prueba2) ---
+
+def _symbolic_problem():
+    from sympy import symbols, diff, solve, integrate, lambdify
+
+    def run():
+        t = symbols("t")
+        position_eq = -4.9 * t**2 + 30 * t + 10
+        velocity_eq = diff(position_eq, t)
+        solve(velocity_eq, t)
+        integrate(velocity_eq, t)
+        lambdify(t, position_eq, "numpy")
+        lambdify(t, velocity_eq, "numpy")
+    return run
+
+
+@case("symbolic.sympy_directo", repeat=20)
+def symbolic_uncached():
+    return _symbolic_problem()
+
+
+@case("symbolic.problems_cold", repeat=20)
+def symbolic_cold():
+    import problems
+    from expr_cache import expression_cache
+
+    def run():
+        expression_cache.invalidate()
+        problems.invalidate()
+        for problem in problems.PROBLEMS:
+            problems.solve(problem)
+    return run
+
+
+@case("symbolic.problems_cached", repeat=50)
+def symbolic_cached():
+    import problems
+
+    for problem in problems.PROBLEMS:
+        problems.solve(problem)
+    return lambda: [problems.solve(problem) for problem in problems.PROBLEMS]
+
+
+@case("symbolic.problems_exact", repeat=20)
+def symbolic_exact():
+    import problems
+    import precision
+
+    return lambda: [problems.solve(problem, precision.EXACT) for problem in problems.PROBLEMS]
+
+
+# --- Muestreo de plot_graph: punto a punto frente a vectorizado ---
+
+def _position_func():
+    from sympy import symbols
+    from expr_cache import expression_cache
+
+    t = symbols("t")
+    return expression_cache.get(-4.9 * t**2 + 30 * t + 10).func
+
+
+@case("sampling.por_punto", repeat=10)
+def sampling_per_point():
+    from sampling import SamplingEngine
+
+    func = _position_func()
+    t_vals = SamplingEngine().time_grid()
+    return lambda: [func(float(value)) for value in t_vals]
+
+
+@case("sampling.vectorizado", repeat=200)
+def sampling_vectorized():
+    from sampling import SamplingEngine
+
+    func = _position_func()
+    sampler = SamplingEngine()
+    return lambda: sampler.sample(func)
+
+
+@case("sampling.vectorizado_1M", repeat=20)
+def sampling_vectorized_large():
+    from sampling import SamplingEngine, MAX_SAMPLES
+
+    func = _position_func()
+    sampler = SamplingEngine(samples=MAX_SAMPLES)
+    return lambda: sampler.sample(func)
+
+
+@case("sampling.adaptativo", repeat=100)
+def sampling_adaptive():
+    from sampling import SamplingEngine
+
+    func = _position_func()
+    sampler = SamplingEngine(adaptive=True)
+    return lambda: sampler.sample_curves([func])
+
+
+# --- Estado cinemático completo (s, v, a) sobre 1M de muestras: tres funciones frente a un núcleo ---
+
+def _kinematic_expression():
+    from sympy import symbols, sin, exp
+
+    t = symbols("t")
+    return sin(3 * t) * exp(-t / 4) + 2 * t**2
+
+
+@case("sampling.estado_separado_1M", repeat=20)
+def state_separate():
+    from sampling import SamplingEngine, MAX_SAMPLES
+    from expr_cache import expression_cache
+
+    entry = expression_cache.get(_kinematic_expression())
+    velocity = expression_cache.get(entry.derivative)
+    funcs = (entry.func, velocity.func, expression_cache.get(velocity.derivative).func)
+    t_vals = SamplingEngine(samples=MAX_SAMPLES).time_grid()
+    return lambda: [func(t_vals) for func in funcs]
+
+
+@case("sampling.estado_fusionado_1M", repeat=20)
+def state_fused():
+    from sampling import SamplingEngine, MAX_SAMPLES
+    from expr_cache import expression_cache
+
+    state = expression_cache.get(_kinematic_expression()).state
+    t_vals = SamplingEngine(samples=MAX_SAMPLES).time_grid()
+    return lambda: state(t_vals)
+
+
+# --- Raíces de v(t) y extremos: sympy.solve por problema contra poly_roots en lote ---
+
+def _cubic_coefficients(count):
+    # Enteros: con coeficientes float sympy.solve es mucho más lento y la comparación no sería justa
+    rng = np.random.default_rng(0)
+    return rng.integers(-9, 10, size=(count, 4)).astype(float)
+
+
+@case("raices.sympy_20", repeat=5)
+def roots_sympy():
+    from sympy import Poly, diff, solve
+    from expr_cache import t
+
+    exprs = [Poly([int(c) for c in row], t).as_expr() for row in _cubic_coefficients(20)]
+    return lambda: [solve(diff(expr, t), t) for expr in exprs]
+
+
+@case("raices.lote_10000", repeat=50)
+def roots_batch():
+    import poly_roots
+
+    coeffs = _cubic_coefficients(10_000)
+    return lambda: poly_roots.extrema(coeffs)
+
+
+# --- Integración numérica (aceleración no constante) ---
+
+@case("ode.rk45_arrastre", repeat=50)
+def ode_single():
+    import ode
+
+    return lambda: ode.solve_model(ode.DRAG, 0.0, 20.0, -9.8, 0.05, 0.0, 5.0)
+
+
+@case("ode.rk45_lote_10000", repeat=20)
+def ode_batch():
+    import ode
+
+    x0 = np.linspace(-10.0, 10.0, 10_000)
+    return lambda: ode.solve_model(ode.SPRING, x0, 0.0, 0.0, 4.0, 0.0, 5.0)
+
+
+# --- Dibujo de la figura (backend Agg, sin Tk) ---
+
+def _agg_plot():
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from plotting import IncrementalPlot
+    from sampling import SamplingEngine
+
+    figure = Figure(figsize=(5, 4), dpi=100)
+    canvas = FigureCanvasAgg(figure)
+    plot = IncrementalPlot(figure.add_subplot(111), canvas)
+    t_vals = SamplingEngine().time_grid()
+    return canvas, plot, t_vals
+
+
+@case("render.curvas_nuevas", repeat=30)
+def render_full():
+    canvas, plot, t_vals = _agg_plot()
+    state = {"a": 1.0}
+
+    def run():
+        state["a"] += 0.1
+        plot.update({
+            "t": t_vals,
+            "position": 0.5 * state["a"] * t_vals**2,
+            "velocity": state["a"] * t_vals,
+            "highlight_t": None,
+        })
+        canvas.draw()
+    return run
+
+
+@case("render.solo_marcador", repeat=100)
+def render_blit():
+    canvas, plot, t_vals = _agg_plot()
+    position = 0.5 * t_vals**2
+    velocity = t_vals.copy()
+    plot.update({"t": t_vals, "position": position, "velocity": velocity, "highlight_t": None})
+    canvas.draw()
+    state = {"t": 0.0}
+
+    def run():
+        state["t"] = (state["t"] + 0.1) % 5
+        plot.update({
+            "t": t_vals,
+            "position": position,
+            "velocity": velocity,
+            "highlight_t": state["t"],
+            "position_highlight": 0.5 * state["t"] ** 2,
+            "velocity_highlight": state["t"],
+        })
+    return run
+
+
+# --- save_history con historiales cada vez más grandes ---
+
+def _history_case(size):
+    def setup():
+        from history_store import HistoryStore
+
+        # El directorio temporal vive mientras la función medida lo referencie
+        directory = tempfile.TemporaryDirectory(prefix="mruv-bench-")
+        path = os.path.join(directory.name, "history.jsonl")
+        line = json.dumps(HISTORY_ENTRY, ensure_ascii=False) + "\n"
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(line * size)
+        store = HistoryStore(path, legacy_path=None)
+        return lambda directory=directory: store.append(HISTORY_ENTRY)
+    return setup
+
+
+for _size in HISTORY_SIZES:
+    case(f"history.append_{_size}", repeat=200)(_history_case(_size))
+
+
+# --- Arranque (en un proceso nuevo para no contar módulos ya cargados) ---
+
+def _startup_case(code):
+    def setup():
+        command = [sys.executable, "-c", code]
+        cwd = os.path.dirname(os.path.abspath(__file__))
+        return lambda: subprocess.run(command, cwd=cwd, check=True, capture_output=True)
+    return setup
+
+
+case("startup.importar_app", repeat=5)(_startup_case("import prueba2, prueba3, prueba4"))
+case("startup.precarga", repeat=5)(_startup_case("from startup import warm_up; warm_up()"))
+
+
+def measure(func, repeat, warmup=1):
+    for _ in range(warmup):
+        func()
+
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings[i] = time.perf_counter() - started
+
+    # La memoria se mide en una ejecución aparte: tracemalloc distorsiona los tiempos
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "repeat": repeat,
+        "p50_ms": float(np.percentile(timings, 50) * 1000),
+        "p99_ms": float(np.percentile(timings, 99) * 1000),
+        "mean_ms": float(timings.mean() * 1000),
+        "peak_kb": peak / 1024,
+    }
+
+
+def run(name_filter=None, repeat=None):
+    results = {}
+    for name, default_repeat, setup in CASES:
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = measure(setup(), repeat or default_repeat)
+        print(format_row(name, results[name]), file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    # Casos cuyo p50 empeoró respecto a la línea base
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        limit = previous["p50_ms"] * (1 + tolerance)
+        if result["p50_ms"] > limit and result["p50_ms"] - previous["p50_ms"] > MIN_REGRESSION_MS:
+            regressions.append((name, previous["p50_ms"], result["p50_ms"]))
+    return regressions
+
+
+def format_row(name, result):
+    return (
+        f"{name:<32} p50 {result['p50_ms']:10.3f} ms   p99 {result['p99_ms']:10.3f} ms   "
+        f"memoria {result['peak_kb']:10.1f} KB"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banco de pruebas de MRUVApp (sin ventana)")
+    parser.add_argument("--filter", help="Solo los casos cuyo nombre contiene este texto")
+    parser.add_argument("--repeat", type=int, help="Repeticiones por caso (por defecto, las de cada caso)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Archivo JSON con la línea base")
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar los resultados como línea base")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, args.repeat)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=4)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as file:
+                baseline = json.load(file)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(baseline, file, indent=4)
+        print(f"Línea base guardada en {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, args.tolerance)
+    for name, previous, current in regressions:
+        print(f"REGRESIÓN {name}: {previous:.3f} ms -> {current:.3f} ms", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
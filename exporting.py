@@ -0,0 +1,167 @@
+import os
+import threading
+import tkinter as tk
+from tkinter import ttk
+import numpy as np
+import kinematics
+from instrumentation import span
+
+# Exportaciones en segundo plano: el trabajador informa el avance en un ExportProgress
+# y el hilo de Tk lo consulta periódicamente para actualizar la barra de progreso.
+
+FIGURE_FORMATS = ("png", "svg", "pdf")
+FIGURE_SAMPLES = 400
+PROGRESS_MS = 100
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class ExportProgress:
+    # Estado compartido: el trabajador escribe y el hilo de Tk solo lee
+    def __init__(self):
+        self.done = 0
+        self.total = 0
+        self.message = ""
+        self._cancel = threading.Event()
+
+    def start(self, total, message=""):
+        self.check()
+        self.done = 0
+        self.total = total
+        self.message = message
+
+    def advance(self, amount=1):
+        # Cada avance es también un punto de cancelación
+        self.check()
+        self.done += amount
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise ExportCancelled()
+
+    def fraction(self):
+        return min(self.done / self.total, 1.0) if self.total else 0.0
+
+
+def render_plot(plot_data, file_path, style=None, sweeps=()):
+    # Figura nueva con backend Agg: se puede generar en el trabajador sin tocar la de Tk
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from plotting import IncrementalPlot, ComparisonPlot
+
+    figure = Figure(figsize=(5, 4), dpi=100)
+    canvas = FigureCanvasAgg(figure)
+    # En la exportación solo dibuja savefig
+    canvas.draw_idle = lambda *args, **kwargs: None
+    plot = IncrementalPlot(figure.add_subplot(111), canvas, **(style or {}))
+    if sweeps:
+        comparison = ComparisonPlot(plot)
+        for sweep in sweeps:
+            comparison.add(*sweep)
+    plot.update(plot_data)
+    plot.save(file_path)
+
+
+def entry_plot_data(entry, t_vals):
+    # Datos del gráfico de una entrada del historial (None si no hay curvas que dibujar)
+    from sympy import sympify
+    from sampling import as_numeric
+
+    formula = entry.get("formula")
+    if formula not in ("position", "velocity"):
+        return None
+
+    highlight_t = entry.get("time")
+    plot_data = {"t": t_vals, "position": None, "velocity": None, "highlight_t": highlight_t}
+    if formula == "position":
+        # Las fórmulas del historial son el MRUV estándar: núcleo cerrado de kinematics
+        curves = zip(("position", "velocity"), kinematics.motion_functions(sympify(entry["position_formula"])))
+    else:
+        curves = [("velocity", as_numeric(sympify(entry["velocity_formula"])))]
+
+    for name, func in curves:
+        plot_data[name] = func(t_vals)
+        if highlight_t is not None:
+            plot_data[f"{name}_highlight"] = float(func(highlight_t))
+    return plot_data
+
+
+def export_graph(plot_data, file_path, style=None, sweeps=(), progress=None):
+    progress = progress or ExportProgress()
+    progress.start(1, "Exportando gráfico")
+    render_plot(plot_data, file_path, style, sweeps)
+    progress.advance()
+    return file_path
+
+
+def export_history_figures(store, directory, formats, t_range, style=None, progress=None):
+    # Una figura por entrada del historial y por formato; devuelve la cantidad de archivos
+    progress = progress or ExportProgress()
+    for fmt in formats:
+        if fmt not in FIGURE_FORMATS:
+            raise ValueError(f"Formato no soportado: {fmt}")
+
+    progress.start(store.count(), "Exportando gráficos")
+    t_vals = np.linspace(t_range[0], t_range[1], FIGURE_SAMPLES)
+    written = 0
+    for index, entry in enumerate(store, start=1):
+        progress.check()
+        plot_data = entry_plot_data(entry, t_vals)
+        if plot_data is not None:
+            for fmt in formats:
+                with span("exportar.figura", format=fmt):
+                    render_plot(plot_data, os.path.join(directory, f"historial_{index:05d}.{fmt}"), style)
+                written += 1
+        progress.advance()
+    return written
+
+
+class ProgressPanel:
+    # Barra de progreso con botón de cancelación; oculta mientras no hay una exportación en curso
+    def __init__(self, parent, root):
+        self.root = root
+        self.progress = None
+        self._after_id = None
+
+        self.frame = tk.Frame(parent)
+        self.label = tk.Label(self.frame, text="")
+        self.label.pack(anchor="w")
+        self.bar = ttk.Progressbar(self.frame, length=180, mode="determinate", maximum=1.0)
+        self.bar.pack(anchor="w")
+        tk.Button(self.frame, text="Cancelar", command=self.cancel).pack(anchor="w", pady=2)
+
+    @property
+    def active(self):
+        return self.progress is not None
+
+    def start(self, progress):
+        self.progress = progress
+        self.frame.pack(anchor="w", fill=tk.X, pady=5)
+        self._poll()
+
+    def _poll(self):
+        progress = self.progress
+        self.bar["value"] = progress.fraction()
+        status = "Cancelando..." if progress.cancelled else f"{progress.message} ({progress.fraction():.0%})"
+        self.label.config(text=status)
+        self._after_id = self.root.after(PROGRESS_MS, self._poll)
+
+    def cancel(self):
+        if self.progress is not None:
+            self.progress.cancel()
+
+    def finish(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self.progress = None
+        self.frame.pack_forget()
@@ -0,0 +1,177 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from sympy import symbols, sympify, expand, diff, solve, integrate, lambdify
+from instrumentation import span
+
+# Símbolo de tiempo compartido con las aplicaciones
+t = symbols('t')
+
+# Formas sin canonicalizar que se recuerdan por entrada ("5*t**2" y "t**2*5" son dos alias)
+ALIASES_PER_ENTRY = 4
+
+
+def compile_expression(expr, symbol=t):
+    # Lambdify una sola vez con NumPy; el resultado acepta escalares o arreglos
+    func = lambdify(symbol, expr, modules="numpy")
+
+    def evaluate(values):
+        values = np.asarray(values, dtype=float)
+        result = np.asarray(func(values), dtype=float)
+        # Las expresiones constantes devuelven un escalar: se expande a la malla
+        if result.shape != values.shape:
+            result = np.broadcast_to(result, values.shape)
+        return result
+
+    return evaluate
+
+
+def compile_kinematics(expr, derivative=None, symbol=t):
+    # s, v y a en una sola función: lambdify con cse=True genera un único cuerpo
+    # donde las subexpresiones comunes a las tres magnitudes se calculan una vez
+    velocity = diff(expr, symbol) if derivative is None else derivative
+    acceleration = diff(velocity, symbol)
+    func = lambdify(symbol, [expr, velocity, acceleration], modules="numpy", cse=True)
+
+    def evaluate(values):
+        values = np.asarray(values, dtype=float)
+        return tuple(
+            np.broadcast_to(np.asarray(result, dtype=float), values.shape) for result in func(values)
+        )
+
+    return evaluate
+
+
+def canonical(expr):
+    # Forma canónica: expresiones equivalentes tras expandir comparten entrada
+    return expand(sympify(expr))
+
+
+class CompiledExpression:
+    # Resultados derivados de una expresión, calculados bajo demanda una sola vez
+    def __init__(self, expr, symbol=t):
+        self.expr = expr
+        self.symbol = symbol
+        self._derivative = None
+        self._integral = None
+        self._roots = None
+        self._func = None
+        self._state = None
+
+    @property
+    def derivative(self):
+        if self._derivative is None:
+            with span("sympy.diff"):
+                self._derivative = diff(self.expr, self.symbol)
+        return self._derivative
+
+    @property
+    def integral(self):
+        if self._integral is None:
+            with span("sympy.integrate"):
+                self._integral = integrate(self.expr, self.symbol)
+        return self._integral
+
+    @property
+    def roots(self):
+        if self._roots is None:
+            with span("sympy.solve"):
+                self._roots = solve(self.expr, self.symbol)
+        return list(self._roots)
+
+    @property
+    def func(self):
+        if self._func is None:
+            with span("sympy.lambdify"):
+                self._func = compile_expression(self.expr, self.symbol)
+        return self._func
+
+    @property
+    def state(self):
+        # Núcleo fusionado t -> (s, v, a), tomando la expresión como posición
+        if self._state is None:
+            with span("sympy.lambdify", outputs=3):
+                self._state = compile_kinematics(self.expr, self.derivative, self.symbol)
+        return self._state
+
+
+class ExpressionCache:
+    # Caché LRU acotada de expresiones compiladas, compartida por todas las rutas de cálculo
+    def __init__(self, maxsize=256):
+        if maxsize < 1:
+            raise ValueError("El tamaño de la caché debe ser al menos 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        # (expresión sin canonicalizar, símbolo) -> clave canónica
+        self._aliases = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, expr, symbol=t):
+        # Primero por la expresión tal como llega (texto o SymPy): un acierto no pasa por
+        # sympify ni expand. Solo si falla se canonicaliza y se busca por la forma canónica
+        raw = (expr, symbol)
+        with self._lock:
+            key = self._aliases.get(raw)
+            entry = self._entries.get(key) if key is not None else None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        key = (canonical(expr), symbol)
+        with self._lock:
+            self._aliases[raw] = key
+            if len(self._aliases) > ALIASES_PER_ENTRY * self.maxsize:
+                self._aliases.popitem(last=False)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+            self.misses += 1
+            entry = CompiledExpression(key[0], symbol)
+            self._entries[key] = entry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return entry
+
+    def invalidate(self, expr=None, symbol=t):
+        # Sin argumentos vacía la caché completa; los alias que apuntan a una entrada
+        # quitada dejan de acertar solos (se comprueba la entrada en cada búsqueda)
+        with self._lock:
+            if expr is None:
+                self._entries.clear()
+                self._aliases.clear()
+            else:
+                self._entries.pop((canonical(expr), symbol), None)
+
+    def resize(self, maxsize):
+        if maxsize < 1:
+            raise ValueError("El tamaño de la caché debe ser al menos 1")
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Instancia compartida por las tres aplicaciones
+expression_cache = ExpressionCache()
@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+from instrumentation import span
+
+DEFAULT_PATH = "history.jsonl"
+LEGACY_PATH = "history.json"
+
+
+def _dump_indented(entry):
+    # Misma forma que json.dump(lista, indent=4) para un elemento de la lista
+    text = json.dumps(entry, ensure_ascii=False, indent=4)
+    return "\n".join("    " + line for line in text.splitlines())
+
+
+class HistoryStore:
+    # Historial persistente en JSON Lines: una entrada por línea, solo se añade al final
+    def __init__(self, path=DEFAULT_PATH, legacy_path=LEGACY_PATH, sync=False):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.sync = sync
+        self._fd = None
+        self._migrated = False
+        self._lock = threading.Lock()
+
+    def _migrate_legacy(self):
+        # Convierte una sola vez el history.json antiguo (lista completa) al formato por líneas
+        if self._migrated:
+            return
+        self._migrated = True
+        if not self.legacy_path or os.path.exists(self.path) or not os.path.exists(self.legacy_path):
+            return
+
+        with open(self.legacy_path, "r", encoding="utf-8") as file:
+            entries = json.load(file)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            for entry in entries:
+                file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def _open_for_append(self):
+        flags = os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        fd = os.open(self.path, flags, 0o644)
+        # Si una escritura anterior quedó a medias, se cierra esa línea para no corromper la siguiente
+        if os.fstat(fd).st_size:
+            os.lseek(fd, -1, os.SEEK_END)
+            if os.read(fd, 1) != b"\n":
+                os.write(fd, b"\n")
+        return fd
+
+    def append(self, entry):
+        # Devuelve el desplazamiento en bytes de la línea escrita (para HistoryStore.read)
+        with span("historial.guardar"):
+            return self._append(entry)
+
+    def _append(self, entry):
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._migrate_legacy()
+            if self._fd is None:
+                self._fd = self._open_for_append()
+            # Una única escritura con O_APPEND: la línea queda completa o no se escribe
+            os.write(self._fd, line)
+            if self.sync:
+                os.fsync(self._fd)
+            return os.lseek(self._fd, 0, os.SEEK_CUR) - len(line)
+
+    def __iter__(self):
+        for entry, _, _ in self.scan():
+            yield entry
+
+    def scan(self, start=0, end=None):
+        # Lectura perezosa de (entrada, desplazamiento, longitud) entre los bytes [start, end);
+        # una última línea truncada por un cierre abrupto se ignora
+        with self._lock:
+            self._migrate_legacy()
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as file:
+            file.seek(start)
+            offset = start
+            for line in file:
+                if end is not None and offset >= end:
+                    break
+                line_offset = offset
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line.decode("utf-8")), line_offset, len(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+
+    def read(self, offset):
+        # Lee una sola entrada a partir de su desplazamiento, sin recorrer el archivo
+        with open(self.path, "rb") as file:
+            file.seek(offset)
+            return json.loads(file.readline().decode("utf-8"))
+
+    def size(self):
+        # Tamaño en bytes del historial (para informar el progreso)
+        with self._lock:
+            self._migrate_legacy()
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def count(self):
+        with self._lock:
+            self._migrate_legacy()
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "rb") as file:
+            return sum(1 for line in file if line.strip())
+
+    def export(self, file_path, progress=None):
+        # Copia en streaming a un arreglo JSON, sin cargar todo el historial en memoria.
+        # Se escribe en un temporal: si se cancela, el archivo de destino no queda a medias
+        if progress is not None:
+            progress.start(self.size(), "Exportando historial")
+        count = 0
+        tmp_path = file_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                file.write("[")
+                for entry, _, size in self.scan():
+                    file.write(",\n" if count else "\n")
+                    file.write(_dump_indented(entry))
+                    count += 1
+                    if progress is not None:
+                        progress.advance(size)
+                file.write("\n]" if count else "]")
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return count
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
@@ -0,0 +1,229 @@
+import sys
+from array import array
+import numpy as np
+import kinematics
+
+# Historial en memoria por columnas: arreglos tipados en lugar de una lista de diccionarios.
+# Cada entrada ocupa 49 bytes (1 de tipo, 4 floats de 8, 2 índices de fórmula de 4 y el
+# desplazamiento en el archivo) más el texto de cada fórmula distinta, que se guarda una sola vez.
+# La búsqueda por parámetros usa un índice ordenado por (tipo, clave), donde la clave es el
+# índice de la fórmula (posición/velocidad) o la aceleración: el texto de la fórmula queda
+# determinado por (x0, v0, a). Se construye con lexsort al buscar (17 bytes por entrada) y
+# las entradas agregadas después se revisan aparte hasta que conviene reconstruirlo.
+
+FORMULA_TYPES = ("position", "velocity", "acceleration")
+VALUE_COLUMNS = ("time", "position", "velocity", "acceleration")
+NO_FORMULA = -1
+MIN_UNINDEXED = 1024  # Filas sin indexar que se revisan por barrido antes de reconstruir
+
+_TYPE_CODES = {name: code for code, name in enumerate(FORMULA_TYPES)}
+# Campos que tiene cada tipo de entrada, en el orden de batch_solver.build_entry
+_FIELDS = {
+    "position": ("position_formula", "velocity_formula", "time", "position", "velocity"),
+    "velocity": ("velocity_formula", "time", "velocity"),
+    "acceleration": ("acceleration",),
+}
+
+
+class HistoryTable:
+    def __init__(self):
+        self.kind = array("b")
+        self.time = array("d")
+        self.position = array("d")
+        self.velocity = array("d")
+        self.acceleration = array("d")
+        self.position_formula = array("i")
+        self.velocity_formula = array("i")
+        self.offset = array("q")
+        # Tabla de fórmulas internadas: texto <-> índice
+        self.formulas = []
+        self._formula_ids = {}
+        # Índice ordenado de las primeras _indexed filas; parámetros ya interpretados por fórmula
+        self._order = np.empty(0, dtype=np.int64)
+        self._sorted_kind = np.empty(0, dtype=np.int8)
+        self._sorted_keys = np.empty(0)
+        self._indexed = 0
+        self._parameters = {}
+        self.skipped = 0
+
+    @classmethod
+    def from_store(cls, store, end=None, cancel=None):
+        # Carga un HistoryStore hasta el byte "end" (las entradas posteriores se agregan aparte).
+        # cancel: threading.Event opcional; si se activa, la carga termina con lo leído hasta ahí
+        # Una entrada inválida (fórmula desconocida, valores no numéricos) se omite y se cuenta
+        # en "skipped": no debe impedir cargar el resto del historial
+        table = cls()
+        for entry, offset, _ in store.scan(end=end):
+            if cancel is not None and cancel.is_set():
+                break
+            try:
+                table.append(entry, offset)
+            except (ValueError, TypeError, AttributeError):
+                table.skipped += 1
+        return table
+
+    def _intern(self, text):
+        if text is None:
+            return NO_FORMULA
+        formula_id = self._formula_ids.get(text)
+        if formula_id is None:
+            formula_id = self._formula_ids[text] = len(self.formulas)
+            self.formulas.append(text)
+        return formula_id
+
+    def append(self, entry, offset=-1):
+        # offset: posición de la entrada en el HistoryStore (-1 si no se conoce)
+        formula = entry.get("formula")
+        if formula not in _TYPE_CODES:
+            raise ValueError(f"Fórmula desconocida: {formula}")
+        # Se convierte todo antes de tocar las columnas: un error no deja filas a medias
+        values = [np.nan if entry.get(name) is None else float(entry.get(name)) for name in VALUE_COLUMNS]
+        position_id = self._intern(entry.get("position_formula"))
+        velocity_id = self._intern(entry.get("velocity_formula"))
+        self.kind.append(_TYPE_CODES[formula])
+        for name, value in zip(VALUE_COLUMNS, values):
+            getattr(self, name).append(value)
+        self.position_formula.append(position_id)
+        self.velocity_formula.append(velocity_id)
+        self.offset.append(offset)
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def _keys(self, start=0):
+        # Clave de búsqueda de cada fila desde "start": fórmula de posición, de velocidad o aceleración
+        kind = self._view("kind")[start:]
+        return kind, np.where(
+            kind == _TYPE_CODES["position"], self._view("position_formula")[start:],
+            np.where(kind == _TYPE_CODES["velocity"], self._view("velocity_formula")[start:], self._view("acceleration")[start:]),
+        )
+
+    def _build_index(self):
+        kind, keys = self._keys()
+        order = np.lexsort((keys, kind))
+        self._order = order
+        self._sorted_kind = kind[order]
+        self._sorted_keys = keys[order]
+        self._indexed = len(order)
+
+    def __len__(self):
+        return len(self.kind)
+
+    def _view(self, name):
+        # Vista sin copia, solo para cálculos dentro de un método: mientras exista, append()
+        # falla con BufferError (un array que exporta su buffer no puede crecer). Ningún
+        # método público devuelve una vista ni algo derivado de ella sin copiar
+        column = getattr(self, name)
+        return np.frombuffer(column, dtype=column.typecode) if len(column) else np.empty(0, column.typecode)
+
+    def column(self, name, indices=None):
+        # Siempre una copia: con indices=slice(...) la indexación daría otra vista
+        values = self._view(name)
+        return np.array(values if indices is None else values[indices])
+
+    def entry(self, index):
+        # Reconstruye el diccionario original de una entrada
+        formula = FORMULA_TYPES[self.kind[index]]
+        entry = {"formula": formula}
+        for field in _FIELDS[formula]:
+            if field.endswith("_formula"):
+                entry[field] = self.formulas[getattr(self, field)[index]]
+            else:
+                entry[field] = getattr(self, field)[index]
+        return entry
+
+    def select(self, formula=None, t_min=None, t_max=None):
+        # Índices de las entradas que cumplen los filtros, en una sola pasada vectorizada
+        mask = np.ones(len(self), dtype=bool)
+        if formula is not None:
+            mask &= self._view("kind") == _TYPE_CODES[formula]
+        if t_min is not None or t_max is not None:
+            times = self._view("time")
+            if t_min is not None:
+                mask &= times >= t_min
+            if t_max is not None:
+                mask &= times <= t_max
+        return np.flatnonzero(mask)
+
+    def lookup(self, formula, x0=0.0, v0=0.0, a=0.0):
+        # Filas con esos parámetros: búsqueda binaria en el índice más un barrido de lo agregado después
+        if formula == "position":
+            key = self._formula_ids.get(kinematics.format_position(x0, v0, a))
+        elif formula == "velocity":
+            key = self._formula_ids.get(kinematics.format_velocity(v0, a))
+        elif formula == "acceleration":
+            key = float(a)
+        else:
+            raise ValueError(f"Fórmula desconocida: {formula}")
+        if key is None:
+            return np.empty(0, dtype=np.int64)
+        if len(self) - self._indexed > max(MIN_UNINDEXED, self._indexed // 8):
+            self._build_index()
+
+        code = _TYPE_CODES[formula]
+        low, high = np.searchsorted(self._sorted_kind, [code, code + 1])
+        keys = self._sorted_keys[low:high]
+        start = np.searchsorted(keys, key, side="left")
+        stop = np.searchsorted(keys, key, side="right")
+        rows = np.sort(self._order[low + start:low + stop])
+        if len(self) > self._indexed:
+            kind, tail = self._keys(self._indexed)
+            recent = np.flatnonzero((kind == code) & (tail == key)) + self._indexed
+            rows = np.concatenate((rows, recent))
+        return rows
+
+    def find(self, formula, x0=0.0, v0=0.0, a=0.0, t_min=None, t_max=None):
+        # Búsqueda por parámetros y, opcionalmente, por rango de tiempo sobre las filas encontradas
+        rows = self.lookup(formula, x0, v0, a)
+        if rows.size and (t_min is not None or t_max is not None):
+            times = self._view("time")[rows]
+            keep = np.ones(rows.size, dtype=bool)
+            if t_min is not None:
+                keep &= times >= t_min
+            if t_max is not None:
+                keep &= times <= t_max
+            rows = rows[keep]
+        return rows
+
+    def parameters(self, index):
+        # (x0, v0, a) de una entrada, interpretados una sola vez por fórmula
+        formula = FORMULA_TYPES[self.kind[index]]
+        if formula == "acceleration":
+            return 0.0, 0.0, self.acceleration[index]
+        formula_id = self.position_formula[index] if formula == "position" else self.velocity_formula[index]
+        params = self._parameters.get(formula_id)
+        if params is None:
+            text = self.formulas[formula_id]
+            if formula == "position":
+                params = kinematics.parameters_from_formulas(position_formula=text)
+            else:
+                params = kinematics.parameters_from_formulas(velocity_formula=text)
+            self._parameters[formula_id] = params
+        return params
+
+    def summary(self, name, indices=None):
+        # Estadísticas de una columna (los valores ausentes se ignoran)
+        values = self.column(name, indices)
+        values = values[np.isfinite(values)]
+        if not values.size:
+            return {"count": 0, "min": None, "max": None, "mean": None}
+        return {
+            "count": int(values.size),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "mean": float(values.mean()),
+        }
+
+    def counts(self):
+        kinds = np.bincount(self._view("kind"), minlength=len(FORMULA_TYPES))
+        return dict(zip(FORMULA_TYPES, (int(count) for count in kinds)))
+
+    def nbytes(self):
+        # Columnas, índice ordenado y fórmulas internadas (texto y diccionario texto -> índice)
+        columns = ("kind", "position_formula", "velocity_formula", "offset") + VALUE_COLUMNS
+        total = sum(len(getattr(self, name)) * getattr(self, name).itemsize for name in columns)
+        total += self._order.nbytes + self._sorted_kind.nbytes + self._sorted_keys.nbytes
+        total += sum(sys.getsizeof(text) for text in self.formulas)
+        total += sys.getsizeof(self.formulas) + sys.getsizeof(self._formula_ids)
+        return total
@@ -0,0 +1,225 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+# Medición de las etapas de cálculo (SymPy, muestreo, dibujo, historial) sin un perfilador externo.
+# Los tramos se agregan en histogramas y se pueden volcar en formato Chrome trace
+# (abrir el archivo en chrome://tracing o en https://ui.perfetto.dev).
+
+MAX_EVENTS = 100_000
+# Cubetas del histograma en potencias de 2 de microsegundos: 1 µs .. ~67 s
+BUCKETS = 27
+
+
+class Histogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * BUCKETS
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        micros = max(int(seconds * 1_000_000), 1)
+        self.buckets[min(micros.bit_length() - 1, BUCKETS - 1)] += 1
+
+    def percentile(self, fraction):
+        # Límite superior de la cubeta que contiene el percentil pedido (en segundos)
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, amount in enumerate(self.buckets):
+            seen += amount
+            if seen >= target:
+                return min((2 ** (index + 1)) / 1_000_000, self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class Profiler:
+    def __init__(self, enabled=True, max_events=MAX_EVENTS):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.histograms = {}
+        self.events = deque(maxlen=max_events)
+        self._thread_names = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **args):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, started, time.perf_counter(), **args)
+
+    def traced(self, name):
+        # Decorador equivalente a envolver la función en un span
+        def decorate(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def record(self, name, started, finished, **args):
+        # Registra un tramo ya medido (por ejemplo, desde un evento de dibujo)
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(finished - started)
+            self._thread_names[thread.ident] = thread.name
+            self.events.append((name, started, finished - started, thread.ident, args))
+
+    def reset(self):
+        with self._lock:
+            self.started = time.perf_counter()
+            self.histograms.clear()
+            self.events.clear()
+
+    def summary(self):
+        # Filas (nombre, cantidad, media, p50, p99, máximo) ordenadas por tiempo total
+        with self._lock:
+            items = sorted(self.histograms.items(), key=lambda item: item[1].total, reverse=True)
+            return [
+                (name, h.count, h.mean(), h.percentile(0.5), h.percentile(0.99), h.max)
+                for name, h in items
+            ]
+
+    def format(self):
+        lines = [f"{'Etapa':<28}{'n':>6}{'media':>10}{'p50':>10}{'p99':>10}{'máx':>10}"]
+        for name, count, mean, p50, p99, peak in self.summary():
+            lines.append(
+                f"{name:<28}{count:>6}{mean * 1000:>8.2f}ms{p50 * 1000:>8.2f}ms"
+                f"{p99 * 1000:>8.2f}ms{peak * 1000:>8.2f}ms"
+            )
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+            thread_names = dict(self._thread_names)
+        trace = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in thread_names.items()
+        ]
+        trace += [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (started - self.started) * 1_000_000,
+                "dur": duration * 1_000_000,
+                "pid": pid,
+                "tid": tid,
+                "args": args,
+            }
+            for name, started, duration, tid, args in events
+        ]
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def dump_chrome_trace(self, file_path):
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.chrome_trace(), file, default=str)
+        os.replace(tmp_path, file_path)
+
+
+class PerformanceOverlay:
+    # Ventana opcional con la tabla de tiempos; se refresca sola mientras está abierta
+    def __init__(self, root, profiler, refresh_ms=500):
+        self.root = root
+        self.profiler = profiler
+        self.refresh_ms = refresh_ms
+        self.window = None
+        self._after_id = None
+
+    def toggle(self, event=None):
+        if self.window is None:
+            self.show()
+        else:
+            self.hide()
+
+    def show(self):
+        import tkinter as tk
+        from tkinter import filedialog, messagebox
+
+        if self.window is not None:
+            return
+
+        def save_trace():
+            try:
+                file_path = filedialog.asksaveasfilename(
+                    defaultextension=".json",
+                    filetypes=[("Chrome trace", "*.json"), ("All files", "*.*")]
+                )
+                if file_path:
+                    self.profiler.dump_chrome_trace(file_path)
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudo guardar la traza: {e}")
+
+        self.window = tk.Toplevel(self.root)
+        self.window.title("Rendimiento")
+        self.window.attributes("-topmost", True)
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+        self.label = tk.Label(self.window, font=("Courier", 9), justify=tk.LEFT, anchor="nw")
+        self.label.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        buttons = tk.Frame(self.window)
+        buttons.pack(fill=tk.X)
+        tk.Button(buttons, text="Guardar traza", command=save_trace).pack(side=tk.LEFT)
+        tk.Button(buttons, text="Reiniciar", command=self.profiler.reset).pack(side=tk.LEFT)
+        self.refresh()
+
+    def hide(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+
+    def refresh(self):
+        self.label.config(text=self.profiler.format())
+        self._after_id = self.root.after(self.refresh_ms, self.refresh)
+
+
+def trace_path(argv):
+    # Valor de "--trace archivo.json" en la línea de comandos, o None
+    if "--trace" in argv:
+        index = argv.index("--trace")
+        if index + 1 < len(argv):
+            return argv[index + 1]
+    return None
+
+
+def install(root, argv):
+    # F12 muestra u oculta la ventana de rendimiento; "--perf" la abre al iniciar
+    overlay = PerformanceOverlay(root, profiler)
+    root.bind_all("<F12>", overlay.toggle)
+    if "--perf" in argv:
+        root.after_idle(overlay.show)
+    return overlay
+
+
+# Perfilador compartido por los módulos de cálculo y las aplicaciones
+profiler = Profiler()
+span = profiler.span
@@ -0,0 +1,179 @@
+import numpy as np
+
+# Núcleo numérico del MRUV: s(t) = x0 + v0·t + ½·a·t²
+# Todas las funciones aceptan floats o arreglos de NumPy (con broadcasting).
+
+
+def position(x0, v0, a, t):
+    return x0 + v0 * t + 0.5 * a * t * t
+
+
+def velocity(v0, a, t):
+    return v0 + a * t
+
+
+def acceleration(a, t):
+    return a + 0.0 * t
+
+
+def stop_time(v0, a):
+    # Instante en que v(t) = 0; NaN si la aceleración es nula
+    v0 = np.asarray(v0, dtype=float)
+    a = np.asarray(a, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = np.where(a != 0, -v0 / np.where(a != 0, a, 1.0), np.nan)
+    return result[()] if result.ndim == 0 else result
+
+
+def apex(x0, v0, a):
+    # Punto extremo de la trayectoria: (instante, posición)
+    t_star = stop_time(v0, a)
+    return t_star, position(x0, v0, a, t_star)
+
+
+def distance(x0, v0, a, t0, t1):
+    # Distancia recorrida en [t0, t1], sumando los tramos si la velocidad cambia de signo
+    t_star = stop_time(v0, a)
+    s0 = position(x0, v0, a, t0)
+    s1 = position(x0, v0, a, t1)
+    with np.errstate(invalid="ignore"):
+        inside = (t_star > t0) & (t_star < t1)
+    s_star = position(x0, v0, a, np.where(inside, t_star, t0))
+    result = np.where(inside, np.abs(s_star - s0) + np.abs(s1 - s_star), np.abs(s1 - s0))
+    return result[()] if result.ndim == 0 else result
+
+
+def key_times(x0, v0, a):
+    # Instantes notables de s(t): parada (v = 0) y cruces de la posición por cero
+    times = [stop_time(v0, a)]
+    if a == 0:
+        if v0 != 0:
+            times.append(-x0 / v0)
+    else:
+        discriminant = v0 * v0 - 2 * a * x0
+        if discriminant >= 0:
+            root = np.sqrt(discriminant)
+            times += [(-v0 - root) / a, (-v0 + root) / a]
+    return [float(value) for value in times if np.isfinite(value)]
+
+
+def state(x0, v0, a, t):
+    # s, v y a en una sola pasada: a·t se calcula una vez y lo comparten s y v
+    at = a * t
+    return x0 + t * (v0 + 0.5 * at), v0 + at, a + 0.0 * t
+
+
+def sweep(formula, x0, v0, a, parameter, values, t_vals):
+    # Familia de trayectorias variando "a" o "v0": arreglo 2-D (valores del barrido, muestras)
+    params = {"x0": x0, "v0": v0, "a": a}
+    if parameter not in params:
+        raise ValueError(f"Parámetro de barrido desconocido: {parameter}")
+    params[parameter] = np.asarray(values, dtype=float)[:, None]
+    t_vals = np.asarray(t_vals, dtype=float)[None, :]
+
+    if formula == "position":
+        result = position(params["x0"], params["v0"], params["a"], t_vals)
+    elif formula == "velocity":
+        result = velocity(params["v0"], params["a"], t_vals)
+    else:
+        raise ValueError(f"Fórmula desconocida: {formula}")
+    # Si la fórmula no depende del parámetro (x0 en la velocidad) se repite la misma curva
+    return np.broadcast_to(result, (len(values), t_vals.shape[1]))
+
+
+def position_function(x0, v0, a):
+    return lambda values: position(x0, v0, a, np.asarray(values, dtype=float))
+
+
+def velocity_function(v0, a):
+    return lambda values: velocity(v0, a, np.asarray(values, dtype=float))
+
+
+def state_function(x0, v0, a):
+    return lambda values: state(x0, v0, a, np.asarray(values, dtype=float))
+
+
+def acceleration_function(a):
+    return lambda values: acceleration(a, np.asarray(values, dtype=float))
+
+
+def format_polynomial(coefficients):
+    # coefficients: [(coeficiente, potencia), ...] en orden descendente de potencia
+    terms = []
+    for coef, power in coefficients:
+        coef = float(coef)
+        if coef == 0:
+            continue
+        body = str(abs(coef))
+        if power == 1:
+            body += "*t"
+        elif power > 1:
+            body += f"*t**{power}"
+        if not terms:
+            terms.append(f"-{body}" if coef < 0 else body)
+        else:
+            terms.append(f"- {body}" if coef < 0 else f"+ {body}")
+    return " ".join(terms) or "0"
+
+
+def parse_polynomial(text):
+    # Inversa de format_polynomial: "-4.9*t**2 + 30.0*t + 10.0" -> {2: -4.9, 1: 30.0, 0: 10.0}
+    coefficients = {}
+    for term in text.replace(" - ", " + -").split(" + "):
+        coef, _, power = term.partition("*t")
+        if power.startswith("**"):
+            power = int(power[2:])
+        else:
+            power = 1 if _ else 0
+        coefficients[power] = coefficients.get(power, 0.0) + float(coef)
+    return coefficients
+
+
+def parameters_from_formulas(position_formula=None, velocity_formula=None):
+    # (x0, v0, a) a partir de los textos guardados en el historial
+    if position_formula is not None:
+        coefficients = parse_polynomial(position_formula)
+        return coefficients.get(0, 0.0), coefficients.get(1, 0.0), 2.0 * coefficients.get(2, 0.0)
+    coefficients = parse_polynomial(velocity_formula)
+    return 0.0, coefficients.get(0, 0.0), coefficients.get(1, 0.0)
+
+
+def format_position(x0, v0, a):
+    return format_polynomial([(0.5 * a, 2), (v0, 1), (x0, 0)])
+
+
+def format_velocity(v0, a):
+    return format_polynomial([(a, 1), (v0, 0)])
+
+
+def standard_coefficients(expr, symbol=None):
+    # Devuelve (x0, v0, a) si la expresión es un polinomio de grado <= 2 en t
+    # con coeficientes numéricos; None si hay que recurrir a SymPy
+    from sympy import Poly, PolynomialError
+    from expr_cache import t
+
+    symbol = t if symbol is None else symbol
+    try:
+        poly = Poly(expr, symbol)
+    except PolynomialError:
+        return None
+    if poly.degree() > 2 or not all(c.is_number for c in poly.all_coeffs()):
+        return None
+
+    coeffs = [float(c) for c in poly.all_coeffs()]
+    coeffs = [0.0] * (3 - len(coeffs)) + coeffs
+    return coeffs[2], coeffs[1], 2.0 * coeffs[0]
+
+
+def motion_functions(expr, symbol=None):
+    # Funciones numéricas (s, v) para una expresión de posición: núcleo cerrado
+    # cuando la forma es estándar y caché de SymPy en otro caso
+    coefficients = standard_coefficients(expr, symbol)
+    if coefficients is not None:
+        x0, v0, a = coefficients
+        return position_function(x0, v0, a), velocity_function(v0, a)
+
+    from expr_cache import expression_cache
+
+    entry = expression_cache.get(expr) if symbol is None else expression_cache.get(expr, symbol)
+    return entry.func, expression_cache.get(entry.derivative, entry.symbol).func
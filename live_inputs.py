@@ -0,0 +1,89 @@
+import tkinter as tk
+
+# Intervalo de la actualización en vivo (~60 Hz)
+FRAME_MS = 16
+
+
+class Throttle:
+    # Como máximo una llamada por cuadro: el primer cambio programa la llamada y los que llegan
+    # mientras está pendiente no la reprograman. El callback lee los valores más recientes, así
+    # que un arrastre continuo actualiza a la tasa de cuadros y no solo cuando el ratón se detiene
+    def __init__(self, root, callback, delay_ms=FRAME_MS):
+        self.root = root
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self._after_id = None
+
+    def trigger(self, *args):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.delay_ms, self._fire)
+
+    def cancel(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _fire(self):
+        self._after_id = None
+        self.callback()
+
+
+class ParameterPanel:
+    # Filas de parámetro (etiqueta + entrada + deslizador) creadas una sola vez;
+    # al cambiar de fórmula solo se muestran u ocultan.
+    # La entrada manda: el deslizador tiene su propia variable (si compartiera la de la
+    # entrada, Tk la recortaría a su rango) y solo refleja los valores dentro del rango
+    def __init__(self, parent, variables, ranges, layouts, resolution=0.1):
+        self.parent = parent
+        self.layouts = layouts
+        self.resolution = resolution
+        self.rows = {}
+        self.labels = {}
+
+        for name, variable in variables.items():
+            low, high = ranges[name]
+            row = tk.Frame(parent)
+            label = tk.Label(row)
+            label.pack(anchor="w")
+            tk.Entry(row, textvariable=variable).pack(anchor="w")
+            slider = tk.DoubleVar(row)
+            tk.Scale(
+                row, variable=slider, from_=low, to=high, resolution=resolution,
+                orient=tk.HORIZONTAL, showvalue=False, length=150,
+                command=lambda value, variable=variable: self._from_slider(variable, value),
+            ).pack(anchor="w")
+            variable.trace_add(
+                "write",
+                lambda *_, variable=variable, slider=slider, low=low, high=high:
+                    self._to_slider(variable, slider, low, high),
+            )
+            self._to_slider(variable, slider, low, high)
+            self.rows[name] = row
+            self.labels[name] = label
+
+    def _to_slider(self, variable, slider, low, high):
+        # Texto intermedio ("", "-") o fuera de rango: el deslizador queda donde está
+        try:
+            value = variable.get()
+        except (tk.TclError, ValueError):
+            return
+        if low <= value <= high:
+            slider.set(value)
+
+    def _from_slider(self, variable, value):
+        # Tk también llama a command cuando se mueve el deslizador desde la entrada; si el
+        # valor ya coincide (salvo el redondeo del deslizador) no se pisa lo escrito
+        value = float(value)
+        try:
+            if abs(variable.get() - value) <= self.resolution / 2:
+                return
+        except (tk.TclError, ValueError):
+            pass
+        variable.set(value)
+
+    def show(self, formula):
+        for row in self.rows.values():
+            row.pack_forget()
+        for name, text in self.layouts[formula]:
+            self.labels[name].config(text=text)
+            self.rows[name].pack(anchor="w")
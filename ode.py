@@ -0,0 +1,247 @@
+import numpy as np
+from instrumentation import span
+
+# Integración numérica de x'' = a(t, x, v) cuando la aceleración no es constante
+# (arrastre, resortes, empuje variable), sin pasar por integrate de SymPy.
+# x0 y v0 pueden ser arreglos: todo el lote de condiciones iniciales avanza en cada paso.
+
+RK4 = "rk4"        # Paso fijo
+RK45 = "rk45"      # Dormand-Prince 5(4) con paso adaptativo (común a todo el lote)
+METHODS = (RK4, RK45)
+
+DEFAULT_STEPS = 1000
+DEFAULT_RTOL = 1e-8
+DEFAULT_ATOL = 1e-10
+MAX_STEPS = 100_000
+SAFETY = 0.9
+MIN_FACTOR = 0.2
+MAX_FACTOR = 5.0
+
+# Modelos de aceleración con dos parámetros: a (aceleración base) y k (coeficiente)
+CONSTANT = "constant"
+DRAG = "drag"
+SPRING = "spring"
+THRUST = "thrust"
+
+MODELS = (CONSTANT, DRAG, SPRING, THRUST)
+LABELS = {
+    CONSTANT: "Constante",
+    DRAG: "Arrastre (a - k·v·|v|)",
+    SPRING: "Resorte (a - k·x)",
+    THRUST: "Empuje decreciente (a·e^(-k·t))",
+}
+
+
+def model_acceleration(model, a, k=0.0):
+    # Devuelve a(t, x, v) vectorizada para el modelo pedido
+    if model == CONSTANT:
+        return lambda t, x, v: a + 0.0 * x
+    if model == DRAG:
+        return lambda t, x, v: a - k * v * np.abs(v)
+    if model == SPRING:
+        return lambda t, x, v: a - k * x
+    if model == THRUST:
+        return lambda t, x, v: a * np.exp(-k * t) + 0.0 * x
+    raise ValueError(f"Modelo de aceleración desconocido: {model}")
+
+
+def _locate(t_nodes, t_vals, ndim):
+    # Tramo de cada instante y posición relativa dentro de él (se comparte entre magnitudes)
+    flat = np.atleast_1d(np.asarray(t_vals, dtype=float)).ravel()
+    index = np.clip(np.searchsorted(t_nodes, flat, side="right") - 1, 0, len(t_nodes) - 2)
+    h = t_nodes[index + 1] - t_nodes[index]
+    shape = (-1,) + (1,) * (ndim - 1)
+    s = ((flat - t_nodes[index]) / h).reshape(shape)
+    outside = (flat < t_nodes[0]) | (flat > t_nodes[-1])
+    return index, h.reshape(shape), s, outside
+
+
+def _hermite(located, values, slopes):
+    # Interpolación cúbica de Hermite: usa la derivada conocida en cada nodo (v para x, a para v)
+    index, h, s, outside = located
+    s2 = s * s
+    s3 = s2 * s
+    result = (
+        (2 * s3 - 3 * s2 + 1) * values[index]
+        + (s3 - 2 * s2 + s) * h * slopes[index]
+        + (3 * s2 - 2 * s3) * values[index + 1]
+        + (s3 - s2) * h * slopes[index + 1]
+    )
+    # Fuera del intervalo integrado no hay datos
+    result[outside] = np.nan
+    return result
+
+
+def _linear(located, values):
+    index, _, s, outside = located
+    result = (1 - s) * values[index] + s * values[index + 1]
+    result[outside] = np.nan
+    return result
+
+
+class Trajectory:
+    # Resultado de la integración: nodos (t) y valores (nodos, *lote) con salida densa
+    def __init__(self, t, position, velocity, acceleration, method):
+        self.t = t
+        self.positions = position
+        self.velocities = velocity
+        self.accelerations = acceleration
+        self.method = method
+
+    @property
+    def steps(self):
+        return len(self.t) - 1
+
+    def _shape(self, t_vals):
+        return np.shape(t_vals) + self.positions.shape[1:]
+
+    def position(self, t_vals):
+        located = _locate(self.t, t_vals, self.positions.ndim)
+        return _hermite(located, self.positions, self.velocities).reshape(self._shape(t_vals))
+
+    def velocity(self, t_vals):
+        located = _locate(self.t, t_vals, self.positions.ndim)
+        return _hermite(located, self.velocities, self.accelerations).reshape(self._shape(t_vals))
+
+    def acceleration(self, t_vals):
+        # Sin derivada de a: interpolación lineal entre nodos
+        located = _locate(self.t, t_vals, self.positions.ndim)
+        return _linear(located, self.accelerations).reshape(self._shape(t_vals))
+
+    def state(self, t_vals):
+        # s, v y a con una sola búsqueda de tramos para las tres magnitudes
+        located = _locate(self.t, t_vals, self.positions.ndim)
+        shape = self._shape(t_vals)
+        return (
+            _hermite(located, self.positions, self.velocities).reshape(shape),
+            _hermite(located, self.velocities, self.accelerations).reshape(shape),
+            _linear(located, self.accelerations).reshape(shape),
+        )
+
+    def select(self, index):
+        # Una sola trayectoria del lote (para graficarla o animarla)
+        return Trajectory(
+            self.t,
+            self.positions[:, index],
+            self.velocities[:, index],
+            self.accelerations[:, index],
+            self.method,
+        )
+
+
+def _initial_state(x0, v0):
+    x0, v0 = np.broadcast_arrays(np.asarray(x0, dtype=float), np.asarray(v0, dtype=float))
+    return x0.copy(), v0.copy()
+
+
+def rk4(accel, x0, v0, t_vals):
+    # Runge-Kutta clásico sobre la malla t_vals (no hace falta que sea uniforme)
+    t_vals = np.asarray(t_vals, dtype=float)
+    x, v = _initial_state(x0, v0)
+    positions = np.empty(t_vals.shape + x.shape)
+    velocities = np.empty_like(positions)
+    accelerations = np.empty_like(positions)
+    positions[0], velocities[0] = x, v
+    acc = accelerations[0] = accel(t_vals[0], x, v)
+
+    for i in range(len(t_vals) - 1):
+        t, h = t_vals[i], t_vals[i + 1] - t_vals[i]
+        k1x, k1v = v, acc
+        k2x = v + 0.5 * h * k1v
+        k2v = accel(t + 0.5 * h, x + 0.5 * h * k1x, k2x)
+        k3x = v + 0.5 * h * k2v
+        k3v = accel(t + 0.5 * h, x + 0.5 * h * k2x, k3x)
+        k4x = v + h * k3v
+        k4v = accel(t + h, x + h * k3x, k4x)
+        x = x + h / 6 * (k1x + 2 * k2x + 2 * k3x + k4x)
+        v = v + h / 6 * (k1v + 2 * k2v + 2 * k3v + k4v)
+        acc = accel(t + h, x, v)
+        positions[i + 1], velocities[i + 1], accelerations[i + 1] = x, v, acc
+
+    return Trajectory(t_vals, positions, velocities, accelerations, RK4)
+
+
+# Tabla de Butcher de Dormand-Prince; la última etapa se reutiliza como la primera del paso siguiente
+_DP_C = (0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0, 1.0)
+_DP_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+# Diferencia entre la solución de orden 5 y la de orden 4: estimación del error local
+_DP_E = (
+    71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40,
+)
+
+
+def rk45(accel, x0, v0, t_start, t_end, rtol=DEFAULT_RTOL, atol=DEFAULT_ATOL, max_steps=MAX_STEPS):
+    # Paso adaptativo: el error se mide en todo el lote, así los nodos son comunes
+    if t_end <= t_start:
+        raise ValueError("El tiempo final debe ser mayor que el inicial")
+    x, v = _initial_state(x0, v0)
+    acc = accel(t_start, x, v)
+    times, positions, velocities, accelerations = [t_start], [x], [v], [acc]
+
+    t = t_start
+    h = (t_end - t_start) / 100
+    while t < t_end:
+        if len(times) > max_steps:
+            raise ValueError(f"La integración superó {max_steps} pasos")
+        h = min(h, t_end - t)
+
+        # Etapas k_i = (dx, dv); la primera es el final del paso anterior
+        kx, kv = [v], [acc]
+        for stage in range(1, 7):
+            row = _DP_A[stage]
+            xs = x + h * sum(coef * k for coef, k in zip(row, kx) if coef)
+            vs = v + h * sum(coef * k for coef, k in zip(row, kv) if coef)
+            kx.append(vs)
+            kv.append(accel(t + _DP_C[stage] * h, xs, vs))
+        # La etapa 7 se evalúa en el punto de orden 5: xs, vs son la solución nueva
+        x_new, v_new, acc_new = xs, vs, kv[-1]
+
+        error_x = h * sum(coef * k for coef, k in zip(_DP_E, kx) if coef)
+        error_v = h * sum(coef * k for coef, k in zip(_DP_E, kv) if coef)
+        scale_x = atol + rtol * np.maximum(np.abs(x), np.abs(x_new))
+        scale_v = atol + rtol * np.maximum(np.abs(v), np.abs(v_new))
+        error = np.sqrt(0.5 * (np.mean((error_x / scale_x) ** 2) + np.mean((error_v / scale_v) ** 2)))
+
+        if not np.isfinite(error):
+            raise ValueError("La integración produjo valores no finitos")
+        if error <= 1.0:
+            t += h
+            x, v, acc = x_new, v_new, acc_new
+            times.append(t)
+            positions.append(x)
+            velocities.append(v)
+            accelerations.append(acc)
+        factor = MAX_FACTOR if error == 0 else SAFETY * error ** -0.2
+        h *= min(MAX_FACTOR, max(MIN_FACTOR, factor))
+
+    return Trajectory(
+        np.array(times),
+        np.array(positions),
+        np.array(velocities),
+        np.array(accelerations),
+        RK45,
+    )
+
+
+def integrate(accel, x0, v0, t_start, t_end, method=RK45, steps=DEFAULT_STEPS,
+              rtol=DEFAULT_RTOL, atol=DEFAULT_ATOL):
+    if method not in METHODS:
+        raise ValueError(f"Método de integración desconocido: {method}")
+    batch = np.broadcast(np.asarray(x0), np.asarray(v0)).size
+    with span(f"ode.{method}", batch=batch):
+        if method == RK4:
+            return rk4(accel, x0, v0, np.linspace(t_start, t_end, steps + 1))
+        return rk45(accel, x0, v0, t_start, t_end, rtol, atol)
+
+
+def solve_model(model, x0, v0, a, k, t_start, t_end, method=RK45):
+    # Atajo para las aplicaciones: integra un modelo y devuelve la trayectoria
+    return integrate(model_acceleration(model, a, k), x0, v0, t_start, t_end, method)
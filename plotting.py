@@ -0,0 +1,223 @@
+from collections import deque
+import numpy as np
+from instrumentation import profiler, span
+
+HIDDEN_LABEL = "_nolegend_"
+
+# Modo comparación: barridos retenidos y tope de puntos en memoria (los más antiguos se descartan)
+MAX_SWEEPS = 8
+MAX_SWEEP_POINTS = 2_000_000
+
+
+def _same(values, previous):
+    if values is None or previous is None:
+        return values is previous
+    return values is previous or np.array_equal(values, previous)
+
+
+class IncrementalPlot:
+    # Gráfico s(t)/v(t) con artistas persistentes: cada actualización solo cambia los datos.
+    # Los marcadores destacados y la leyenda son artistas animados que se redibujan con blitting.
+    def __init__(self, ax, canvas, velocity_color="red", highlight_format="{}",
+                 title=None, xlabel="Tiempo (t)", ylabel="Magnitud", vertical_axis=False):
+        self.ax = ax
+        self.canvas = canvas
+        self.highlight_format = highlight_format
+        self._background = None
+        self._curves = (None, None)
+        self._saving = False
+
+        self.position_line, = ax.plot([], [], color="blue")
+        self.velocity_line, = ax.plot([], [], color=velocity_color)
+        self.position_marker, = ax.plot([], [], "o", color="blue", animated=True)
+        self.velocity_marker, = ax.plot([], [], "o", color=velocity_color, animated=True)
+        self.legend = None
+        # Capas extra (por ejemplo, ComparisonPlot) que aportan sus límites al reescalar
+        self.overlays = []
+
+        ax.axhline(0, color="black", linewidth=0.5, linestyle="--")
+        if vertical_axis:
+            ax.axvline(0, color="black", linewidth=0.5, linestyle="--")
+        if title:
+            ax.set_title(title)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.grid(True)
+
+        canvas.mpl_connect("draw_event", self._on_draw)
+        # draw_idle termina llamando a canvas.draw: así se mide el dibujo completo real
+        canvas.draw = profiler.traced("grafico.dibujo")(canvas.draw)
+
+    def _animated_artists(self):
+        artists = [self.position_marker, self.velocity_marker]
+        if self.legend is not None:
+            artists.append(self.legend)
+        return artists
+
+    def _on_draw(self, event):
+        # Tras un dibujo completo se guarda el fondo y se pintan los artistas animados.
+        # Durante savefig (SVG/PDF usan otro lienzo) no hay nada que guardar
+        if self._saving:
+            return
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        for artist in self._animated_artists():
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.ax.bbox)
+
+    def _set_line(self, line, t_vals, values, label):
+        if values is None:
+            line.set_data([], [])
+            line.set_label(HIDDEN_LABEL)
+        else:
+            line.set_data(t_vals, values)
+            line.set_label(label)
+
+    def _set_marker(self, marker, highlight_t, value, prefix):
+        if highlight_t is None or value is None:
+            marker.set_data([], [])
+            marker.set_label(HIDDEN_LABEL)
+        else:
+            marker.set_data([highlight_t], [value])
+            marker.set_label(f"{prefix}({self.highlight_format.format(highlight_t)})")
+
+    def _refresh_legend(self):
+        if self.legend is not None:
+            self.legend.remove()
+            self.legend = None
+        if self.ax.get_legend_handles_labels()[0]:
+            self.legend = self.ax.legend()
+            self.legend.set_animated(True)
+
+    def _highlight_inside(self, highlight_t, values):
+        x_low, x_high = self.ax.get_xlim()
+        y_low, y_high = self.ax.get_ylim()
+        if not x_low <= highlight_t <= x_high:
+            return False
+        return all(y_low <= value <= y_high for value in values if value is not None)
+
+    def update(self, plot_data):
+        with span("grafico.actualizar"):
+            self._update(plot_data)
+
+    def _update(self, plot_data):
+        position = plot_data.get("position")
+        velocity = plot_data.get("velocity")
+        highlight_t = plot_data.get("highlight_t")
+        position_highlight = plot_data.get("position_highlight")
+        velocity_highlight = plot_data.get("velocity_highlight")
+
+        curves_changed = not (_same(position, self._curves[0]) and _same(velocity, self._curves[1]))
+        if curves_changed:
+            t_vals = plot_data.get("t")
+            self._set_line(self.position_line, t_vals, position, "s(t): Posición")
+            self._set_line(self.velocity_line, t_vals, velocity, "v(t): Velocidad")
+            self._curves = (position, velocity)
+
+        self._set_marker(self.position_marker, highlight_t, position_highlight, "s")
+        self._set_marker(self.velocity_marker, highlight_t, velocity_highlight, "v")
+        self._refresh_legend()
+
+        highlight_values = (position_highlight, velocity_highlight)
+        can_blit = (
+            not curves_changed
+            and self._background is not None
+            and (highlight_t is None or self._highlight_inside(highlight_t, highlight_values))
+        )
+        if can_blit:
+            self.blit_highlight()
+            return
+        self.redraw(refresh_legend=False)
+
+    def redraw(self, refresh_legend=True):
+        # relim solo considera líneas: las colecciones de las capas se agregan aparte
+        self.ax.relim()
+        for overlay in self.overlays:
+            limits = overlay.data_limits()
+            if limits is not None:
+                self.ax.update_datalim(limits)
+        self.ax.autoscale_view()
+        if refresh_legend:
+            self._refresh_legend()
+        self._background = None
+        self.canvas.draw_idle()
+
+    def blit_highlight(self):
+        # Solo se repintan los marcadores y la leyenda sobre el fondo guardado
+        with span("grafico.blit"):
+            self.canvas.restore_region(self._background)
+            for artist in self._animated_artists():
+                self.ax.draw_artist(artist)
+            self.canvas.blit(self.ax.bbox)
+
+    def clear(self):
+        self.update({"position": None, "velocity": None, "highlight_t": None})
+
+    def save(self, file_path):
+        # savefig no dibuja artistas animados: se desactiva la animación mientras se exporta
+        artists = self._animated_artists()
+        for artist in artists:
+            artist.set_animated(False)
+        self._saving = True
+        try:
+            self.ax.figure.savefig(file_path)
+        finally:
+            self._saving = False
+            for artist in artists:
+                artist.set_animated(True)
+
+
+class ComparisonPlot:
+    # Barridos de parámetros superpuestos al gráfico: cada barrido (cientos de trayectorias
+    # en un arreglo 2-D) es una sola LineCollection, es decir, una única llamada de dibujo
+    def __init__(self, plot, cmap="viridis", max_sweeps=MAX_SWEEPS, max_points=MAX_SWEEP_POINTS):
+        self.plot = plot
+        self.ax = plot.ax
+        self.cmap = cmap
+        self.max_sweeps = max_sweeps
+        self.max_points = max_points
+        self.sweeps = deque()
+        self.points = 0
+        plot.overlays.append(self)
+
+    def add(self, t_vals, values, parameters, label):
+        # values: arreglo (trayectorias, muestras); parameters: valor barrido de cada trayectoria
+        from matplotlib.collections import LineCollection
+
+        values = np.asarray(values, dtype=float)
+        segments = np.empty(values.shape + (2,))
+        segments[..., 0] = t_vals
+        segments[..., 1] = values
+
+        collection = LineCollection(segments, cmap=self.cmap, linewidths=0.8, alpha=0.6, label=label)
+        collection.set_array(np.asarray(parameters, dtype=float))
+        self.ax.add_collection(collection, autolim=False)
+
+        finite = values[np.isfinite(values)]
+        limits = None
+        if finite.size:
+            limits = [(t_vals[0], finite.min()), (t_vals[-1], finite.max())]
+        self.sweeps.append((collection, limits, values.size, (t_vals, values, parameters, label)))
+        self.points += values.size
+
+        # Retención acotada: primero por cantidad de barridos y después por puntos
+        while len(self.sweeps) > self.max_sweeps or (len(self.sweeps) > 1 and self.points > self.max_points):
+            self._drop_oldest()
+        self.plot.redraw()
+
+    def _drop_oldest(self):
+        collection, _, size, _ = self.sweeps.popleft()
+        collection.remove()
+        self.points -= size
+
+    def clear(self):
+        while self.sweeps:
+            self._drop_oldest()
+        self.plot.redraw()
+
+    def data_limits(self):
+        corners = [corner for _, limits, _, _ in self.sweeps if limits is not None for corner in limits]
+        return corners or None
+
+    def snapshot(self):
+        # Datos de los barridos retenidos, para volver a dibujarlos en otra figura
+        return [data for _, _, _, data in self.sweeps]
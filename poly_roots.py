@@ -0,0 +1,248 @@
+import numpy as np
+from instrumentation import span
+
+# Raíces y extremos de muchos polinomios a la vez, sin SymPy.
+# Los coeficientes van en un arreglo (polinomios, grado + 1) de mayor a menor potencia,
+# como en np.polyval. Las filas con menos raíces se rellenan con NaN al final.
+# Grado <= 2: fórmula cerrada vectorizada. Grado mayor: autovalores de las matrices
+# compañeras, agrupadas por grado efectivo y resueltas en una sola llamada por grupo.
+
+MAXIMUM = 1
+MINIMUM = -1
+INFLECTION = 0
+KIND_LABELS = {MAXIMUM: "máximo", MINIMUM: "mínimo", INFLECTION: "inflexión"}
+
+# Una raíz de multiplicidad m sale de los autovalores separada en ~eps^(1/m): una doble
+# como un par conjugado con |Im| ~ 1e-8, una triple a ~1e-5, una cuádruple a ~2e-4.
+# Las raíces casi reales a menos de CLUSTER_TOLERANCE (relativa, ~eps^(1/5)) que incluyen
+# algún par conjugado se reemplazan por su promedio, que está bien condicionado. Una doble
+# también puede salir como dos reales a ~sqrt(eps) de distancia: las raíces reales cercanas
+# se unen por debajo de DUPLICATE_TOLERANCE.
+CLUSTER_TOLERANCE = 1e-3
+DUPLICATE_TOLERANCE = 1e-6
+RESIDUAL_TOLERANCE = 1e-10  # |p(x)| relativo a sum(|c_i|·|x|^i)
+
+
+def as_coefficients(coeffs):
+    coeffs = np.atleast_2d(np.asarray(coeffs, dtype=float))
+    if coeffs.ndim != 2:
+        raise ValueError("Los coeficientes deben ser un arreglo (polinomios, grado + 1)")
+    return coeffs
+
+
+def polyval(coeffs, t):
+    # Horner por filas: t es (polinomios,) o (polinomios, k)
+    coeffs = as_coefficients(coeffs)
+    t = np.asarray(t, dtype=float)
+    column = t.ndim == 1
+    t = t[:, None] if column else t
+    result = np.zeros(np.broadcast_shapes(t.shape, (coeffs.shape[0], 1)))
+    for index in range(coeffs.shape[1]):
+        result = result * t + coeffs[:, index:index + 1]
+    return result[:, 0] if column else result
+
+
+def derivative(coeffs):
+    coeffs = as_coefficients(coeffs)
+    degree = coeffs.shape[1] - 1
+    if degree == 0:
+        return np.zeros_like(coeffs)
+    return coeffs[:, :-1] * np.arange(degree, 0, -1)
+
+
+def antiderivative(coeffs, constant=0.0):
+    # Primitiva con término independiente "constant" (escalar o por fila)
+    coeffs = as_coefficients(coeffs)
+    powers = np.arange(coeffs.shape[1], 0, -1)
+    constant = np.broadcast_to(np.asarray(constant, dtype=float), (coeffs.shape[0],))
+    return np.column_stack((coeffs / powers, constant))
+
+
+def _quadratic_roots(coeffs):
+    # Raíces complejas de a·t² + b·t + c (grado efectivo 0, 1 o 2), con la forma estable
+    # q = -(b + signo(b)·√Δ)/2 para evitar la cancelación
+    a, b, c = coeffs.T.astype(complex)
+    roots = np.full((coeffs.shape[0], 2), np.nan, dtype=complex)
+    quadratic = a != 0
+    linear = ~quadratic & (b != 0)
+
+    aq, bq, cq = a[quadratic], b[quadratic], c[quadratic]
+    root = np.sqrt(bq * bq - 4 * aq * cq)
+    sign = np.where((bq.real * root.real + bq.imag * root.imag) >= 0, 1.0, -1.0)
+    q = -0.5 * (bq + sign * root)
+    safe_q = np.where(q == 0, 1.0, q)
+    roots[quadratic, 0] = q / aq
+    roots[quadratic, 1] = np.where(q == 0, 0.0, cq / safe_q)
+    roots[linear, 0] = -c[linear] / b[linear]
+    return roots
+
+
+def roots(coeffs):
+    # Raíces complejas por fila: (polinomios, grado), NaN donde el grado efectivo es menor
+    coeffs = as_coefficients(coeffs)
+    count, width = coeffs.shape
+    degree = width - 1
+    if degree <= 2:
+        padded = np.zeros((count, 3))
+        padded[:, 3 - width:] = coeffs
+        return _quadratic_roots(padded)[:, :max(degree, 1)]
+
+    result = np.full((count, degree), np.nan, dtype=complex)
+    nonzero = coeffs != 0
+    leading = np.where(nonzero.any(axis=1), nonzero.argmax(axis=1), width)
+    effective = degree - leading
+    for current in np.unique(effective):
+        rows = np.flatnonzero(effective == current)
+        if current <= 0:
+            continue
+        block = coeffs[rows, width - current - 1:]
+        if current <= 2:
+            padded = np.zeros((rows.size, 3))
+            padded[:, 2 - current:] = block
+            result[rows, :current] = _quadratic_roots(padded)[:, :current]
+            continue
+        # Matriz compañera: primera fila -c[1:]/c[0], subdiagonal de unos
+        companion = np.zeros((rows.size, current, current))
+        companion[:, 0, :] = -block[:, 1:] / block[:, :1]
+        companion[:, np.arange(1, current), np.arange(current - 1)] = 1.0
+        result[rows, :current] = np.linalg.eigvals(companion)
+    return result
+
+
+def _group_starts(real, tolerance):
+    # True donde empieza un grupo nuevo: la raíz (ordenada) se aleja de la anterior
+    start = np.ones(real.shape, dtype=bool)
+    if real.shape[1] > 1:
+        with np.errstate(invalid="ignore"):
+            start[:, 1:] = ~(np.abs(np.diff(real, axis=1)) <= tolerance * np.maximum(1.0, np.abs(real[:, 1:])))
+    return start
+
+
+def _clusters(values):
+    # Agrupa las raíces casi reales y cercanas de cada fila; devuelve los promedios reales
+    # de cada grupo, ordenados y con NaN al final
+    count, width = values.shape
+    near_real = np.abs(values.imag) <= CLUSTER_TOLERANCE * np.maximum(1.0, np.abs(values))
+    order = np.argsort(np.where(near_real, values.real, np.nan), axis=1)
+    values = np.take_along_axis(np.where(near_real, values, np.nan), order, axis=1)
+    real = values.real
+    valid = ~np.isnan(real)
+    rows = np.broadcast_to(np.arange(count)[:, None], (count, width))
+
+    # Grupos amplios; los que no tienen ningún par conjugado son raíces reales distintas
+    # (los autovalores reales salen con Im exactamente 0) y solo se unen si casi coinciden
+    loose = _group_starts(real, CLUSTER_TOLERANCE)
+    group = np.cumsum(loose, axis=1) - 1
+    complex_group = np.zeros((count, width), dtype=bool)
+    np.logical_or.at(complex_group, (rows[valid], group[valid]), values.imag[valid] != 0)
+    tight = _group_starts(real, DUPLICATE_TOLERANCE)
+    group = np.cumsum(loose | (tight & ~np.take_along_axis(complex_group, group, axis=1)), axis=1) - 1
+
+    sums = np.zeros((count, width))
+    sizes = np.zeros((count, width))
+    np.add.at(sums, (rows[valid], group[valid]), real[valid])
+    np.add.at(sizes, (rows[valid], group[valid]), 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(sizes > 0, sums / sizes, np.nan)
+
+
+def real_roots(coeffs, t_min=-np.inf, t_max=np.inf):
+    # Raíces reales en [t_min, t_max] (escalares o por fila), ordenadas y sin repetir;
+    # una raíz múltiple aparece una sola vez
+    coeffs = as_coefficients(coeffs)
+    with span("raices.lote", polynomials=coeffs.shape[0]):
+        real = _clusters(roots(coeffs))
+        # Un par conjugado de verdad (p. ej. t² + 1e-9) no se anula en su parte real
+        x = np.nan_to_num(real)
+        residual = np.abs(polyval(coeffs, x))
+        bound = RESIDUAL_TOLERANCE * polyval(np.abs(coeffs), np.abs(x))
+        t_min = np.broadcast_to(np.asarray(t_min, dtype=float), (coeffs.shape[0],))[:, None]
+        t_max = np.broadcast_to(np.asarray(t_max, dtype=float), (coeffs.shape[0],))[:, None]
+        with np.errstate(invalid="ignore"):
+            keep = (residual <= bound) & (real >= t_min) & (real <= t_max)
+        # "+ 0.0" convierte -0.0 en 0.0
+        real = np.where(keep, real + 0.0, np.nan)
+        real.sort(axis=1)
+    return real
+
+
+def classify(velocity, critical):
+    # Tipo de cada punto crítico (filas ordenadas, NaN al final) según el signo de v a cada
+    # lado: en el punto medio con el crítico vecino; en los extremos, a la misma distancia
+    # que el vecino del otro lado (1 si es el único). velocity(puntos) evalúa v por filas
+    critical = np.atleast_2d(np.asarray(critical, dtype=float))
+    previous = np.column_stack((np.full(critical.shape[0], np.nan), critical[:, :-1]))
+    following = np.column_stack((critical[:, 1:], np.full(critical.shape[0], np.nan)))
+    gap = np.fmin(critical - previous, following - critical)
+    gap = np.where(np.isnan(gap), 1.0, gap)
+    left = np.where(np.isnan(previous), critical - gap, 0.5 * (previous + critical))
+    right = np.where(np.isnan(following), critical + gap, 0.5 * (critical + following))
+    with np.errstate(invalid="ignore"):
+        sign_left = np.sign(velocity(np.nan_to_num(left)))
+        sign_right = np.sign(velocity(np.nan_to_num(right)))
+    return np.where(
+        (sign_left > 0) & (sign_right < 0), MAXIMUM,
+        np.where((sign_left < 0) & (sign_right > 0), MINIMUM, INFLECTION),
+    ).astype(np.int8)
+
+
+def extrema(coeffs, t_min=-np.inf, t_max=np.inf):
+    # Puntos críticos de s(t) en la ventana: (instantes, valores, tipo MAXIMUM/MINIMUM/INFLECTION);
+    # donde no hay punto crítico el instante y el valor son NaN
+    coeffs = as_coefficients(coeffs)
+    velocity = derivative(coeffs)
+    critical = real_roots(velocity)
+    kind = classify(lambda points: polyval(velocity, points), critical)
+
+    t_min = np.broadcast_to(np.asarray(t_min, dtype=float), (coeffs.shape[0],))[:, None]
+    t_max = np.broadcast_to(np.asarray(t_max, dtype=float), (coeffs.shape[0],))[:, None]
+    with np.errstate(invalid="ignore"):
+        inside = (critical >= t_min) & (critical <= t_max)
+    times = np.where(inside, critical, np.nan)
+    order = np.argsort(times, axis=1)
+    times = np.take_along_axis(times, order, axis=1)
+    kind = np.take_along_axis(kind, order, axis=1)
+    missing = np.isnan(times)
+    kind[missing] = INFLECTION
+    values = polyval(coeffs, np.nan_to_num(times))
+    values[missing] = np.nan
+    return times, values, kind
+
+
+def total_distance(coeffs, t0, t1):
+    # Distancia recorrida en [t0, t1]: suma de |Δs| entre los cambios de signo de v(t)
+    coeffs = as_coefficients(coeffs)
+    count = coeffs.shape[0]
+    t0 = np.broadcast_to(np.asarray(t0, dtype=float), (count,))
+    t1 = np.broadcast_to(np.asarray(t1, dtype=float), (count,))
+    stops = real_roots(derivative(coeffs), t0, t1)
+    # Las paradas ausentes se reemplazan por t1: el tramo repetido suma cero
+    points = np.column_stack((t0, np.where(np.isnan(stops), t1[:, None], stops), t1))
+    points.sort(axis=1)
+    return np.abs(np.diff(polyval(coeffs, points), axis=1)).sum(axis=1)
+
+
+def coefficients(expr, symbol=None):
+    # Coeficientes numéricos de una expresión de SymPy (mayor a menor potencia) o None
+    # si no es un polinomio en t con coeficientes numéricos
+    from sympy import Poly, PolynomialError
+    from expr_cache import t
+
+    symbol = t if symbol is None else symbol
+    try:
+        poly = Poly(expr, symbol)
+    except PolynomialError:
+        return None
+    coeffs = poly.all_coeffs()
+    if not all(c.is_number and c.is_real for c in coeffs):
+        return None
+    return np.array([float(c) for c in coeffs])
+
+
+def stack(rows):
+    # Filas de distinto grado en un solo arreglo, rellenando con ceros a la izquierda
+    width = max(len(row) for row in rows)
+    result = np.zeros((len(rows), width))
+    for index, row in enumerate(rows):
+        result[index, width - len(row):] = row
+    return result
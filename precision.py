@@ -0,0 +1,163 @@
+import threading
+import types
+
+# Modos numéricos: se elige uno por cálculo según lo que haga falta mostrar
+EXACT = "exact"          # Racionales de SymPy: resultados exactos para el paso a paso
+FLOAT = "float"          # float64 con NumPy: el más rápido, para evaluación masiva
+MPMATH = "mpmath"        # Precisión arbitraria con mpmath
+INTERVAL = "interval"    # Aritmética de intervalos (mpmath.iv): cotas garantizadas del redondeo
+
+MODES = (EXACT, FLOAT, MPMATH, INTERVAL)
+LABELS = {
+    EXACT: "Exacta (racional)",
+    FLOAT: "Rápida (float64)",
+    MPMATH: "Arbitraria (mpmath)",
+    INTERVAL: "Intervalos (mpmath.iv)",
+}
+DEFAULT_DPS = 30
+
+
+def check_mode(mode):
+    if mode not in MODES:
+        raise ValueError(f"Modo de precisión desconocido: {mode}")
+    return mode
+
+
+def parse(text, mode=FLOAT, symbol=None):
+    # En los modos distintos de float, "4.9" se lee como 49/10 y no como un Float binario
+    from sympy import sympify
+    from expr_cache import t
+
+    symbol = t if symbol is None else symbol
+    return sympify(text, locals={str(symbol): symbol}, rational=check_mode(mode) != FLOAT)
+
+
+_contexts = threading.local()
+
+
+def _context(mode, dps):
+    # Contexto de mpmath propio de cada hilo y precisión. Cambiar mpmath.mp.dps o iv.dps
+    # (globales) desde el BackgroundRunner y los hilos del pool haría que dos evaluaciones
+    # simultáneas se pisaran la precisión
+    cache = getattr(_contexts, "cache", None)
+    if cache is None:
+        cache = _contexts.cache = {}
+    context = cache.get((mode, dps))
+    if context is None:
+        if mode == INTERVAL:
+            from mpmath.ctx_iv import MPIntervalContext
+
+            context = MPIntervalContext()
+        else:
+            from mpmath.ctx_mp import MPContext
+
+            context = MPContext()
+        context.dps = dps
+        cache[(mode, dps)] = context
+    return context
+
+
+def _bind(func, context):
+    # La misma función de lambdify con mpf, sqrt, pi, ... tomados del contexto indicado
+    names = {name: getattr(context, name) for name in func.__code__.co_names if hasattr(context, name)}
+    return types.FunctionType(func.__code__, {**func.__globals__, **names})
+
+
+def _in_context(func, mode, dps):
+    # Versión de func ligada al contexto del hilo que la llama (se liga una vez por contexto)
+    bound = {}
+
+    def call(*args):
+        context = _context(mode, dps)
+        func_in_context = bound.get(context)
+        if func_in_context is None:
+            func_in_context = bound[context] = _bind(func, context)
+        return func_in_context(*args)
+
+    return call
+
+
+def _interval_modules():
+    # lambdify genera mpf(49)/mpf(10): con iv.mpf cada operación redondea hacia afuera
+    from mpmath import iv
+
+    names = ("mpf", "sqrt", "exp", "log", "sin", "cos", "tan", "pi", "e")
+    return [{name: getattr(iv, name) for name in names}, "mpmath"]
+
+
+def evaluator(expr, mode=FLOAT, symbol=None, dps=DEFAULT_DPS):
+    # Devuelve f(valor) en el modo pedido; el valor puede ser un número o un valor de SymPy
+    from sympy import lambdify, nsimplify, sympify
+    from expr_cache import expression_cache, t
+
+    symbol = t if symbol is None else symbol
+    check_mode(mode)
+
+    if mode == FLOAT:
+        func = expression_cache.get(expr, symbol).func
+        return lambda value: float(func(float(value)))
+
+    if mode == EXACT:
+        return lambda value: expr.subs(symbol, nsimplify(sympify(value), rational=True))
+
+    if mode == MPMATH:
+        func = _in_context(lambdify(symbol, expr, "mpmath"), MPMATH, dps)
+        return lambda value: func(to_mpmath(value, dps))
+
+    func = _in_context(lambdify(symbol, expr, _interval_modules()), INTERVAL, dps)
+    return lambda value: func(to_interval(value, dps))
+
+
+def to_mpmath(value, dps=DEFAULT_DPS):
+    from sympy import Basic, N
+
+    context = _context(MPMATH, dps)
+    if isinstance(value, Basic):
+        return context.mpf(str(N(value, dps)))
+    return context.mpf(value)
+
+
+def to_interval(value, dps=DEFAULT_DPS):
+    # Intervalo que contiene al valor exacto (raíces simbólicas incluidas)
+    from sympy import Basic, lambdify
+
+    context = _context(INTERVAL, dps)
+    if isinstance(value, Basic):
+        return context.mpf(_bind(lambdify((), value, _interval_modules()), context)())
+    return context.mpf(value)
+
+
+def convert(value, mode=FLOAT, dps=DEFAULT_DPS):
+    # Lleva un valor de SymPy (por ejemplo una raíz exacta) al modo pedido
+    if check_mode(mode) == EXACT:
+        return value
+    if mode == MPMATH:
+        return to_mpmath(value, dps)
+    if mode == INTERVAL:
+        return to_interval(value, dps)
+    return float(value)
+
+
+def to_float(value):
+    # Valor float para gráficos y comparaciones, sea cual sea el modo
+    if hasattr(value, "_mpi_"):
+        return float(value.mid)
+    return float(value)
+
+
+def format_value(value, mode=FLOAT, dps=DEFAULT_DPS):
+    check_mode(mode)
+    if mode == EXACT:
+        from sympy import N
+
+        if getattr(value, "is_Integer", False):
+            return str(value)
+        return f"{value} ≈ {N(value, 15)}"
+    if mode in (MPMATH, INTERVAL):
+        context = _context(MPMATH, dps)
+        if mode == INTERVAL:
+            # Centro ± radio: el radio acota el error de redondeo acumulado
+            low, high = (context.mpf(end) for end in value._mpi_)
+            return f"{context.nstr((low + high) / 2, dps)} ± {context.nstr((high - low) / 2, 3)}"
+        return context.nstr(value, dps)
+    return str(float(value))
@@ -0,0 +1,334 @@
+from functools import lru_cache
+import numpy as np
+import precision
+import poly_roots
+import kinematics
+from instrumentation import span
+
+# Tipos de pregunta que entiende el motor
+VALUE_AT = "value_at"
+ROOT = "root"
+EXTREMUM = "extremum"
+INTEGRAL = "integral"
+TOTAL_DISTANCE = "total_distance"
+
+ANALYSIS_CACHE_SIZE = 256
+
+# Problemas predefinidos: agregar uno nuevo solo requiere una entrada aquí.
+# El formato es el mismo que acepta symbolic_pool ("given", "expression", "at", "interval", ...)
+PROBLEMS = [
+    {
+        "button": "Problema 1: Velocidad en t=3",
+        "title": "Problema 1: Resultado",
+        "given": "position",
+        "expression": "5*t**2 - 20*t + 50",
+        "question": VALUE_AT,
+        "at": 3,
+    },
+    {
+        "button": "Problema 2: Objeto detenido",
+        "title": "Problema 2: Resultado",
+        "given": "position",
+        "expression": "-4.9*t**2 + 19.6*t",
+        "question": ROOT,
+    },
+    {
+        "button": "Problema 3: Altura máxima",
+        "title": "Problema 3: Resultado",
+        "given": "position",
+        "expression": "-4.9*t**2 + 30*t + 10",
+        "question": EXTREMUM,
+    },
+    {
+        "button": "Problema 4: Aceleración constante",
+        "title": "Problema 4: Resultado",
+        "given": "velocity",
+        "expression": "8*t - 16",
+        "initial_position": 5,
+        "question": INTEGRAL,
+    },
+    {
+        "button": "Problema 5: Distancia total",
+        "title": "Problema 5: Resultado",
+        "given": "position",
+        "expression": "3*t**2 - 12*t + 20",
+        "question": TOTAL_DISTANCE,
+        "interval": (0, 4),
+    },
+]
+
+
+def real_roots(roots):
+    # Raíces reales ordenadas, como pares (raíz simbólica, valor float)
+    values = []
+    for root in roots:
+        value = complex(root.evalf())
+        if abs(value.imag) < 1e-12:
+            values.append((root, value.real))
+    return sorted(values, key=lambda pair: pair[1])
+
+
+def equations(problem, mode=precision.FLOAT):
+    # (dato, s(t), v(t)) del problema, derivando o integrando lo que se dio
+    from expr_cache import expression_cache
+
+    given = problem.get("given", "position")
+    expr = precision.parse(problem["expression"], mode)
+
+    if given == "position":
+        position_eq = expr
+        velocity_eq = expression_cache.get(position_eq).derivative
+    elif given == "velocity":
+        velocity_eq = expr
+        position_eq = expression_cache.get(velocity_eq).integral + precision.parse(
+            str(problem.get("initial_position", 0)), mode
+        )
+    else:
+        raise ValueError(f"Tipo de problema desconocido: {given}")
+    return given, position_eq, velocity_eq
+
+
+def analyze(problem, mode=precision.FLOAT):
+    # Trabajo simbólico común a todas las preguntas: se hace una sola vez por problema.
+    # El modo decide cómo se leen los coeficientes y cómo se evalúan las respuestas.
+    # El análisis depende solo del dato, la expresión y la posición inicial: se memoriza
+    # con esa clave y repetir un cálculo no vuelve a pasar por SymPy
+    key = (
+        problem.get("given", "position"),
+        problem["expression"],
+        str(problem.get("initial_position", 0)),
+        precision.check_mode(mode),
+    )
+    return dict(_analyze(*key))
+
+
+def invalidate():
+    # Vacía los análisis memorizados (para medir en frío, junto con expression_cache)
+    _analyze.cache_clear()
+
+
+@lru_cache(maxsize=ANALYSIS_CACHE_SIZE)
+def _analyze(given, expression, initial_position, mode):
+    from expr_cache import expression_cache
+
+    problem = {"given": given, "expression": expression, "initial_position": initial_position}
+    given, position_eq, velocity_eq = equations(problem, mode)
+    position_entry = expression_cache.get(position_eq)
+    velocity_entry = expression_cache.get(velocity_eq)
+    acceleration_eq = velocity_entry.derivative
+    acceleration_func = expression_cache.get(acceleration_eq).func
+
+    # En float64, el MRUV estándar se evalúa con el núcleo cerrado de kinematics (sin
+    # lambdify); las demás expresiones y los otros modos usan las funciones de la caché
+    # "standard" guarda (x0, v0, a) para las respuestas que tienen fórmula cerrada
+    standard = kinematics.standard_coefficients(position_eq) if mode == precision.FLOAT else None
+    if mode == precision.FLOAT:
+        position_func, velocity_func = kinematics.motion_functions(position_eq)
+    else:
+        position_func, velocity_func = position_entry.func, velocity_entry.func
+
+    # En float64, un polinomio numérico se resuelve con poly_roots (sin sympy.solve);
+    # los modos exactos conservan las raíces simbólicas
+    coeffs = poly_roots.coefficients(position_eq) if mode == precision.FLOAT else None
+    if coeffs is not None:
+        times, _, kinds = poly_roots.extrema(coeffs)
+        found = ~np.isnan(times[0])
+        stop_times = [(value, value) for value in times[0][found].tolist()]
+        stop_kinds = kinds[0][found].tolist()
+        zero_times = [(value, value) for value in poly_roots.real_roots(coeffs)[0].tolist() if value == value]
+    else:
+        stop_times = real_roots(velocity_entry.roots)
+        # Mismo criterio que poly_roots.extrema: signo de v a cada lado de la parada
+        # (el signo de a(t) no distingue, p. ej., el mínimo de (t-1)**4 de una inflexión)
+        stop_kinds = []
+        if stop_times:
+            stop_kinds = poly_roots.classify(velocity_entry.func, [value for _, value in stop_times])[0].tolist()
+        zero_times = real_roots(position_entry.roots)
+
+    return {
+        "given": given,
+        "mode": mode,
+        "position_eq": position_eq,
+        "velocity_eq": velocity_eq,
+        "acceleration_eq": acceleration_eq,
+        # Texto de cada ecuación, impreso una sola vez (sstr pesa más que el resto de la respuesta)
+        "position_text": str(position_eq),
+        "velocity_text": str(velocity_eq),
+        "acceleration_text": str(acceleration_eq),
+        "position_func": position_func,
+        "velocity_func": velocity_func,
+        "acceleration_func": acceleration_func,
+        "standard": standard,
+        "stop_times": stop_times,
+        "stop_kinds": stop_kinds,
+        "zero_times": zero_times,
+        # Evaluación de las respuestas en el modo elegido (los gráficos siguen en float64)
+        "position_value": precision.evaluator(position_eq, mode),
+        "velocity_value": precision.evaluator(velocity_eq, mode),
+    }
+
+
+def segments(analysis, t0, t1):
+    # Tramos entre cambios de signo de v(t) dentro de [t0, t1], evaluados en una sola llamada
+    inner = [value for _, value in analysis["stop_times"] if t0 < value < t1]
+    points = np.array([t0] + inner + [t1], dtype=float)
+    distances = np.abs(np.diff(analysis["position_func"](points)))
+    return points, distances
+
+
+def mode_segments(analysis, t0, t1):
+    # Igual que segments, pero evaluando cada extremo en el modo del análisis;
+    # los puntos críticos se usan como raíces exactas y no como floats
+    if analysis["mode"] == precision.FLOAT:
+        return segments(analysis, t0, t1)
+    inner = [root for root, value in analysis["stop_times"] if t0 < value < t1]
+    points = [precision.parse(str(t0), analysis["mode"])] + inner + [precision.parse(str(t1), analysis["mode"])]
+    values = [analysis["position_value"](point) for point in points]
+    distances = [abs(end - start) for start, end in zip(values[:-1], values[1:])]
+    return points, distances
+
+
+def _format(analysis, value):
+    return precision.format_value(value, analysis["mode"])
+
+
+def _format_time(analysis, root):
+    # Las raíces se muestran exactas en modo exacto y como valor numérico en los demás
+    return _format(analysis, precision.convert(root, analysis["mode"]))
+
+
+def _derivation_steps(analysis):
+    return (
+        f"Paso 1: Derivar la función de posición s(t) = {analysis['position_text']}\n"
+        f"Resultado: v(t) = {analysis['velocity_text']}\n"
+    )
+
+
+def _value_at(problem, analysis):
+    t_val = problem["at"]
+    if problem.get("quantity", "velocity") == "position":
+        value = analysis["position_value"](t_val)
+        steps = f"Paso 2: Sustituir t={t_val} en s(t)\nPosición en t={t_val}: {_format(analysis, value)} m"
+    else:
+        value = analysis["velocity_value"](t_val)
+        steps = f"Paso 2: Sustituir t={t_val} en v(t)\nVelocidad en t={t_val}: {_format(analysis, value)} m/s"
+    return _derivation_steps(analysis) + steps, t_val, value
+
+
+def _root(problem, analysis):
+    stop_times = analysis["stop_times"]
+    if not stop_times:
+        raise ValueError("La velocidad nunca se anula")
+    times = ", ".join(_format_time(analysis, root) for root, _ in stop_times)
+    steps = (
+        f"Paso 2: Resolver v(t) = 0\n"
+        f"Tiempo en que el objeto se detiene: t = {times} s"
+    )
+    return _derivation_steps(analysis) + steps, stop_times[0][1], stop_times[0][1]
+
+
+def _extremum(problem, analysis):
+    # Primer punto crítico que es máximo o mínimo (las paradas de inflexión no cuentan)
+    extrema = [
+        (stop, kind) for stop, kind in zip(analysis["stop_times"], analysis["stop_kinds"])
+        if kind != poly_roots.INFLECTION
+    ]
+    if not extrema:
+        raise ValueError("La función de posición no tiene extremos")
+    (root, t_star), kind = extrema[0]
+    value = analysis["position_value"](root)
+    kind = "máxima" if kind == poly_roots.MAXIMUM else "mínima"
+    steps = (
+        f"Paso 2: Resolver v(t) = 0 para encontrar el tiempo de altura {kind}\n"
+        f"Tiempo: t = {_format_time(analysis, root)} s\n"
+        f"Paso 3: Sustituir t en s(t) para calcular la altura {kind}\n"
+        f"Altura {kind}: {_format(analysis, value)} m"
+    )
+    return _derivation_steps(analysis) + steps, t_star, value
+
+
+def _integral(problem, analysis):
+    steps = (
+        f"Paso 1: Derivar la función de velocidad v(t) = {analysis['velocity_text']}\n"
+        f"Resultado: a(t) = {analysis['acceleration_text']}\n"
+        f"Paso 2: Integrar v(t) para encontrar la posición s(t)\n"
+        f"Función de posición: s(t) = {analysis['position_text']}"
+    )
+    return steps, None, analysis["position_eq"]
+
+
+def _total_distance(problem, analysis):
+    t0, t1 = problem["interval"]
+    points, distances = mode_segments(analysis, t0, t1)
+    critical_points = ", ".join(
+        _format_time(analysis, root) for root, value in analysis["stop_times"] if t0 < value < t1
+    )
+
+    lines = [
+        "Paso 2: Encontrar los puntos críticos donde v(t) cambia de signo",
+        f"Puntos críticos en [{t0}, {t1}]: {critical_points or 'ninguno'}",
+        "Paso 3: Calcular las distancias absolutas entre los tramos:",
+    ]
+    lines += [
+        f"Distancia entre t={precision.to_float(start):g} y t={precision.to_float(end):g}: "
+        f"{_format(analysis, distance)} m"
+        for start, end, distance in zip(points[:-1], points[1:], distances)
+    ]
+    if analysis["standard"] is not None:
+        # MRUV estándar en float64: núcleo cerrado de kinematics (parte en la parada si cae dentro)
+        total = float(kinematics.distance(*analysis["standard"], float(t0), float(t1)))
+    else:
+        total = sum(distances[1:], distances[0])
+    steps = "\n".join(lines) + f"\n\nDistancia total recorrida: {_format(analysis, total)} m"
+    return _derivation_steps(analysis) + steps, None, total
+
+
+_ANSWERS = {
+    VALUE_AT: _value_at,
+    ROOT: _root,
+    EXTREMUM: _extremum,
+    INTEGRAL: _integral,
+    TOTAL_DISTANCE: _total_distance,
+}
+
+
+def solve(problem, mode=precision.FLOAT):
+    # Ejecuta un problema del registro: respuesta, texto paso a paso y datos del gráfico.
+    # mode: precision.EXACT / FLOAT / MPMATH / INTERVAL
+    question = problem["question"]
+    if question not in _ANSWERS:
+        raise ValueError(f"Tipo de pregunta desconocido: {question}")
+
+    with span("problema.analizar", mode=mode):
+        analysis = analyze(problem, mode)
+    with span("problema.respuesta", question=question):
+        step_by_step, highlight_t, answer = _ANSWERS[question](problem, analysis)
+
+    if analysis["given"] == "velocity":
+        constant = "" if analysis["acceleration_eq"].free_symbols else " (constante)"
+        header = (
+            f"Función de velocidad: v(t) = {analysis['velocity_text']}\n"
+            f"Aceleración: a(t) = {analysis['acceleration_text']}{constant}\n"
+            f"Función de posición: s(t) = {analysis['position_text']}\n"
+        )
+    else:
+        header = (
+            f"Función de posición: s(t) = {analysis['position_text']}\n"
+            f"Función de velocidad: v(t) = {analysis['velocity_text']}\n"
+        )
+
+    # Instantes notables para elegir el rango del gráfico: paradas, cruces por cero y t pedido
+    key_times = [value for _, value in analysis["stop_times"]]
+    key_times += [value for _, value in analysis["zero_times"]]
+    key_times += [value for value in (highlight_t, *problem.get("interval", ())) if value is not None]
+
+    return {
+        "title": problem.get("title", "Resultado"),
+        "text": header + step_by_step,
+        "answer": answer,
+        "position_eq": analysis["position_eq"],
+        "velocity_eq": analysis["velocity_eq"],
+        "highlight_t": highlight_t,
+        "key_times": key_times,
+        "mode": mode,
+    }
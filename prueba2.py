@@ -1,21 +1,39 @@
 import tkinter as tk
 from tkinter import messagebox
-from sympy import symbols, diff, lambdify, solve, integrate
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from PIL import Image, ImageTk
-import threading
-import time
+import sys
+from sampling import SamplingEngine, as_numeric, as_state
+from background import BackgroundRunner
+from plotting import IncrementalPlot
+from animation import sprite
+from startup import StartupReport, warm_up
+from instrumentation import install, profiler, trace_path
+import problems
+import precision
 
-# Definimos símbolos para sympy
-t = symbols('t')
 
 class MRUVApp:
-    def __init__(self, root):
+    def __init__(self, root, startup=None):
         self.root = root
+        self.startup = startup or StartupReport()
         self.root.title("Aplicación MRUV y Derivadas")
 
+        # Muestreo adaptativo para los gráficos (0 a 5 segundos como mínimo)
+        self.sampler = SamplingEngine(t_start=0.0, t_end=5.0, adaptive=True)
+
+        # Ejecución en segundo plano para no bloquear la ventana
+        self.runner = BackgroundRunner(self.root)
+
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        # Ventana de rendimiento (F12) con los tiempos de cada etapa
+        self.performance = install(self.root, sys.argv)
+        self.startup.mark("ventana creada")
+        self.root.after_idle(self.start_warm_up)
+
+    def on_close(self):
+        # Al cerrar la ventana se apaga el trabajador: Python espera a sus hilos al salir
+        self.runner.shutdown()
+        self.root.destroy()
 
     def setup_ui(self):
         # Crear diseño
@@ -25,224 +43,158 @@ class MRUVApp:
         frame_results = tk.Frame(self.root, padx=10, pady=10)
         frame_results.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
+        # Modo numérico: exacto para el paso a paso, float64 o mpmath según convenga
+        tk.Label(frame_inputs, text="Precisión:").pack(anchor="w")
+        self.precision_mode = tk.StringVar(value=precision.LABELS[precision.EXACT])
+        tk.OptionMenu(
+            frame_inputs, self.precision_mode, *(precision.LABELS[mode] for mode in precision.MODES)
+        ).pack(anchor="w", fill=tk.X)
+
         # Botones para problemas
         tk.Label(frame_inputs, text="Problemas predefinidos:").pack(anchor="w")
-        tk.Button(frame_inputs, text="Problema 1: Velocidad en t=3", command=self.solve_problem1).pack(anchor="w")
-        tk.Button(frame_inputs, text="Problema 2: Objeto detenido", command=self.solve_problem2).pack(anchor="w")
-        tk.Button(frame_inputs, text="Problema 3: Altura máxima", command=self.solve_problem3).pack(anchor="w")
-        tk.Button(frame_inputs, text="Problema 4: Aceleración constante", command=self.solve_problem4).pack(anchor="w")
-        tk.Button(frame_inputs, text="Problema 5: Distancia total", command=self.solve_problem5).pack(anchor="w")
-
-        # Canvas para gráficos
-        self.figure = plt.Figure(figsize=(5, 4), dpi=100)
-        self.ax = self.figure.add_subplot(111)
-        self.canvas = FigureCanvasTkAgg(self.figure, master=frame_results)
-        self.canvas.get_tk_widget().pack()
+        for problem in problems.PROBLEMS:
+            tk.Button(
+                frame_inputs, text=problem["button"], command=lambda p=problem: self.solve_problem(p)
+            ).pack(anchor="w")
+
+        # Canvas para gráficos (la figura se crea después de mostrar la ventana)
+        self.plot_frame = tk.Frame(frame_results, width=500, height=400)
+        self.plot_frame.pack()
+        self.plot = None
 
         # Simulador de animación
         self.simulator_frame = tk.Frame(frame_results)
         self.simulator_frame.pack()
         self.sim_canvas = tk.Canvas(self.simulator_frame, width=500, height=100, bg="white")
         self.sim_canvas.pack()
-        self.car_image = ImageTk.PhotoImage(Image.open("car.png").resize((50, 30)))
-        self.car = self.sim_canvas.create_image(0, 50, anchor=tk.NW, image=self.car_image)
-
-    def solve_problem1(self):
-        # Problema 1: Velocidad en t=3
-        try:
-            position_eq = 5 * t**2 - 20 * t + 50
-            velocity_eq = diff(position_eq, t)
-
-            velocity_func = lambdify(t, velocity_eq)
-            vel_at_3 = velocity_func(3)
-
-            step_by_step = (
-                f"Paso 1: Derivar la función de posición s(t) = {position_eq}\n"
-                f"Resultado: v(t) = {velocity_eq}\n"
-                f"Paso 2: Sustituir t=3 en v(t)\n"
-                f"Velocidad en t=3: {vel_at_3} m/s"
-            )
-
-            result_text = (
-                f"Función de posición: s(t) = {position_eq}\n"
-                f"Función de velocidad: v(t) = {velocity_eq}\n"
-                f"{step_by_step}"
-            )
-
-            self.plot_graph(position_eq, velocity_eq, highlight_t=3)
-            messagebox.showinfo("Problema 1: Resultado", result_text)
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Ocurrió un error: {e}")
-
-    def solve_problem2(self):
-        # Problema 2: Momento en que el objeto se detiene
-        try:
-            position_eq = -4.9 * t**2 + 19.6 * t
-            velocity_eq = diff(position_eq, t)
-
-            stop_time = solve(velocity_eq, t)
-
-            step_by_step = (
-                f"Paso 1: Derivar la función de posición s(t) = {position_eq}\n"
-                f"Resultado: v(t) = {velocity_eq}\n"
-                f"Paso 2: Resolver v(t) = 0\n"
-                f"Tiempo en que el objeto se detiene: t = {stop_time} s"
-            )
-
-            result_text = (
-                f"Función de posición: s(t) = {position_eq}\n"
-                f"Función de velocidad: v(t) = {velocity_eq}\n"
-                f"{step_by_step}"
-            )
-
-            self.plot_graph(position_eq, velocity_eq, highlight_t=stop_time[0])
-            messagebox.showinfo("Problema 2: Resultado", result_text)
+        self.car = None
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Ocurrió un error: {e}")
+    def start_warm_up(self):
+        # La ventana ya está visible: SymPy, Matplotlib y PIL se cargan en segundo plano
+        self.startup.mark("ventana visible")
+        self.runner.submit("warmup", warm_up, self.finish_warm_up, self.warm_up_failed)
 
-    def solve_problem3(self):
-        # Problema 3: Máxima altura de un proyectil
-        try:
-            position_eq = -4.9 * t**2 + 30 * t + 10
-            velocity_eq = diff(position_eq, t)
-
-            max_height_time = solve(velocity_eq, t)[0]
-            position_func = lambdify(t, position_eq)
-            max_height = position_func(max_height_time)
-
-            step_by_step = (
-                f"Paso 1: Derivar la función de posición s(t) = {position_eq}\n"
-                f"Resultado: v(t) = {velocity_eq}\n"
-                f"Paso 2: Resolver v(t) = 0 para encontrar el tiempo de altura máxima\n"
-                f"Tiempo: t = {max_height_time} s\n"
-                f"Paso 3: Sustituir t en s(t) para calcular la altura máxima\n"
-                f"Altura máxima: {max_height} m"
-            )
-
-            result_text = (
-                f"Función de posición: s(t) = {position_eq}\n"
-                f"Función de velocidad: v(t) = {velocity_eq}\n"
-                f"{step_by_step}"
-            )
-
-            self.plot_graph(position_eq, velocity_eq, highlight_t=max_height_time)
-            messagebox.showinfo("Problema 3: Resultado", result_text)
+    def warm_up_failed(self, error):
+        print(f"Error en la precarga: {error}", file=sys.stderr)
+        self.finish_warm_up({})
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Ocurrió un error: {e}")
-
-    def solve_problem4(self):
-        # Problema 4: Aceleración constante
+    def finish_warm_up(self, timings):
+        self.startup.imports = timings
         try:
-            velocity_eq = 8 * t - 16
-            acceleration_eq = diff(velocity_eq, t)
-
-            position_eq = integrate(velocity_eq, t) + 5
-
-            step_by_step = (
-                f"Paso 1: Derivar la función de velocidad v(t) = {velocity_eq}\n"
-                f"Resultado: a(t) = {acceleration_eq}\n"
-                f"Paso 2: Integrar v(t) para encontrar la posición s(t)\n"
-                f"Función de posición: s(t) = {position_eq}"
-            )
-
-            result_text = (
-                f"Función de velocidad: v(t) = {velocity_eq}\n"
-                f"Aceleración: a(t) = {acceleration_eq} (constante)\n"
-                f"Función de posición: s(t) = {position_eq}\n"
-                f"{step_by_step}"
-            )
-
-            self.plot_graph(position_eq, velocity_eq)
-            messagebox.showinfo("Problema 4: Resultado", result_text)
-
+            self.ensure_plot()
+            self.ensure_car()
         except Exception as e:
-            messagebox.showerror("Error", f"Ocurrió un error: {e}")
-
-    def solve_problem5(self):
-        # Problema 5: Distancia recorrida en un intervalo
+            print(f"Error en la precarga: {e}", file=sys.stderr)
+        self.startup.mark("precarga completa")
+        if "--startup-report" in sys.argv:
+            self.startup.print()
+
+    def ensure_plot(self):
+        # La figura se crea al terminar la precarga o en el primer gráfico
+        if self.plot is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+            self.figure = Figure(figsize=(5, 4), dpi=100)
+            self.ax = self.figure.add_subplot(111)
+            self.canvas = FigureCanvasTkAgg(self.figure, master=self.plot_frame)
+            self.canvas.get_tk_widget().pack()
+            # Artistas persistentes: cada gráfico nuevo solo actualiza sus datos
+            self.plot = IncrementalPlot(self.ax, self.canvas)
+        return self.plot
+
+    def ensure_car(self):
+        # El sprite sale de la caché compartida: car.png se abre y se escala una sola vez
+        if self.car is None:
+            self.car_image = sprite(self.sim_canvas)
+            self.car = self.sim_canvas.create_image(0, 50, anchor=tk.NW, image=self.car_image)
+        return self.car
+
+    def selected_mode(self):
+        label = self.precision_mode.get()
+        return next(mode for mode in precision.MODES if precision.LABELS[mode] == label)
+
+    def solve_problem(self, problem):
+        # El cálculo simbólico y el muestreo se hacen en segundo plano;
+        # el gráfico y el mensaje se muestran al volver al hilo de Tk
+        self.runner.submit(
+            "problem",
+            self._compute_problem,
+            self._show_problem,
+            lambda e: messagebox.showerror("Error", f"Ocurrió un error: {e}"),
+            problem,
+            self.selected_mode(),
+        )
+
+    @profiler.traced("solve_problem")
+    def _compute_problem(self, problem, mode):
+        result = problems.solve(problem, mode)
+        # s y v salen de un solo núcleo compilado a partir de la posición
+        plot_data = self.prepare_plot(
+            None, None, result["highlight_t"],
+            t_range=self.sampler.auto_range(result["key_times"]),
+            state=result["position_eq"],
+        )
+        return result, plot_data
+
+    def _show_problem(self, computed):
+        result, plot_data = computed
+        self.draw_plot(plot_data)
+        messagebox.showinfo(result["title"], result["text"])
+
+    @profiler.traced("plot_graph")
+    def plot_graph(self, position_eq, velocity_eq, highlight_t=None, t_range=None, state=None):
         try:
-            position_eq = 3 * t**2 - 12 * t + 20
-            velocity_eq = diff(position_eq, t)
-
-            critical_points = solve(velocity_eq, t)
-            critical_points = [p for p in critical_points if 0 <= p <= 4]
-
-            position_func = lambdify(t, position_eq)
-
-            distance = 0
-            last_point = 0
-            for point in critical_points + [4]:
-                distance += abs(position_func(point) - position_func(last_point))
-                last_point = point
-
-            step_by_step = (
-                f"Paso 1: Derivar la función de posición s(t) = {position_eq}\n"
-                f"Resultado: v(t) = {velocity_eq}\n"
-                f"Paso 2: Encontrar los puntos críticos donde v(t) cambia de signo"
-                f"Puntos críticos en [0, 4]: {critical_points}"
-                f"Paso 3: Calcular las distancias absolutas entre los tramos:"
-            )
-
-            last_point = 0
-            detailed_distances = []
-            for point in critical_points + [4]:
-                segment_distance = abs(position_func(point) - position_func(last_point))
-                detailed_distances.append(
-                    f"Distancia entre t={last_point} y t={point}: {segment_distance} m"
-                )
-                distance += segment_distance
-                last_point = point
-
-            step_by_step += "\n".join(detailed_distances)
-            step_by_step += f"\n\nDistancia total recorrida: {distance} m"
-
-            result_text = (
-                f"Función de posición: s(t) = {position_eq}\n"
-                f"Función de velocidad: v(t) = {velocity_eq}\n"
-                f"{step_by_step}"
-            )
-
-            self.plot_graph(position_eq, velocity_eq)
-            messagebox.showinfo("Problema 5: Resultado", result_text)
-
+            self.draw_plot(self.prepare_plot(position_eq, velocity_eq, highlight_t, t_range, state))
         except Exception as e:
-            messagebox.showerror("Error", f"Ocurrió un error: {e}")
-
-    def plot_graph(self, position_eq, velocity_eq, highlight_t=None):
-        try:
-            self.ax.clear()
-
-            position_func = lambdify(t, position_eq)
-            velocity_func = lambdify(t, velocity_eq)
-
-            t_vals = [i * 0.1 for i in range(0, 51)]  # Intervalo de tiempo de 0 a 5 segundos
-            position_vals = [position_func(i) for i in t_vals]
-            velocity_vals = [velocity_func(i) for i in t_vals]
-
-            self.ax.plot(t_vals, position_vals, label="s(t): Posición", color="blue")
-            self.ax.plot(t_vals, velocity_vals, label="v(t): Velocidad", color="red")
+            messagebox.showerror("Error", f"Error al graficar: {e}")
 
+    @profiler.traced("prepare_plot")
+    def prepare_plot(self, position_eq, velocity_eq, highlight_t=None, t_range=None, state=None):
+        # Parte numérica del gráfico: se puede ejecutar fuera del hilo de Tk
+        if state is not None:
+            # Núcleo fusionado: s, v y a salen de una sola evaluación por malla
+            state = as_state(state)
+            t_vals, (position_vals, velocity_vals) = self.sampler.sample_state(state, t_range)
+            plot_data = {"t": t_vals, "position": position_vals, "velocity": velocity_vals, "highlight_t": highlight_t}
             if highlight_t is not None:
-                pos_highlight = position_func(highlight_t)
-                vel_highlight = velocity_func(highlight_t)
-                self.ax.scatter([highlight_t], [pos_highlight], color="blue", label=f"s({highlight_t})")
-                self.ax.scatter([highlight_t], [vel_highlight], color="red", label=f"v({highlight_t})")
-
-            self.ax.axhline(0, color="black", linewidth=0.5, linestyle="--")
-            self.ax.set_xlabel("Tiempo (t)")
-            self.ax.set_ylabel("Magnitud")
-            self.ax.legend()
-            self.ax.grid()
-            self.canvas.draw()
-
+                position, velocity, _ = state(highlight_t)
+                plot_data["position_highlight"] = float(position)
+                plot_data["velocity_highlight"] = float(velocity)
+            return plot_data
+
+        position_func = as_numeric(position_eq)
+        velocity_func = as_numeric(velocity_eq)
+
+        # Malla común refinada solo donde las curvas lo necesitan
+        t_vals, (position_vals, velocity_vals) = self.sampler.sample_curves(
+            [position_func, velocity_func], t_range
+        )
+
+        plot_data = {
+            "t": t_vals,
+            "position": position_vals,
+            "velocity": velocity_vals,
+            "highlight_t": highlight_t,
+        }
+        if highlight_t is not None:
+            plot_data["position_highlight"] = float(position_func(highlight_t))
+            plot_data["velocity_highlight"] = float(velocity_func(highlight_t))
+        return plot_data
+
+    @profiler.traced("draw_plot")
+    def draw_plot(self, plot_data):
+        try:
+            self.ensure_plot().update(plot_data)
         except Exception as e:
             messagebox.showerror("Error", f"Error al graficar: {e}")
 
 # Crear la aplicación tkinter
 if __name__ == "__main__":
+    startup = StartupReport()
     root = tk.Tk()
-    app = MRUVApp(root)
+    app = MRUVApp(root, startup)
     root.mainloop()
+    # Con "--trace archivo.json" se guarda la sesión en formato Chrome trace
+    if trace_path(sys.argv):
+        profiler.dump_chrome_trace(trace_path(sys.argv))
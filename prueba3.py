@@ -1,18 +1,26 @@
 import tkinter as tk
 from tkinter import messagebox, filedialog
-from sympy import symbols, diff, lambdify
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from PIL import Image, ImageTk
-import threading
-import time
+import sys
+from sampling import SamplingEngine, as_numeric, as_state
+from background import BackgroundRunner
+from live_inputs import Throttle, ParameterPanel
+from plotting import IncrementalPlot
+from startup import StartupReport, warm_up
+from instrumentation import install, profiler, trace_path
+from animation import CarAnimation, sprite
+import exporting
+from exporting import ExportCancelled, ExportProgress, ProgressPanel
+import kinematics
+import ode
+
+# Modelo elegido en el menú (se muestra la etiqueta) -> clave del modelo en ode
+MODEL_KEYS = {label: model for model, label in ode.LABELS.items()}
 
-# Definimos símbolos para sympy
-t = symbols('t')
 
 class MRUVApp:
-    def __init__(self, root):
+    def __init__(self, root, startup=None):
         self.root = root
+        self.startup = startup or StartupReport()
         self.root.title("Aplicación MRUV y Derivadas")
         
         # Variables de entrada
@@ -21,8 +29,38 @@ class MRUVApp:
         self.a = tk.DoubleVar()
         self.t = tk.DoubleVar()
         self.selected_formula = tk.StringVar(value="Posición")
+        # Modelo de aceleración: constante (forma cerrada) o integrado numéricamente
+        self.selected_model = tk.StringVar(value=ode.LABELS[ode.CONSTANT])
+        self.k = tk.DoubleVar(value=0.1)
+        self.live_mode = tk.BooleanVar(value=True)
+
+        # Muestreo adaptativo para los gráficos (0 a 5 segundos como mínimo)
+        self.sampler = SamplingEngine(t_start=0.0, t_end=5.0, adaptive=True)
+
+        # Ejecución en segundo plano; un cambio en las entradas descarta el cálculo pendiente
+        self.runner = BackgroundRunner(self.root)
+        # Las exportaciones usan su propio trabajador para no retrasar los cálculos
+        self.export_runner = BackgroundRunner(self.root)
+        self.last_plot_data = None
+        # Recalculo en vivo del gráfico: una vez por cuadro, con los valores más recientes
+        self.live_throttle = Throttle(self.root, self.live_update)
+        for var in (self.x0, self.v0, self.a, self.t, self.k, self.selected_formula, self.selected_model):
+            var.trace_add("write", self.on_input_change)
 
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        # Ventana de rendimiento (F12) con los tiempos de cada etapa
+        self.performance = install(self.root, sys.argv)
+        self.startup.mark("ventana creada")
+        self.root.after_idle(self.start_warm_up)
+
+    def on_close(self):
+        # Al cerrar la ventana se cancela el trabajo largo y se apagan los trabajadores: Python
+        # espera a sus hilos al salir y el proceso seguiría vivo hasta que terminaran
+        self.export_panel.cancel()
+        for runner in (self.runner, self.export_runner):
+            runner.shutdown()
+        self.root.destroy()
 
     def setup_ui(self):
         # Crear diseño
@@ -40,62 +78,112 @@ class MRUVApp:
         # Entradas de valores
         self.inputs_frame = tk.Frame(frame_inputs)
         self.inputs_frame.pack(anchor="w", pady=10)
+        self.parameter_panel = ParameterPanel(
+            self.inputs_frame,
+            {"x0": self.x0, "v0": self.v0, "a": self.a, "t": self.t},
+            {"x0": (-100, 100), "v0": (-50, 50), "a": (-20, 20), "t": (0, self.sampler.t_end)},
+            {
+                "Posición": [
+                    ("x0", "Posición inicial (x0):"),
+                    ("v0", "Velocidad inicial (v0):"),
+                    ("a", "Aceleración (a):"),
+                    ("t", "Tiempo (t):"),
+                ],
+                "Velocidad": [
+                    ("v0", "Velocidad inicial (v0):"),
+                    ("a", "Aceleración (a):"),
+                    ("t", "Tiempo (t):"),
+                ],
+                "Aceleración": [
+                    ("a", "Aceleración constante (a):"),
+                ],
+            },
+        )
         self.update_inputs("Posición")
 
+        # Aceleración no constante: a(t, x, v) se integra con RK45 en lugar de la fórmula cerrada
+        tk.Label(frame_inputs, text="Modelo de aceleración:").pack(anchor="w")
+        tk.OptionMenu(frame_inputs, self.selected_model, *ode.LABELS.values()).pack(anchor="w")
+        tk.Label(frame_inputs, text="Coeficiente (k):").pack(anchor="w")
+        tk.Entry(frame_inputs, textvariable=self.k).pack(anchor="w")
+        tk.Checkbutton(frame_inputs, text="Actualizar gráfico en vivo", variable=self.live_mode).pack(anchor="w")
+
         # Botón para calcular
         tk.Button(frame_inputs, text="Calcular", command=self.calculate).pack(pady=10)
 
-        # Canvas para gráficos
-        self.figure = plt.Figure(figsize=(5, 4), dpi=100)
-        self.ax = self.figure.add_subplot(111)
-        self.canvas = FigureCanvasTkAgg(self.figure, master=frame_results)
-        self.canvas.get_tk_widget().pack()
+        # Canvas para gráficos (la figura se crea después de mostrar la ventana)
+        self.plot_frame = tk.Frame(frame_results, width=500, height=400)
+        self.plot_frame.pack()
+        self.plot = None
 
         # Simulador de animación
         self.simulator_frame = tk.Frame(frame_results)
         self.simulator_frame.pack()
         self.sim_canvas = tk.Canvas(self.simulator_frame, width=500, height=100, bg="white")
         self.sim_canvas.pack()
-        self.car_image = ImageTk.PhotoImage(Image.open("car.png").resize((50, 30)))
-        self.car = self.sim_canvas.create_image(0, 50, anchor=tk.NW, image=self.car_image)
+        self.car = None
+        self.animation = CarAnimation(self.root, self.sim_canvas, self.car, fps=60, y=50)
+        self.fps_label = tk.Label(self.simulator_frame, text="")
+        self.fps_label.pack(anchor="e")
 
         # Botón para exportar resultados
         tk.Button(frame_inputs, text="Exportar Gráfico", command=self.export_graph).pack(pady=5)
 
-    def update_inputs(self, formula):
-        for widget in self.inputs_frame.winfo_children():
-            widget.destroy()
-
-        if formula == "Posición":
-            tk.Label(self.inputs_frame, text="Posición inicial (x0):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.x0).pack(anchor="w")
-
-            tk.Label(self.inputs_frame, text="Velocidad inicial (v0):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.v0).pack(anchor="w")
+        # Progreso de la exportación en curso (oculto mientras no hay ninguna)
+        self.export_panel = ProgressPanel(frame_inputs, self.root)
 
-            tk.Label(self.inputs_frame, text="Aceleración (a):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.a).pack(anchor="w")
+    def start_warm_up(self):
+        # La ventana ya está visible: SymPy, Matplotlib y PIL se cargan en segundo plano
+        self.startup.mark("ventana visible")
+        self.runner.submit("warmup", warm_up, self.finish_warm_up, self.warm_up_failed)
 
-            tk.Label(self.inputs_frame, text="Tiempo (t):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.t).pack(anchor="w")
-        elif formula == "Velocidad":
-            tk.Label(self.inputs_frame, text="Velocidad inicial (v0):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.v0).pack(anchor="w")
+    def warm_up_failed(self, error):
+        print(f"Error en la precarga: {error}", file=sys.stderr)
+        self.finish_warm_up({})
 
-            tk.Label(self.inputs_frame, text="Aceleración (a):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.a).pack(anchor="w")
+    def finish_warm_up(self, timings):
+        self.startup.imports = timings
+        try:
+            self.ensure_plot()
+            self.ensure_car()
+        except Exception as e:
+            print(f"Error en la precarga: {e}", file=sys.stderr)
+        self.startup.mark("precarga completa")
+        if "--startup-report" in sys.argv:
+            self.startup.print()
+
+    def ensure_plot(self):
+        # La figura se crea al terminar la precarga o en el primer gráfico
+        if self.plot is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+            self.figure = Figure(figsize=(5, 4), dpi=100)
+            self.ax = self.figure.add_subplot(111)
+            self.canvas = FigureCanvasTkAgg(self.figure, master=self.plot_frame)
+            self.canvas.get_tk_widget().pack()
+            # Artistas persistentes: cada gráfico nuevo solo actualiza sus datos
+            self.plot = IncrementalPlot(self.ax, self.canvas)
+        return self.plot
+
+    def ensure_car(self):
+        # El sprite sale de la caché compartida: car.png se abre y se escala una sola vez
+        if self.car is None:
+            self.car_image = sprite(self.sim_canvas)
+            self.car = self.sim_canvas.create_image(0, 50, anchor=tk.NW, image=self.car_image)
+        return self.car
 
-            tk.Label(self.inputs_frame, text="Tiempo (t):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.t).pack(anchor="w")
-        elif formula == "Aceleración":
-            tk.Label(self.inputs_frame, text="Aceleración constante (a):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.a).pack(anchor="w")
+    def update_inputs(self, formula):
+        # Las filas se reutilizan: solo cambia cuáles se muestran
+        self.parameter_panel.show(formula)
 
     def calculate(self):
         try:
             formula = self.selected_formula.get()
 
-            if formula == "Posición":
+            if self.model() != ode.CONSTANT:
+                self.solve_model(formula)
+            elif formula == "Posición":
                 self.solve_position()
             elif formula == "Velocidad":
                 self.solve_velocity()
@@ -105,6 +193,7 @@ class MRUVApp:
         except Exception as e:
             messagebox.showerror("Error", f"Entrada no válida: {e}")
 
+    @profiler.traced("solve_position")
     def solve_position(self):
         try:
             x0 = self.x0.get()
@@ -112,14 +201,12 @@ class MRUVApp:
             a = self.a.get()
             t_val = self.t.get()
 
-            position_eq = x0 + v0 * t + 0.5 * a * t**2
-            velocity_eq = diff(position_eq, t)
+            # Forma estándar del MRUV: se evalúa con el núcleo numérico, sin SymPy
+            position_eq = kinematics.format_position(x0, v0, a)
+            velocity_eq = kinematics.format_velocity(v0, a)
 
-            position_func = lambdify(t, position_eq)
-            velocity_func = lambdify(t, velocity_eq)
-
-            pos = position_func(t_val)
-            vel = velocity_func(t_val)
+            pos = kinematics.position(x0, v0, a, t_val)
+            vel = kinematics.velocity(v0, a, t_val)
 
             step_by_step = (
                 f"Paso 1: Ecuación de posición -> s(t) = {position_eq}\n"
@@ -128,22 +215,31 @@ class MRUVApp:
                 f"Posición: {pos:.2f} m, Velocidad: {vel:.2f} m/s"
             )
 
-            self.plot_graph(position_eq, velocity_eq, highlight_t=t_val)
-            messagebox.showinfo("Resultado: Posición", step_by_step)
+            # Animación del auto de 0 a t (o en todo el rango del gráfico si t = 0)
+            duration = t_val if t_val > 0 else self.sampler.t_end
+            self.animate_car(kinematics.position_function(x0, v0, a), duration)
+
+            self.show_result(
+                "Resultado: Posición",
+                step_by_step,
+                highlight_t=t_val,
+                t_range=self.sampler.auto_range(kinematics.key_times(x0, v0, a) + [t_val]),
+                state=kinematics.state_function(x0, v0, a),
+            )
 
         except Exception as e:
             messagebox.showerror("Error", f"Error en cálculo: {e}")
 
+    @profiler.traced("solve_velocity")
     def solve_velocity(self):
         try:
             v0 = self.v0.get()
             a = self.a.get()
             t_val = self.t.get()
 
-            velocity_eq = v0 + a * t
+            velocity_eq = kinematics.format_velocity(v0, a)
 
-            velocity_func = lambdify(t, velocity_eq)
-            vel = velocity_func(t_val)
+            vel = kinematics.velocity(v0, a, t_val)
 
             step_by_step = (
                 f"Paso 1: Ecuación de velocidad -> v(t) = {velocity_eq}\n"
@@ -151,80 +247,264 @@ class MRUVApp:
                 f"Velocidad: {vel:.2f} m/s"
             )
 
-            self.plot_graph(velocity_eq, diff(velocity_eq, t), highlight_t=t_val)
-            messagebox.showinfo("Resultado: Velocidad", step_by_step)
+            self.show_result(
+                "Resultado: Velocidad",
+                step_by_step,
+                kinematics.velocity_function(v0, a),
+                kinematics.acceleration_function(a),
+                highlight_t=t_val,
+                t_range=self.sampler.auto_range([kinematics.stop_time(v0, a), t_val]),
+            )
 
         except Exception as e:
             messagebox.showerror("Error", f"Error en cálculo: {e}")
 
+    @profiler.traced("solve_acceleration")
     def solve_acceleration(self):
         try:
             a = self.a.get()
             step_by_step = f"La aceleración es constante y su valor es {a:.2f} m/s²"
+            self.runner.cancel("calculate")
             messagebox.showinfo("Resultado: Aceleración", step_by_step)
 
         except Exception as e:
             messagebox.showerror("Error", f"Error en cálculo: {e}")
-    def plot_graph(self, position_eq=None, velocity_eq=None, highlight_t=None):
+
+    def model(self):
+        return MODEL_KEYS[self.selected_model.get()]
+
+    @profiler.traced("solve_model")
+    def solve_model(self, formula):
         try:
-            self.ax.clear()
-
-            if position_eq:
-                position_func = lambdify(t, position_eq)
-                t_vals = [i * 0.1 for i in range(0, 51)]
-                position_vals = [position_func(i) for i in t_vals]
-                self.ax.plot(t_vals, position_vals, label="s(t): Posición", color="blue")
-
-            if velocity_eq:
-                velocity_func = lambdify(t, velocity_eq)
-                t_vals = [i * 0.1 for i in range(0, 51)]
-                velocity_vals = [velocity_func(i) for i in t_vals]
-                self.ax.plot(t_vals, velocity_vals, label="v(t): Velocidad", color="red")
-
-            if highlight_t is not None:
-                if position_eq:
-                    pos_highlight = position_func(highlight_t)
-                    self.ax.scatter([highlight_t], [pos_highlight], color="blue", label=f"s({highlight_t})")
-                if velocity_eq:
-                    vel_highlight = velocity_func(highlight_t)
-                    self.ax.scatter([highlight_t], [vel_highlight], color="red", label=f"v({highlight_t})")
-
-            self.ax.axhline(0, color="black", linewidth=0.5, linestyle="--")
-            self.ax.set_xlabel("Tiempo (t)")
-            self.ax.set_ylabel("Magnitud")
-            self.ax.legend()
-            self.ax.grid()
-            self.canvas.draw()
+            model = self.model()
+            a = self.a.get()
+            k = self.k.get()
+            if formula == "Aceleración":
+                self.runner.cancel("calculate")
+                messagebox.showinfo(
+                    "Resultado: Aceleración",
+                    f"La aceleración no es constante: {ode.LABELS[model]} con a={a:.2f}, k={k:.2f}",
+                )
+                return
+
+            # En la fórmula de velocidad no se pide x0: la trayectoria parte de 0
+            x0 = self.x0.get() if formula == "Posición" else 0.0
+            v0 = self.v0.get()
+            t_val = self.t.get()
+            self.runner.submit(
+                "calculate",
+                self.prepare_model_plot,
+                self.show_model_result,
+                lambda e: messagebox.showerror("Error", f"Error en la integración: {e}"),
+                formula, model, x0, v0, a, k, t_val,
+            )
 
+        except Exception as e:
+            messagebox.showerror("Error", f"Error en cálculo: {e}")
+
+    @profiler.traced("prepare_model_plot")
+    def prepare_model_plot(self, formula, model, x0, v0, a, k, t_val):
+        # Integración y muestreo en segundo plano; la salida densa de la trayectoria alimenta el gráfico
+        t_range = self.sampler.auto_range([t_val])
+        # auto_range se limita a MAX_RANGE_FACTOR × t_end, pero el resultado y la animación
+        # necesitan la trayectoria hasta t_val
+        trajectory = ode.solve_model(model, x0, v0, a, k, t_range[0], max(t_val, t_range[1]))
+        if formula == "Posición":
+            plot_data = self.prepare_plot(highlight_t=t_val, t_range=t_range, state=trajectory.state)
+        else:
+            plot_data = self.prepare_plot(
+                trajectory.velocity, trajectory.acceleration, highlight_t=t_val, t_range=t_range
+            )
+        return formula, model, t_val, trajectory, plot_data
+
+    def show_model_result(self, result):
+        formula, model, t_val, trajectory, plot_data = result
+        self.draw_plot(plot_data)
+
+        if formula == "Posición":
+            duration = t_val if t_val > 0 else self.sampler.t_end
+            self.animate_car(trajectory.position, duration)
+            values = (
+                f"Posición: {float(trajectory.position(t_val)):.2f} m, "
+                f"Velocidad: {float(trajectory.velocity(t_val)):.2f} m/s"
+            )
+        else:
+            values = (
+                f"Velocidad: {float(trajectory.velocity(t_val)):.2f} m/s, "
+                f"Aceleración: {float(trajectory.acceleration(t_val)):.2f} m/s²"
+            )
+        step_by_step = (
+            f"Paso 1: Modelo de aceleración -> {ode.LABELS[model]}\n"
+            f"Paso 2: Integrar con {trajectory.method.upper()} en [{trajectory.t[0]:g}, {trajectory.t[-1]:g}] s "
+            f"({trajectory.steps} pasos)\n"
+            f"Paso 3: Evaluar en t={t_val}\n"
+            f"{values}"
+        )
+        messagebox.showinfo(f"Resultado: {formula}", step_by_step)
+
+    def on_input_change(self, *args):
+        self.runner.cancel("calculate")
+        if self.live_mode.get():
+            self.live_throttle.trigger()
+
+    def live_update(self):
+        # Solo redibuja el gráfico, sin mensajes; las entradas incompletas se ignoran
+        try:
+            x0 = self.x0.get()
+            v0 = self.v0.get()
+            a = self.a.get()
+            t_val = self.t.get()
+            k = self.k.get()
+        except tk.TclError:
+            return
+
+        formula = self.selected_formula.get()
+        model = self.model()
+        if model != ode.CONSTANT:
+            if formula != "Aceleración":
+                self.runner.submit(
+                    "live",
+                    self.prepare_model_plot,
+                    lambda result: self.draw_plot(result[-1]),
+                    None,
+                    formula, model, x0 if formula == "Posición" else 0.0, v0, a, k, t_val,
+                )
+            return
+        if formula == "Posición":
+            # s y v salen del núcleo fusionado
+            curves = (None, None)
+            key_times = kinematics.key_times(x0, v0, a)
+        elif formula == "Velocidad":
+            curves = (kinematics.velocity_function(v0, a), kinematics.acceleration_function(a))
+            key_times = [kinematics.stop_time(v0, a)]
+        else:
+            return
+
+        t_range = self.sampler.auto_range(key_times + [t_val])
+        state = kinematics.state_function(x0, v0, a) if formula == "Posición" else None
+        self.runner.submit("live", self.prepare_plot, self.draw_plot, None, *curves, t_val, t_range, state)
+
+    def show_result(self, title, step_by_step, position_eq=None, velocity_eq=None, highlight_t=None,
+                    t_range=None, state=None):
+        # El muestreo se hace en segundo plano; el gráfico y el mensaje vuelven al hilo de Tk
+        def on_done(plot_data):
+            self.draw_plot(plot_data)
+            messagebox.showinfo(title, step_by_step)
+
+        self.runner.submit(
+            "calculate",
+            self.prepare_plot,
+            on_done,
+            lambda e: messagebox.showerror("Error", f"Error al graficar: {e}"),
+            position_eq,
+            velocity_eq,
+            highlight_t,
+            t_range,
+            state,
+        )
+
+    @profiler.traced("plot_graph")
+    def plot_graph(self, position_eq=None, velocity_eq=None, highlight_t=None, t_range=None, state=None):
+        try:
+            self.draw_plot(self.prepare_plot(position_eq, velocity_eq, highlight_t, t_range, state))
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al graficar: {e}")
+
+    @profiler.traced("prepare_plot")
+    def prepare_plot(self, position_eq=None, velocity_eq=None, highlight_t=None, t_range=None, state=None):
+        # Parte numérica del gráfico: se puede ejecutar fuera del hilo de Tk
+        plot_data = {"highlight_t": highlight_t}
+        if state is not None:
+            return self.prepare_state_plot(plot_data, as_state(state), highlight_t, t_range)
+        position_func = as_numeric(position_eq) if position_eq else None
+        velocity_func = as_numeric(velocity_eq) if velocity_eq else None
+
+        # Malla común refinada solo donde las curvas lo necesitan
+        plot_data["t"], (plot_data["position"], plot_data["velocity"]) = self.sampler.sample_curves(
+            [position_func, velocity_func], t_range
+        )
+
+        if highlight_t is not None:
+            if position_func is not None:
+                plot_data["position_highlight"] = float(position_func(highlight_t))
+            if velocity_func is not None:
+                plot_data["velocity_highlight"] = float(velocity_func(highlight_t))
+
+        return plot_data
+
+    def prepare_state_plot(self, plot_data, state, highlight_t=None, t_range=None):
+        # Núcleo fusionado: s, v y a salen de una sola evaluación por malla
+        plot_data["t"], (plot_data["position"], plot_data["velocity"]) = self.sampler.sample_state(state, t_range)
+        if highlight_t is not None:
+            position, velocity, _ = state(highlight_t)
+            plot_data["position_highlight"] = float(position)
+            plot_data["velocity_highlight"] = float(velocity)
+        return plot_data
+
+    @profiler.traced("draw_plot")
+    def draw_plot(self, plot_data):
+        try:
+            self.ensure_plot().update(plot_data)
+            self.last_plot_data = plot_data
         except Exception as e:
             messagebox.showerror("Error", f"Error al graficar: {e}")
 
     def export_graph(self):
         try:
+            if self.last_plot_data is None:
+                raise ValueError("Todavía no hay un gráfico para exportar")
+            if self.export_panel.active:
+                messagebox.showinfo("Exportación en curso", "Espere a que termine la exportación actual o cancélela.")
+                return
             filepath = filedialog.asksaveasfilename(
                 defaultextension=".png",
-                filetypes=[("PNG files", "*.png"), ("All files", "*.*")]
+                filetypes=[("PNG files", "*.png"), ("SVG files", "*.svg"), ("PDF files", "*.pdf"), ("All files", "*.*")]
             )
             if filepath:
-                self.figure.savefig(filepath)
-                messagebox.showinfo("Éxito", f"Gráfico exportado con éxito a: {filepath}")
+                # La figura se vuelve a generar con Agg en el trabajador: la ventana no se congela
+                progress = ExportProgress()
+                self.export_panel.start(progress)
+                self.export_runner.submit(
+                    "export",
+                    exporting.export_graph,
+                    self.finish_export,
+                    self.export_failed,
+                    self.last_plot_data, filepath, None, (), progress,
+                )
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo exportar el gráfico: {e}")
 
-    def animate_car(self, velocity):
-        try:
-            self.sim_canvas.coords(self.car, 0, 50)  # Reset car position
-            distance = 0
+    def finish_export(self, filepath):
+        self.export_panel.finish()
+        messagebox.showinfo("Éxito", f"Gráfico exportado con éxito a: {filepath}")
+
+    def export_failed(self, error):
+        self.export_panel.finish()
+        if isinstance(error, ExportCancelled):
+            messagebox.showinfo("Exportación cancelada", "La exportación se canceló.")
+        else:
+            messagebox.showerror("Error", f"No se pudo exportar el gráfico: {error}")
 
-            for _ in range(100):
-                distance += velocity * 0.1  # Simular movimiento
-                self.sim_canvas.coords(self.car, distance, 50)
-                time.sleep(0.1)
+    @profiler.traced("animate_car")
+    def animate_car(self, position_func, duration):
+        try:
+            # Recorre s(t) real en tiempo real, a la tasa de cuadros objetivo
+            self.animation.item = self.ensure_car()
+            self.animation.start(position_func, duration, on_finish=self.report_animation)
         except Exception as e:
             print(f"Error en animación: {e}")
 
+    def report_animation(self, animation):
+        self.fps_label.config(
+            text=f"FPS: {animation.achieved_fps():.1f} ({animation.frames_dropped} cuadros descartados)"
+        )
+
 if __name__ == "__main__":
+    startup = StartupReport()
     root = tk.Tk()
-    app = MRUVApp(root)
+    app = MRUVApp(root, startup)
     root.mainloop()
+    # Con "--trace archivo.json" se guarda la sesión en formato Chrome trace
+    if trace_path(sys.argv):
+        profiler.dump_chrome_trace(trace_path(sys.argv))
 
@@ -1,18 +1,49 @@
 import tkinter as tk
 from tkinter import messagebox, filedialog
-from sympy import symbols, diff, lambdify, solve
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from PIL import Image, ImageTk
-import json
+import sys
+import threading
 import os
+import numpy as np
+from sampling import SamplingEngine, as_numeric, as_state
+import kinematics
+from batch_solver import REQUIRED_FIELDS, format_result, solve_entry
+from history_store import HistoryStore
+from history_table import HistoryTable
+from background import BackgroundRunner
+from live_inputs import Throttle, ParameterPanel
+from plotting import IncrementalPlot, ComparisonPlot
+from animation import FleetAnimation
+import exporting
+from trajectory_file import TrajectoryFile
+from exporting import ExportCancelled, ExportProgress, ProgressPanel
+from startup import StartupReport, warm_up
+from instrumentation import install, profiler, span, trace_path
+
+# Estilo del gráfico, compartido por la figura en pantalla y las exportadas
+PLOT_STYLE = {
+    "velocity_color": "green",
+    "highlight_format": "{:.1f}",
+    "title": "Gráfico MRUV",
+    "xlabel": "Tiempo (s)",
+    "ylabel": "Valor",
+    "vertical_axis": True,
+}
+
+# Entradas visibles en la lista del historial (las más recientes) y filtros disponibles
+HISTORY_LIST_SIZE = 200
+HISTORY_FILTERS = ("Todas", "position", "velocity", "acceleration", "Parámetros actuales")
+
+# Modo comparación: muestras por trayectoria y máximo de trayectorias por barrido
+SWEEP_SAMPLES = 400
+MAX_SWEEP_TRAJECTORIES = 2000
+# Carrera: autos animados a la vez (uno por valor del barrido)
+MAX_RACERS = 25
 
-# Definimos símbolos para sympy
-t, x = symbols('t x')
 
 class MRUVApp:
-    def __init__(self, root):
+    def __init__(self, root, startup=None):
         self.root = root
+        self.startup = startup or StartupReport()
         self.root.title("Aplicación MRUV y Derivadas")
 
         # Variables
@@ -21,9 +52,53 @@ class MRUVApp:
         self.a = tk.DoubleVar()
         self.time = tk.DoubleVar()
         self.selected_formula = tk.StringVar(value="position")
-        self.history = []  # Historial de resultados
+        self.live_mode = tk.BooleanVar(value=True)
+        self.sweep_parameter = tk.StringVar(value="a")
+        self.sweep_spread = tk.DoubleVar(value=5.0)
+        self.sweep_count = tk.IntVar(value=200)
+        self.figure_format = tk.StringVar(value="png")
+        self.last_plot_data = None
+        # Archivo binario de trayectorias abierto con memmap (solo se leen las filas que se usan)
+        self.trajectory_file = None
+        self.trajectory_index = tk.IntVar(value=0)
+        self.history = HistoryStore("history.jsonl")  # Historial de resultados (solo se añade al final)
+        # Copia en memoria por columnas para consultas; se carga en segundo plano al iniciar
+        self.history_table = None
+        self.pending_history = []  # (entrada, desplazamiento) guardadas durante la carga
+        self.history_filter = tk.StringVar(value="Todas")
+        self.history_rows = []
+
+        # Muestreo adaptativo para los gráficos (0 a 10 segundos como mínimo)
+        self.sampler = SamplingEngine(t_start=0.0, t_end=10.0, adaptive=True)
+
+        # Ejecución en segundo plano; un cambio en las entradas descarta el cálculo pendiente
+        self.runner = BackgroundRunner(self.root)
+        # Las exportaciones usan su propio trabajador para no retrasar los cálculos
+        self.export_runner = BackgroundRunner(self.root)
+        # La carga del historial crece con el archivo (segundos con cientos de miles de
+        # entradas): va aparte para que "Calcular" y la vista en vivo no esperen detrás
+        self.history_runner = BackgroundRunner(self.root)
+        self.history_cancel = threading.Event()
+        # Recalculo en vivo del gráfico: una vez por cuadro, con los valores más recientes
+        self.live_throttle = Throttle(self.root, self.live_update)
+        for var in (self.x0, self.v0, self.a, self.time, self.selected_formula):
+            var.trace_add("write", self.on_input_change)
 
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        # Ventana de rendimiento (F12) con los tiempos de cada etapa
+        self.performance = install(self.root, sys.argv)
+        self.startup.mark("ventana creada")
+        self.root.after_idle(self.start_warm_up)
+
+    def on_close(self):
+        # Al cerrar la ventana se cancela el trabajo largo y se apagan los trabajadores: Python
+        # espera a sus hilos al salir y el proceso seguiría vivo hasta que terminaran
+        self.export_panel.cancel()
+        self.history_cancel.set()
+        for runner in (self.runner, self.export_runner, self.history_runner):
+            runner.shutdown()
+        self.root.destroy()
 
     def setup_ui(self):
         # Crear diseño
@@ -42,204 +117,548 @@ class MRUVApp:
         # Entradas dinámicas
         self.inputs_frame = tk.Frame(frame_inputs)
         self.inputs_frame.pack(anchor="w")
+        self.parameter_panel = ParameterPanel(
+            self.inputs_frame,
+            {"x0": self.x0, "v0": self.v0, "a": self.a, "time": self.time},
+            {"x0": (-100, 100), "v0": (-50, 50), "a": (-20, 20), "time": (0, self.sampler.t_end)},
+            {
+                "position": [
+                    ("x0", "Posición inicial (x0):"),
+                    ("v0", "Velocidad inicial (v0):"),
+                    ("a", "Aceleración (a):"),
+                    ("time", "Tiempo (t):"),
+                ],
+                "velocity": [
+                    ("v0", "Velocidad inicial (v0):"),
+                    ("a", "Aceleración (a):"),
+                    ("time", "Tiempo (t):"),
+                ],
+                "acceleration": [
+                    ("a", "Aceleración constante (a):"),
+                ],
+            },
+        )
 
         self.update_inputs()
+        tk.Checkbutton(frame_inputs, text="Actualizar gráfico en vivo", variable=self.live_mode).pack(anchor="w")
 
         # Botón para calcular
         tk.Button(frame_inputs, text="Calcular", command=self.calculate).pack(pady=10)
 
+        # Modo comparación: barrido de un parámetro alrededor del valor actual
+        sweep_frame = tk.LabelFrame(frame_inputs, text="Comparación (barrido)", padx=5, pady=5)
+        sweep_frame.pack(anchor="w", fill=tk.X)
+        tk.Radiobutton(sweep_frame, text="Aceleración (a)", variable=self.sweep_parameter, value="a").pack(anchor="w")
+        tk.Radiobutton(sweep_frame, text="Velocidad inicial (v0)", variable=self.sweep_parameter, value="v0").pack(anchor="w")
+        tk.Label(sweep_frame, text="Variación (±):").pack(anchor="w")
+        tk.Entry(sweep_frame, textvariable=self.sweep_spread).pack(anchor="w")
+        tk.Label(sweep_frame, text="Trayectorias:").pack(anchor="w")
+        tk.Entry(sweep_frame, textvariable=self.sweep_count).pack(anchor="w")
+        tk.Button(sweep_frame, text="Agregar barrido", command=self.add_sweep).pack(anchor="w", pady=2)
+        tk.Button(sweep_frame, text="Limpiar comparación", command=self.clear_sweeps).pack(anchor="w")
+        tk.Button(sweep_frame, text="Carrera", command=self.race_sweep).pack(anchor="w", pady=2)
+
+        # Trayectorias precalculadas (batch_solver.py --trajectories)
+        trajectories_frame = tk.LabelFrame(frame_inputs, text="Trayectorias (archivo)", padx=5, pady=5)
+        trajectories_frame.pack(anchor="w", fill=tk.X)
+        tk.Button(trajectories_frame, text="Abrir archivo", command=self.open_trajectories).pack(anchor="w")
+        self.trajectory_label = tk.Label(trajectories_frame, text="Ningún archivo abierto", justify=tk.LEFT)
+        self.trajectory_label.pack(anchor="w")
+        self.trajectory_spinbox = tk.Spinbox(trajectories_frame, from_=0, to=0, textvariable=self.trajectory_index, width=10)
+        self.trajectory_spinbox.pack(anchor="w")
+        tk.Button(trajectories_frame, text="Graficar", command=self.plot_trajectory).pack(side=tk.LEFT)
+        tk.Button(trajectories_frame, text="Animar", command=self.animate_trajectories).pack(side=tk.LEFT)
+
         # Botón para exportar gráficos
         tk.Button(frame_inputs, text="Exportar Gráfico", command=self.export_graph).pack(pady=5)
 
         # Botón para exportar historial
         tk.Button(frame_inputs, text="Exportar Historial", command=self.export_history).pack(pady=5)
-
-        # Canvas para gráficos
-        self.figure = plt.Figure(figsize=(5, 4), dpi=100)
-        self.ax = self.figure.add_subplot(111)
-        self.canvas = FigureCanvasTkAgg(self.figure, master=frame_results)
-        self.canvas.get_tk_widget().pack()
+        tk.Button(frame_inputs, text="Resumen del Historial", command=self.show_history_summary).pack(pady=5)
+
+        # Historial: doble clic en una entrada la vuelve a graficar sin recalcular
+        history_frame = tk.LabelFrame(frame_results, text="Historial", padx=5, pady=5)
+        history_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        tk.OptionMenu(
+            history_frame, self.history_filter, *HISTORY_FILTERS,
+            command=lambda _: self.refresh_history_list(),
+        ).pack(anchor="w")
+        list_frame = tk.Frame(history_frame)
+        list_frame.pack(fill=tk.X)
+        scrollbar = tk.Scrollbar(list_frame)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.history_list = tk.Listbox(list_frame, height=6, yscrollcommand=scrollbar.set)
+        self.history_list.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        scrollbar.config(command=self.history_list.yview)
+        self.history_list.bind("<Double-Button-1>", self.replay_history)
+        self.history_status = tk.Label(history_frame, text="Cargando historial...", justify=tk.LEFT, anchor="w")
+        self.history_status.pack(fill=tk.X)
+
+        # Exportación masiva: un gráfico por entrada del historial
+        figures_frame = tk.Frame(frame_inputs)
+        figures_frame.pack(pady=5)
+        tk.OptionMenu(figures_frame, self.figure_format, *exporting.FIGURE_FORMATS).pack(side=tk.LEFT)
+        tk.Button(figures_frame, text="Exportar Gráficos del Historial", command=self.export_history_figures).pack(side=tk.LEFT)
+
+        # Progreso de la exportación en curso (oculto mientras no hay ninguna)
+        self.export_panel = ProgressPanel(frame_inputs, self.root)
+
+        # Canvas para gráficos (la figura se crea después de mostrar la ventana)
+        self.plot_frame = tk.Frame(frame_results, width=500, height=400)
+        self.plot_frame.pack()
+        self.plot = None
 
         # Simulador de animación
         self.simulator_frame = tk.Frame(frame_results)
         self.simulator_frame.pack()
         self.sim_canvas = tk.Canvas(self.simulator_frame, width=500, height=100, bg="white")
         self.sim_canvas.pack()
-        self.car_image = ImageTk.PhotoImage(Image.open("car.png").resize((50, 30)))
-        self.car = self.sim_canvas.create_image(0, 50, anchor=tk.NW, image=self.car_image)
-
-    def update_inputs(self):
-        for widget in self.inputs_frame.winfo_children():
-            widget.destroy()
-
-        if self.selected_formula.get() == "position":
-            tk.Label(self.inputs_frame, text="Posición inicial (x0):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.x0).pack(anchor="w")
-
-            tk.Label(self.inputs_frame, text="Velocidad inicial (v0):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.v0).pack(anchor="w")
-
-            tk.Label(self.inputs_frame, text="Aceleración (a):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.a).pack(anchor="w")
-
-            tk.Label(self.inputs_frame, text="Tiempo (t):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.time).pack(anchor="w")
-
-        elif self.selected_formula.get() == "velocity":
-            tk.Label(self.inputs_frame, text="Velocidad inicial (v0):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.v0).pack(anchor="w")
-
-            tk.Label(self.inputs_frame, text="Aceleración (a):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.a).pack(anchor="w")
-
-            tk.Label(self.inputs_frame, text="Tiempo (t):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.time).pack(anchor="w")
+        self.car = None
+        self.fleet = FleetAnimation(self.root, self.sim_canvas, fps=60)
+        self.fps_label = tk.Label(self.simulator_frame, text="")
+        self.fps_label.pack(anchor="e")
+
+    def start_warm_up(self):
+        # La ventana ya está visible: SymPy, Matplotlib y PIL se cargan en segundo plano
+        self.startup.mark("ventana visible")
+        self.runner.submit("warmup", warm_up, self.finish_warm_up, self.warm_up_failed)
+
+    def warm_up_failed(self, error):
+        print(f"Error en la precarga: {error}", file=sys.stderr)
+        self.finish_warm_up({})
+
+    def finish_warm_up(self, timings):
+        self.startup.imports = timings
+        try:
+            self.ensure_plot()
+            self.ensure_car()
+        except Exception as e:
+            print(f"Error en la precarga: {e}", file=sys.stderr)
+        self.load_history_table()
+        self.startup.mark("precarga completa")
+        if "--startup-report" in sys.argv:
+            self.startup.print()
+
+    def load_history_table(self):
+        # Se lee el archivo hasta su tamaño actual; lo que se guarde mientras tanto queda pendiente
+        end = self.history.size()
+        self.history_runner.submit(
+            "history",
+            HistoryTable.from_store,
+            self.history_table_ready,
+            self.history_table_failed,
+            self.history,
+            end,
+            self.history_cancel,
+        )
+
+    def history_table_ready(self, table, error=None):
+        for entry, offset in self.pending_history:
+            table.append(entry, offset)
+        self.pending_history = []
+        self.history_table = table
+        status = f"{len(table)} entradas"
+        if table.skipped:
+            status += f" ({table.skipped} inválidas omitidas)"
+        if error is not None:
+            status += f"\nError al cargar el historial: {error}"
+        self.history_status.config(text=status)
+        self.refresh_history_list()
+
+    def history_table_failed(self, error):
+        # Sin tabla la sesión quedaría "cargando" para siempre: se sigue con una tabla vacía
+        # más lo guardado durante la carga
+        print(f"Error al cargar el historial: {error}", file=sys.stderr)
+        self.history_table_ready(HistoryTable(), error)
+
+    def refresh_history_list(self):
+        table = self.history_table
+        if table is None:
+            return
+        history_filter = self.history_filter.get()
+        if history_filter == "Parámetros actuales":
+            try:
+                formula, x0, v0, a, _ = self.read_inputs()
+            except tk.TclError:
+                return
+            rows = table.find(formula, x0, v0, a)
+        else:
+            rows = table.select(None if history_filter == "Todas" else history_filter)
+
+        # Solo las más recientes, de la última a la primera
+        self.history_rows = rows[::-1][:HISTORY_LIST_SIZE].tolist()
+        self.history_list.delete(0, tk.END)
+        for row in self.history_rows:
+            self.history_list.insert(tk.END, self.describe_history_row(row))
+
+    def describe_history_row(self, row):
+        entry = self.history_table.entry(row)
+        if entry["formula"] == "position":
+            return f"#{row + 1}  s(t) = {entry['position_formula']}  t={entry['time']:g}"
+        if entry["formula"] == "velocity":
+            return f"#{row + 1}  v(t) = {entry['velocity_formula']}  t={entry['time']:g}"
+        return f"#{row + 1}  a = {entry['acceleration']:g}"
+
+    @profiler.traced("replay_history")
+    def replay_history(self, event=None):
+        # Vuelve a graficar una entrada guardada con las funciones cerradas, sin SymPy ni solve_entry
+        selection = self.history_list.curselection()
+        if not selection or self.history_table is None:
+            return
+        row = self.history_rows[selection[0]]
+        entry = self.history_table.entry(row)
+        x0, v0, a = self.history_table.parameters(row)
+        self.history_status.config(text=format_result(entry))
+
+        if entry["formula"] == "position":
+            self.plot_graph(
+                highlight_t=entry["time"],
+                t_range=self.sampler.auto_range(kinematics.key_times(x0, v0, a) + [entry["time"]]),
+                state=kinematics.state_function(x0, v0, a),
+            )
+        elif entry["formula"] == "velocity":
+            self.plot_graph(
+                None,
+                kinematics.velocity_function(v0, a),
+                highlight_t=entry["time"],
+                t_range=self.sampler.auto_range([kinematics.stop_time(v0, a), entry["time"]]),
+            )
 
-        elif self.selected_formula.get() == "acceleration":
-            tk.Label(self.inputs_frame, text="Aceleración constante (a):").pack(anchor="w")
-            tk.Entry(self.inputs_frame, textvariable=self.a).pack(anchor="w")
+    def ensure_plot(self):
+        # La figura se crea al terminar la precarga o en el primer gráfico
+        if self.plot is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+            self.figure = Figure(figsize=(5, 4), dpi=100)
+            self.ax = self.figure.add_subplot(111)
+            self.canvas = FigureCanvasTkAgg(self.figure, master=self.plot_frame)
+            self.canvas.get_tk_widget().pack()
+            # Artistas persistentes: cada gráfico nuevo solo actualiza sus datos
+            self.plot = IncrementalPlot(self.ax, self.canvas, **PLOT_STYLE)
+            # Barridos superpuestos: una LineCollection por barrido, con retención acotada
+            self.comparison = ComparisonPlot(self.plot)
+        return self.plot
+
+    def ensure_car(self):
+        # El auto es el primer ítem del simulador; las carreras agregan más carriles
+        if self.car is None:
+            self.fleet.show(1)
+            self.car = self.fleet.items[0]
+        return self.car
 
+    def update_inputs(self):
+        # Las filas se reutilizan: solo cambia cuáles se muestran
+        self.parameter_panel.show(self.selected_formula.get())
+
+    def read_inputs(self):
+        formula = self.selected_formula.get()
+
+        # Solo se leen las entradas visibles para la fórmula seleccionada
+        inputs = {"x0": self.x0, "v0": self.v0, "a": self.a, "time": self.time}
+        values = {field: inputs[field].get() for field in REQUIRED_FIELDS[formula]}
+        return (
+            formula,
+            values.get("x0", 0.0),
+            values.get("v0", 0.0),
+            values.get("a", 0.0),
+            values.get("time", 0.0),
+        )
+
+    @profiler.traced("calculate")
     def calculate(self):
         try:
-            result_entry = {}
-
-            if self.selected_formula.get() == "position":
-                x0 = self.x0.get()
-                v0 = self.v0.get()
-                a = self.a.get()
-                t_val = self.time.get()
-
-                position_eq = x0 + v0 * t + 0.5 * a * t**2
-                velocity_eq = diff(position_eq, t)
-
-                position_func = lambdify(t, position_eq)
-                velocity_func = lambdify(t, velocity_eq)
+            formula, x0, v0, a, t_val = self.read_inputs()
+
+            # El cálculo y el muestreo del gráfico se hacen en segundo plano
+            self.runner.submit(
+                "calculate",
+                self.compute,
+                self.show_result,
+                lambda e: messagebox.showerror("Error", f"Entrada no válida: {e}"),
+                formula, x0, v0, a, t_val,
+            )
 
-                pos = position_func(t_val)
-                vel = velocity_func(t_val)
+        except Exception as e:
+            messagebox.showerror("Error", f"Entrada no válida: {e}")
 
-                result_text = (
-                    f"Fórmula de posición: s(t) = {position_eq}\n"
-                    f"Fórmula de velocidad: v(t) = {velocity_eq}\n"
-                    f"\nResultados:\n"
-                    f"Posición en t={t_val}: {pos:.2f} m\n"
-                    f"Velocidad en t={t_val}: {vel:.2f} m/s\n"
-                )
+    @profiler.traced("compute")
+    def compute(self, formula, x0, v0, a, t_val):
+        result_entry, result_text = solve_entry(formula, x0, v0, a, t_val)
+        return result_entry, result_text, self.prepare_formula_plot(formula, x0, v0, a, t_val)
+
+    def prepare_formula_plot(self, formula, x0, v0, a, t_val):
+        if formula == "position":
+            return self.prepare_plot(
+                highlight_t=t_val,
+                t_range=self.sampler.auto_range(kinematics.key_times(x0, v0, a) + [t_val]),
+                state=kinematics.state_function(x0, v0, a),
+            )
+        if formula == "velocity":
+            return self.prepare_plot(
+                None,
+                kinematics.velocity_function(v0, a),
+                highlight_t=t_val,
+                t_range=self.sampler.auto_range([kinematics.stop_time(v0, a), t_val]),
+            )
+        return None
 
-                result_entry = {
-                    "formula": "position",
-                    "position_formula": str(position_eq),
-                    "velocity_formula": str(velocity_eq),
-                    "time": t_val,
-                    "position": pos,
-                    "velocity": vel
-                }
+    def show_result(self, result):
+        # De vuelta en el hilo de Tk
+        result_entry, result_text, plot_data = result
 
-                messagebox.showinfo("Resultados", result_text)
+        messagebox.showinfo("Resultados", result_text)
 
-                self.plot_graph(position_eq, velocity_eq, highlight_t=t_val)
+        if plot_data is not None:
+            self.draw_plot(plot_data)
 
-            elif self.selected_formula.get() == "velocity":
-                v0 = self.v0.get()
-                a = self.a.get()
-                t_val = self.time.get()
+        self.save_history(result_entry)
 
-                velocity_eq = v0 + a * t
-                velocity_func = lambdify(t, velocity_eq)
+    def add_sweep(self):
+        try:
+            formula, x0, v0, a, t_val = self.read_inputs()
+            if formula == "acceleration":
+                raise ValueError("El barrido requiere la fórmula de posición o de velocidad")
+            parameter = self.sweep_parameter.get()
+            center = v0 if parameter == "v0" else a
+            spread = abs(self.sweep_spread.get())
+            count = self.sweep_count.get()
+            if not 2 <= count <= MAX_SWEEP_TRAJECTORIES:
+                raise ValueError(f"Las trayectorias deben estar entre 2 y {MAX_SWEEP_TRAJECTORIES}")
+
+            # Todas las trayectorias se calculan juntas en segundo plano
+            self.runner.submit(
+                "sweep",
+                self.compute_sweep,
+                self.show_sweep,
+                lambda e: messagebox.showerror("Error", f"No se pudo calcular el barrido: {e}"),
+                formula, x0, v0, a, parameter, center - spread, center + spread, count,
+            )
 
-                vel = velocity_func(t_val)
+        except Exception as e:
+            messagebox.showerror("Error", f"Entrada no válida: {e}")
 
-                result_text = (
-                    f"Fórmula de velocidad: v(t) = {velocity_eq}\n"
-                    f"\nResultados:\n"
-                    f"Velocidad en t={t_val}: {vel:.2f} m/s\n"
-                )
+    def compute_sweep(self, formula, x0, v0, a, parameter, low, high, count):
+        values = np.linspace(low, high, count)
+        t_vals = np.linspace(self.sampler.t_start, self.sampler.t_end, SWEEP_SAMPLES)
+        with span("barrido", trajectories=count):
+            trajectories = kinematics.sweep(formula, x0, v0, a, parameter, values, t_vals)
+        label = f"{parameter} en [{low:g}, {high:g}] ({count} trayectorias)"
+        return t_vals, trajectories, values, label
 
-                result_entry = {
-                    "formula": "velocity",
-                    "velocity_formula": str(velocity_eq),
-                    "time": t_val,
-                    "velocity": vel
-                }
+    def show_sweep(self, sweep):
+        try:
+            self.ensure_plot()
+            self.comparison.add(*sweep)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo generar el gráfico: {e}")
 
-                messagebox.showinfo("Resultados", result_text)
+    @profiler.traced("race_sweep")
+    def race_sweep(self):
+        try:
+            formula, x0, v0, a, t_val = self.read_inputs()
+            if formula != "position":
+                raise ValueError("La carrera requiere la fórmula de posición")
+            parameter = self.sweep_parameter.get()
+            center = v0 if parameter == "v0" else a
+            spread = abs(self.sweep_spread.get())
+            count = min(self.sweep_count.get(), MAX_RACERS)
+            if count < 2:
+                raise ValueError("La carrera necesita al menos 2 trayectorias")
+            values = np.linspace(center - spread, center + spread, count)
+            duration = t_val if t_val > 0 else self.sampler.t_end
+
+            self.ensure_car()
+            self.fleet.show(count)
+            # Posiciones de todos los autos en todos los cuadros en una sola operación: (cuadros, autos)
+            self.fleet.start(
+                lambda times: kinematics.sweep("position", x0, v0, a, parameter, values, times).T,
+                duration,
+                on_finish=self.report_race,
+            )
 
-                self.plot_graph(None, velocity_eq, highlight_t=t_val)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo iniciar la carrera: {e}")
 
-            elif self.selected_formula.get() == "acceleration":
-                a = self.a.get()
+    def report_race(self, animation):
+        updates = animation.item_updates / max(animation.frames_drawn, 1)
+        self.fps_label.config(
+            text=f"FPS: {animation.achieved_fps():.1f} ({animation.frames_dropped} cuadros descartados, "
+                 f"{updates:.1f} autos movidos por cuadro)"
+        )
 
-                result_text = f"La aceleración es constante y su valor es: {a:.2f} m/s²"
+    def open_trajectories(self):
+        try:
+            file_path = filedialog.askopenfilename(
+                filetypes=[("Trayectorias", "*.mrtj"), ("All files", "*.*")]
+            )
+            if file_path:
+                # Solo se lee el encabezado; los datos quedan mapeados en disco
+                trajectories = TrajectoryFile.open(file_path)
+                self.trajectory_file = trajectories
+                self.trajectory_index.set(0)
+                self.trajectory_spinbox.config(to=trajectories.trajectories - 1)
+                self.trajectory_label.config(
+                    text=f"{trajectories.trajectories} trayectorias × {trajectories.samples} muestras "
+                         f"({trajectories.nbytes / 1e6:.1f} MB)"
+                )
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo abrir el archivo de trayectorias: {e}")
+
+    def selected_trajectory(self):
+        if self.trajectory_file is None:
+            raise ValueError("Primero abra un archivo de trayectorias")
+        index = self.trajectory_index.get()
+        if not 0 <= index < self.trajectory_file.trajectories:
+            raise ValueError(f"La trayectoria debe estar entre 0 y {self.trajectory_file.trajectories - 1}")
+        return index
+
+    @profiler.traced("plot_trajectory")
+    def plot_trajectory(self):
+        try:
+            index = self.selected_trajectory()
+            trajectories = self.trajectory_file
+            self.trajectory_label.config(text=trajectories.describe(index))
+            self.plot_graph(
+                trajectories.curve(index, "position"),
+                trajectories.curve(index, "velocity"),
+                t_range=(float(trajectories.t[0]), float(trajectories.t[-1])),
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo graficar la trayectoria: {e}")
 
-                result_entry = {
-                    "formula": "acceleration",
-                    "acceleration": a
-                }
+    def animate_trajectories(self):
+        # La trayectoria elegida y las siguientes del archivo, una por carril
+        try:
+            index = self.selected_trajectory()
+            trajectories = self.trajectory_file
+            stop = min(index + MAX_RACERS, trajectories.trajectories)
+            t_start, t_end = float(trajectories.t[0]), float(trajectories.t[-1])
+
+            self.ensure_car()
+            self.fleet.show(stop - index)
+            self.fleet.start(
+                lambda times: trajectories.sample_rows(index, stop, times),
+                t_end - t_start,
+                t_start=t_start,
+                on_finish=self.report_race,
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo animar las trayectorias: {e}")
 
-                messagebox.showinfo("Resultados", result_text)
+    def clear_sweeps(self):
+        if self.plot is not None:
+            self.comparison.clear()
 
-            self.history.append(result_entry)
-            self.save_history()
+    def on_input_change(self, *args):
+        self.runner.cancel("calculate")
+        if self.live_mode.get():
+            self.live_throttle.trigger()
 
+    def live_update(self):
+        # Solo redibuja el gráfico, sin mensajes ni historial; las entradas incompletas se ignoran
+        try:
+            formula, x0, v0, a, t_val = self.read_inputs()
+        except tk.TclError:
+            return
+        if formula == "acceleration":
+            return
+
+        self.runner.submit(
+            "live", self.prepare_formula_plot, self.draw_plot, None, formula, x0, v0, a, t_val
+        )
+
+    @profiler.traced("plot_graph")
+    def plot_graph(self, position_eq=None, velocity_eq=None, highlight_t=None, t_range=None, state=None):
+        try:
+            self.draw_plot(self.prepare_plot(position_eq, velocity_eq, highlight_t, t_range, state))
         except Exception as e:
-            messagebox.showerror("Error", f"Entrada no válida: {e}")
+            messagebox.showerror("Error", f"No se pudo generar el gráfico: {e}")
 
-    def plot_graph(self, position_eq=None, velocity_eq=None, highlight_t=None):
+    @profiler.traced("prepare_plot")
+    def prepare_plot(self, position_eq=None, velocity_eq=None, highlight_t=None, t_range=None, state=None):
+        # Parte numérica del gráfico: se puede ejecutar fuera del hilo de Tk
+        plot_data = {"highlight_t": highlight_t}
+        if state is not None:
+            return self.prepare_state_plot(plot_data, as_state(state), highlight_t, t_range)
+        position_func = as_numeric(position_eq) if position_eq else None
+        velocity_func = as_numeric(velocity_eq) if velocity_eq else None
+
+        # Malla común refinada solo donde las curvas lo necesitan
+        plot_data["t"], (plot_data["position"], plot_data["velocity"]) = self.sampler.sample_curves(
+            [position_func, velocity_func], t_range
+        )
+
+        if highlight_t is not None:
+            if position_func is not None:
+                plot_data["position_highlight"] = float(position_func(highlight_t))
+            if velocity_func is not None:
+                plot_data["velocity_highlight"] = float(velocity_func(highlight_t))
+
+        return plot_data
+
+    def prepare_state_plot(self, plot_data, state, highlight_t=None, t_range=None):
+        # Núcleo fusionado: s, v y a salen de una sola evaluación por malla
+        plot_data["t"], (plot_data["position"], plot_data["velocity"]) = self.sampler.sample_state(state, t_range)
+        if highlight_t is not None:
+            position, velocity, _ = state(highlight_t)
+            plot_data["position_highlight"] = float(position)
+            plot_data["velocity_highlight"] = float(velocity)
+        return plot_data
+
+    @profiler.traced("draw_plot")
+    def draw_plot(self, plot_data):
         try:
-            self.ax.clear()
-
-            # Graficar la ecuación de posición
-            if position_eq:
-                position_func = lambdify(t, position_eq)
-                t_vals = [i * 0.1 for i in range(0, 101)]
-                position_vals = [position_func(i) for i in t_vals]
-                self.ax.plot(t_vals, position_vals, label="s(t): Posición", color="blue")
-
-            # Graficar la ecuación de velocidad
-            if velocity_eq:
-                velocity_func = lambdify(t, velocity_eq)
-                t_vals = [i * 0.1 for i in range(0, 101)]
-                velocity_vals = [velocity_func(i) for i in t_vals]
-                self.ax.plot(t_vals, velocity_vals, label="v(t): Velocidad", color="green")
-
-            # Destacar un punto específico en los gráficos
-            if highlight_t is not None:
-                if position_eq:
-                    position_at_t = lambdify(t, position_eq)(highlight_t)
-                    self.ax.scatter(highlight_t, position_at_t, color="blue", label=f"s({highlight_t:.1f})")
-                if velocity_eq:
-                    velocity_at_t = lambdify(t, velocity_eq)(highlight_t)
-                    self.ax.scatter(highlight_t, velocity_at_t, color="green", label=f"v({highlight_t:.1f})")
-
-            # Configuración del gráfico
-            self.ax.axhline(0, color='black', linewidth=0.5, linestyle="--")
-            self.ax.axvline(0, color='black', linewidth=0.5, linestyle="--")
-            self.ax.set_title("Gráfico MRUV")
-            self.ax.set_xlabel("Tiempo (s)")
-            self.ax.set_ylabel("Valor")
-            self.ax.legend()
-            self.ax.grid(True)
-
-            # Dibujar el gráfico
-            self.canvas.draw()
-
+            self.ensure_plot().update(plot_data)
+            self.last_plot_data = plot_data
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo generar el gráfico: {e}")
 
+    def run_export(self, job, success_message, *args):
+        # Una exportación a la vez; el avance se muestra en la barra de progreso
+        if self.export_panel.active:
+            messagebox.showinfo("Exportación en curso", "Espere a que termine la exportación actual o cancélela.")
+            return
+        progress = ExportProgress()
+        self.export_panel.start(progress)
+        self.export_runner.submit(
+            "export",
+            job,
+            lambda result: self.finish_export(success_message.format(result)),
+            self.export_failed,
+            *args,
+            progress,
+        )
+
+    def finish_export(self, message):
+        self.export_panel.finish()
+        messagebox.showinfo("Exportación exitosa", message)
+
+    def export_failed(self, error):
+        self.export_panel.finish()
+        if isinstance(error, ExportCancelled):
+            messagebox.showinfo("Exportación cancelada", "La exportación se canceló.")
+        else:
+            messagebox.showerror("Error", f"No se pudo exportar: {error}")
 
     def export_graph(self):
         try:
+            if self.last_plot_data is None:
+                raise ValueError("Todavía no hay un gráfico para exportar")
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".png",
-                filetypes=[("PNG files", "*.png"), ("All files", "*.*")]
+                filetypes=[("PNG files", "*.png"), ("SVG files", "*.svg"), ("PDF files", "*.pdf"), ("All files", "*.*")]
             )
             if file_path:
-                self.figure.savefig(file_path)
-                messagebox.showinfo("Exportación exitosa", "El gráfico se ha exportado correctamente.")
+                # La figura se vuelve a generar con Agg en el trabajador, con los barridos incluidos
+                self.run_export(
+                    exporting.export_graph,
+                    "El gráfico se ha exportado correctamente.",
+                    self.last_plot_data, file_path, PLOT_STYLE, self.comparison.snapshot(),
+                )
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo exportar el gráfico: {e}")
 
-
     def export_history(self):
         try:
             file_path = filedialog.asksaveasfilename(
@@ -247,25 +666,67 @@ class MRUVApp:
                 filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
             )
             if file_path:
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    json.dump(self.history, file, ensure_ascii=False, indent=4)
-                messagebox.showinfo("Exportación exitosa", "El historial se ha exportado correctamente.")
+                self.run_export(
+                    self.history.export,
+                    "El historial se ha exportado correctamente ({} entradas).",
+                    file_path,
+                )
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo exportar el historial: {e}")
 
+    def export_history_figures(self):
+        try:
+            directory = filedialog.askdirectory(title="Carpeta para los gráficos del historial")
+            if directory:
+                self.run_export(
+                    exporting.export_history_figures,
+                    "Se exportaron {} gráficos.",
+                    self.history, directory, [self.figure_format.get()],
+                    (self.sampler.t_start, self.sampler.t_end), PLOT_STYLE,
+                )
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo exportar los gráficos: {e}")
 
-    def save_history(self):
+
+    @profiler.traced("save_history")
+    def save_history(self, entry):
         try:
-            with open("history.json", "w", encoding="utf-8") as file:
-                json.dump(self.history, file, ensure_ascii=False, indent=4)
+            offset = self.history.append(entry)
+            if self.history_table is None:
+                self.pending_history.append((entry, offset))
+            else:
+                self.history_table.append(entry, offset)
+                self.history_status.config(text=f"{len(self.history_table)} entradas")
+                self.refresh_history_list()
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo guardar el historial: {e}")
 
+    def show_history_summary(self):
+        if self.history_table is None:
+            messagebox.showinfo("Historial", "El historial todavía se está cargando.")
+            return
+
+        table = self.history_table
+        lines = [f"Entradas: {len(table)} ({table.nbytes() / 1024:.1f} KB en memoria)"]
+        for formula, count in table.counts().items():
+            lines.append(f"{formula}: {count}")
+        for name in ("time", "position", "velocity", "acceleration"):
+            stats = table.summary(name)
+            if stats["count"]:
+                lines.append(
+                    f"{name}: mín {stats['min']:.2f}, máx {stats['max']:.2f}, media {stats['mean']:.2f}"
+                )
+        messagebox.showinfo("Resumen del historial", "\n".join(lines))
+
 
 if __name__ == "__main__":
+    startup = StartupReport()
     root = tk.Tk()
-    app = MRUVApp(root)
+    app = MRUVApp(root, startup)
     root.mainloop()
+    # Con "--trace archivo.json" se guarda la sesión en formato Chrome trace
+    if trace_path(sys.argv):
+        profiler.dump_chrome_trace(trace_path(sys.argv))
 
 
 
@@ -0,0 +1,185 @@
+import numpy as np
+from instrumentation import span
+
+# Límites del número de muestras por gráfico
+MIN_SAMPLES = 10_000
+MAX_SAMPLES = 1_000_000
+DEFAULT_SAMPLES = 10_000
+
+# Muestreo adaptativo: se parte de una malla gruesa y se subdividen solo los tramos
+# donde la recta entre dos muestras se aleja de la curva más que la tolerancia
+INITIAL_SAMPLES = 33
+DEFAULT_TOLERANCE = 1e-3    # Fracción del rango vertical (≈ medio píxel en un gráfico de 400 px)
+MIN_STEP = 1e-9             # Ancho mínimo de un tramo, relativo al rango de tiempo
+AUTO_PADDING = 0.2          # Margen tras el último instante notable al elegir el rango
+MAX_RANGE_FACTOR = 10       # El rango automático no supera 10 veces el configurado
+
+
+def as_numeric(expr):
+    # Las funciones ya vectorizadas se usan tal cual; las expresiones de SymPy se
+    # compilan a través de la caché (SymPy solo se importa si hace falta)
+    if callable(expr) and not type(expr).__module__.startswith("sympy"):
+        return expr
+    from expr_cache import expression_cache
+
+    return expression_cache.get(expr).func
+
+
+def as_state(expr):
+    # Núcleo fusionado t -> (s, v, a) para una posición: las funciones se usan tal cual y
+    # las expresiones de SymPy se compilan una vez con eliminación de subexpresiones comunes
+    if callable(expr) and not type(expr).__module__.startswith("sympy"):
+        return expr
+    from expr_cache import expression_cache
+
+    return expression_cache.get(expr).state
+
+
+def _span(values):
+    finite = values[np.isfinite(values)]
+    return float(finite.max() - finite.min()) if finite.size else 0.0
+
+
+def adaptive_sample(funcs, t_start, t_end, tolerance=DEFAULT_TOLERANCE,
+                    initial=INITIAL_SAMPLES, max_samples=MAX_SAMPLES):
+    # Malla común para varias curvas: un tramo se divide si en alguna de ellas el punto medio
+    # se separa de la interpolación lineal más que tolerance · (rango vertical de esa curva).
+    # Cada ronda evalúa solo los puntos medios de los tramos pendientes, de forma vectorizada.
+    # funcs puede ser una lista de funciones o un núcleo fusionado que devuelve todas las curvas.
+    if callable(funcs):
+        evaluate = funcs
+    else:
+        evaluate = lambda values: [func(values) for func in funcs]
+    t_vals = np.linspace(t_start, t_end, initial)
+    values = [np.asarray(curve, dtype=float) for curve in evaluate(t_vals)]
+    scales = [_span(curve) for curve in values]
+    min_width = MIN_STEP * (t_end - t_start)
+
+    chunks_t = [t_vals]
+    chunks_values = [[curve] for curve in values]
+    total = t_vals.size
+    lefts, rights = t_vals[:-1], t_vals[1:]
+    left_values = [curve[:-1] for curve in values]
+    right_values = [curve[1:] for curve in values]
+
+    while lefts.size and total + lefts.size <= max_samples:
+        mids = 0.5 * (lefts + rights)
+        refine = np.zeros(mids.size, dtype=bool)
+        mid_values = []
+        for index, curve in enumerate(evaluate(mids)):
+            curve = np.asarray(curve, dtype=float)
+            mid_values.append(curve)
+            chunks_values[index].append(curve)
+            scales[index] = max(scales[index], _span(curve))
+            error = np.abs(curve - 0.5 * (left_values[index] + right_values[index]))
+            # Los valores no finitos (NaN, ±inf) también se refinan
+            refine |= ~(error <= tolerance * scales[index])
+        chunks_t.append(mids)
+        total += mids.size
+
+        refine &= (rights - lefts) > 2 * min_width
+        lefts, rights = (
+            np.concatenate((lefts[refine], mids[refine])),
+            np.concatenate((mids[refine], rights[refine])),
+        )
+        left_values = [
+            np.concatenate((left[refine], mid[refine]))
+            for left, mid in zip(left_values, mid_values)
+        ]
+        right_values = [
+            np.concatenate((mid[refine], right[refine]))
+            for mid, right in zip(mid_values, right_values)
+        ]
+
+    t_vals = np.concatenate(chunks_t)
+    order = np.argsort(t_vals, kind="stable")
+    return t_vals[order], [np.concatenate(chunks)[order] for chunks in chunks_values]
+
+
+class SamplingEngine:
+    def __init__(self, t_start=0.0, t_end=5.0, samples=DEFAULT_SAMPLES,
+                 adaptive=False, tolerance=DEFAULT_TOLERANCE):
+        self.t_start = float(t_start)
+        self.t_end = float(t_end)
+        self.samples = int(samples)
+        # En modo adaptativo "samples" es el máximo de puntos por gráfico
+        self.adaptive = adaptive
+        self.tolerance = float(tolerance)
+        self._grid = None
+        self.configure()
+
+    def configure(self, t_start=None, t_end=None, samples=None):
+        t_start = self.t_start if t_start is None else float(t_start)
+        t_end = self.t_end if t_end is None else float(t_end)
+        samples = self.samples if samples is None else int(samples)
+
+        if t_end <= t_start:
+            raise ValueError("El tiempo final debe ser mayor que el inicial")
+        if not MIN_SAMPLES <= samples <= MAX_SAMPLES:
+            raise ValueError(f"El número de muestras debe estar entre {MIN_SAMPLES} y {MAX_SAMPLES}")
+
+        self.t_start = t_start
+        self.t_end = t_end
+        self.samples = samples
+        self._grid = None
+
+    def time_grid(self):
+        # La malla de tiempo se genera una vez por configuración
+        if self._grid is None:
+            self._grid = np.linspace(self.t_start, self.t_end, self.samples)
+        return self._grid
+
+    def sample(self, func):
+        t_vals = self.time_grid()
+        with span("muestreo", samples=len(t_vals)):
+            return t_vals, func(t_vals)
+
+    def auto_range(self, times):
+        # Rango de tiempo que incluye los instantes notables (raíces, extremos, t pedido)
+        later = [float(value) for value in times
+                 if value is not None and np.isfinite(value) and value > self.t_start]
+        duration = self.t_end - self.t_start
+        if later:
+            duration = max(duration, (max(later) - self.t_start) * (1 + AUTO_PADDING))
+        duration = min(duration, MAX_RANGE_FACTOR * (self.t_end - self.t_start))
+        return self.t_start, self.t_start + duration
+
+    def sample_curves(self, funcs, t_range=None):
+        # Varias curvas sobre una misma malla; las entradas None se devuelven como None
+        t_start, t_end = t_range or (self.t_start, self.t_end)
+        active = [func for func in funcs if func is not None]
+        if not active:
+            return None, [None] * len(funcs)
+
+        if self.adaptive:
+            with span("muestreo.adaptativo"):
+                t_vals, values = adaptive_sample(
+                    active, t_start, t_end, self.tolerance, max_samples=self.samples
+                )
+        else:
+            if (t_start, t_end) == (self.t_start, self.t_end):
+                t_vals = self.time_grid()
+            else:
+                t_vals = np.linspace(t_start, t_end, self.samples)
+            with span("muestreo", samples=len(t_vals)):
+                values = [func(t_vals) for func in active]
+
+        results = iter(values)
+        return t_vals, [None if func is None else next(results) for func in funcs]
+
+    def sample_state(self, state, t_range=None, outputs=2):
+        # Curvas de un núcleo fusionado (s, v, a) en una sola evaluación por malla;
+        # solo las primeras "outputs" se devuelven y deciden el refinamiento
+        t_start, t_end = t_range or (self.t_start, self.t_end)
+        kernel = lambda values: tuple(state(values))[:outputs]
+
+        if self.adaptive:
+            with span("muestreo.adaptativo", fused=True):
+                return adaptive_sample(kernel, t_start, t_end, self.tolerance, max_samples=self.samples)
+
+        if (t_start, t_end) == (self.t_start, self.t_end):
+            t_vals = self.time_grid()
+        else:
+            t_vals = np.linspace(t_start, t_end, self.samples)
+        with span("muestreo", samples=len(t_vals), fused=True):
+            return t_vals, list(kernel(t_vals))
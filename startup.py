@@ -0,0 +1,45 @@
+import importlib
+import sys
+import time
+
+# Módulos pesados que se cargan después de mostrar la ventana
+HEAVY_MODULES = (
+    "sympy",
+    "expr_cache",
+    "matplotlib.figure",
+    "matplotlib.backends.backend_tkagg",
+    "PIL.Image",
+    "PIL.ImageTk",
+)
+
+
+def warm_up(modules=HEAVY_MODULES):
+    # Importa los módulos en segundo plano; devuelve el tiempo de cada uno
+    timings = {}
+    for name in modules:
+        started = time.perf_counter()
+        importlib.import_module(name)
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+class StartupReport:
+    # Marcas de tiempo del arranque, relativas a la creación del informe
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks = []
+        self.imports = {}
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter() - self.started))
+
+    def format(self):
+        lines = ["Tiempo de arranque:"]
+        lines += [f"  {name}: {seconds * 1000:.0f} ms" for name, seconds in self.marks]
+        if self.imports:
+            lines.append("  Precarga de módulos:")
+            lines += [f"    {name}: {seconds * 1000:.0f} ms" for name, seconds in self.imports.items()]
+        return "\n".join(lines)
+
+    def print(self, file=None):
+        print(self.format(), file=file or sys.stderr)
@@ -0,0 +1,259 @@
+import argparse
+import json
+import math
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout
+import numpy as np
+import problems
+import poly_roots
+import precision
+import kinematics
+
+# Un problema es un diccionario como:
+#   {"given": "position", "expression": "3*t**2 - 12*t + 20", "at": 3, "interval": [0, 4]}
+#   {"given": "velocity", "expression": "8*t - 16", "initial_position": 5}
+
+
+class TaskTimeout(Exception):
+    pass
+
+
+def solve_problem(problem):
+    # Resuelve un problema simbólico completo: derivadas, paradas, valores e intervalos
+    analysis = problems.analyze(problem)
+    stop_times = [value for _, value in analysis["stop_times"]]
+
+    result = {
+        "position_formula": str(analysis["position_eq"]),
+        "velocity_formula": str(analysis["velocity_eq"]),
+        "acceleration_formula": str(analysis["acceleration_eq"]),
+        "stop_times": stop_times,
+    }
+
+    if "at" in problem:
+        t_val = float(problem["at"])
+        result["position"] = float(analysis["position_func"](t_val))
+        result["velocity"] = float(analysis["velocity_func"](t_val))
+
+    if "interval" in problem:
+        t0, t1 = (float(value) for value in problem["interval"])
+        _, distances = problems.segments(analysis, t0, t1)
+        result["distance"] = float(distances.sum())
+
+    return result
+
+
+def _polynomial_text(coeffs):
+    # Mismo formato numérico que batch_solver (coeficientes float, de mayor a menor potencia)
+    return kinematics.format_polynomial(zip(coeffs.tolist(), range(len(coeffs) - 1, -1, -1)))
+
+
+def solve_numeric(problems_list):
+    # Problemas polinómicos resueltos en lote: paradas, valores y distancias de todos a la vez
+    # con poly_roots. SymPy solo lee la expresión; no hay diff, solve ni lambdify por problema.
+    # Los demás (o los que fallan al leerse) quedan en None para la vía simbólica.
+    results = [None] * len(problems_list)
+    indices, rows, times, intervals = [], [], [], []
+    for index, problem in enumerate(problems_list):
+        # Cualquier dato inválido (expresión, "at", "interval", "initial_position") deja el
+        # problema para la vía simbólica, que informa el error solo para ese problema
+        try:
+            given = problem.get("given", "position")
+            if given not in ("position", "velocity"):
+                continue
+            coeffs = poly_roots.coefficients(precision.parse(problem["expression"]))
+            if coeffs is None:
+                continue
+            if given == "velocity":
+                coeffs = poly_roots.antiderivative(coeffs, float(problem.get("initial_position", 0)))[0]
+            t_val = float(problem["at"]) if "at" in problem else np.nan
+            interval = (np.nan, np.nan)
+            if "interval" in problem:
+                t0, t1 = (float(value) for value in problem["interval"])
+                interval = (t0, t1)
+        except Exception:
+            continue
+        indices.append(index)
+        rows.append(coeffs)
+        times.append(t_val)
+        intervals.append(interval)
+    if not rows:
+        return results
+
+    coeffs = poly_roots.stack(rows)
+    velocity = poly_roots.derivative(coeffs)
+    acceleration = poly_roots.derivative(velocity)
+    stops = poly_roots.real_roots(velocity)
+    at = np.array(times)
+    positions = poly_roots.polyval(coeffs, np.nan_to_num(at))
+    velocities = poly_roots.polyval(velocity, np.nan_to_num(at))
+    intervals = np.array(intervals, dtype=float)
+    has_interval = ~np.isnan(intervals).any(axis=1)
+    distances = np.full(len(indices), np.nan)
+    if has_interval.any():
+        distances[has_interval] = poly_roots.total_distance(
+            coeffs[has_interval], intervals[has_interval, 0], intervals[has_interval, 1]
+        )
+
+    for row, index in enumerate(indices):
+        result = {
+            "position_formula": _polynomial_text(coeffs[row]),
+            "velocity_formula": _polynomial_text(velocity[row]),
+            "acceleration_formula": _polynomial_text(acceleration[row]),
+            "stop_times": [value for value in stops[row].tolist() if value == value],
+        }
+        if not np.isnan(at[row]):
+            result["position"] = float(positions[row])
+            result["velocity"] = float(velocities[row])
+        if has_interval[row]:
+            result["distance"] = float(distances[row])
+        results[index] = {"ok": True, "result": result}
+    return results
+
+
+def _on_alarm(signum, frame):
+    raise TaskTimeout()
+
+
+def _solve_chunk(problems, timeout):
+    # Se ejecuta en el proceso trabajador; el límite por tarea usa SIGALRM donde existe
+    use_alarm = timeout is not None and hasattr(signal, "setitimer")
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+
+    results = []
+    try:
+        for problem in problems:
+            try:
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, timeout)
+                results.append({"ok": True, "result": solve_problem(problem)})
+            except TaskTimeout:
+                results.append({"ok": False, "error": f"Tiempo límite de {timeout} s excedido"})
+            except Exception as e:
+                results.append({"ok": False, "error": str(e)})
+            finally:
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+    finally:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous)
+    return results
+
+
+class SymbolicPool:
+    # Reparte problemas simbólicos entre procesos y devuelve los resultados en orden
+    def __init__(self, max_workers=None, chunksize=None, timeout=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.timeout = timeout
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _chunks(self, problems):
+        chunksize = self.chunksize or max(1, math.ceil(len(problems) / (self.max_workers * 4)))
+        return [problems[i:i + chunksize] for i in range(0, len(problems), chunksize)]
+
+    def solve(self, problems):
+        problems = list(problems)
+        if not problems:
+            return []
+
+        # Sin límite de tiempo se reparte por tramos; con límite, cada problema es su propia
+        # tarea y un tiempo excedido afecta solo a ese problema
+        chunks = self._chunks(problems) if self.timeout is None else [[problem] for problem in problems]
+        results = [None] * len(chunks)
+        pending = list(range(len(chunks)))
+        while pending:
+            executor = self._get_executor()
+            futures = {index: executor.submit(_solve_chunk, chunks[index], self.timeout) for index in pending}
+            pending = []
+            for index, future in futures.items():
+                # Margen de seguridad por si el trabajador no puede usar SIGALRM
+                wait = None if self.timeout is None else self.timeout * len(chunks[index]) + 5
+                try:
+                    results[index] = future.result(timeout=wait)
+                except FuturesTimeout:
+                    results[index] = [{"ok": False, "error": "Tiempo límite excedido"} for _ in chunks[index]]
+                    # Lo que ya terminó se conserva; cancel() no detiene un trabajador colgado,
+                    # así que se recicla el pool y el resto se vuelve a enviar
+                    for other, other_future in futures.items():
+                        if results[other] is None and other_future.done():
+                            results[other] = self._collect(other_future, chunks[other])
+                    pending = [other for other in futures if results[other] is None]
+                    self._recycle()
+                    break
+                except Exception as e:
+                    results[index] = [{"ok": False, "error": str(e)} for _ in chunks[index]]
+        return [result for chunk_results in results for result in chunk_results]
+
+    def _collect(self, future, chunk):
+        try:
+            return future.result()
+        except Exception as e:
+            return [{"ok": False, "error": str(e)} for _ in chunk]
+
+    def _recycle(self):
+        # Termina los procesos del pool (incluido el colgado); el próximo envío crea otro
+        executor, self._executor = self._executor, None
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolución simbólica de problemas en paralelo")
+    parser.add_argument("input", help="Archivo JSONL con un problema por línea")
+    parser.add_argument("output", help="Archivo JSONL de resultados, en el mismo orden")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None, help="Segundos máximos por problema")
+    parser.add_argument(
+        "--numeric", action="store_true",
+        help="Resolver en lote y sin sympy.solve los problemas polinómicos; el resto usa los procesos",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.input, "r", encoding="utf-8") as file:
+            problems = [json.loads(line) for line in file if line.strip()]
+
+        results = solve_numeric(problems) if args.numeric else [None] * len(problems)
+        pending = [index for index, result in enumerate(results) if result is None]
+        if pending:
+            with SymbolicPool(args.workers, args.chunksize, args.timeout) as pool:
+                for index, result in zip(pending, pool.solve([problems[index] for index in pending])):
+                    results[index] = result
+
+        with open(args.output, "w", encoding="utf-8") as file:
+            for result in results:
+                file.write(json.dumps(result, ensure_ascii=False) + "\n")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    failed = sum(1 for result in results if not result["ok"])
+    print(f"{len(results)} problemas resueltos ({failed} con error) -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
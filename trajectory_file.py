@@ -0,0 +1,181 @@
+import json
+import os
+import struct
+import numpy as np
+import kinematics
+from instrumentation import span
+
+# Archivo binario de trayectorias precalculadas, pensado para abrirse con np.memmap:
+#   MAGIC (8 bytes) | largo del encabezado (uint32) | encabezado JSON (relleno hasta ALIGNMENT)
+#   parámetros (trayectorias, 3) float64: x0, v0, a
+#   t (muestras,) float64: malla de tiempo común
+#   s, v, a (trayectorias, muestras) float64: una columna contigua por magnitud
+# Al abrirlo solo se leen el encabezado y las filas que se usan; el resto queda en disco.
+
+MAGIC = b"MRUVTRJ1"
+VERSION = 1
+ALIGNMENT = 64
+DTYPE = "<f8"
+EXTENSION = ".mrtj"
+PARAMETERS = ("x0", "v0", "a")
+COLUMNS = ("position", "velocity", "acceleration")
+DEFAULT_CHUNK = 10_000
+DEFAULT_SAMPLES = 1_000
+
+_PREFIX = struct.Struct("<8sI")
+
+
+def _layout(trajectories, samples, header_size):
+    # Desplazamiento y forma de cada bloque a partir del final del encabezado
+    itemsize = np.dtype(DTYPE).itemsize
+    offset = header_size
+    layout = {"parameters": (offset, (trajectories, len(PARAMETERS)))}
+    offset += trajectories * len(PARAMETERS) * itemsize
+    layout["t"] = (offset, (samples,))
+    offset += samples * itemsize
+    for name in COLUMNS:
+        layout[name] = (offset, (trajectories, samples))
+        offset += trajectories * samples * itemsize
+    return layout, offset
+
+
+def _encode_header(header):
+    text = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    size = _PREFIX.size + len(text)
+    padded = -(-size // ALIGNMENT) * ALIGNMENT
+    return _PREFIX.pack(MAGIC, len(text)) + text + b" " * (padded - size)
+
+
+class TrajectoryFile:
+    def __init__(self, path, header, header_size, mode):
+        self.path = path
+        self.header = header
+        self.metadata = header.get("metadata", {})
+        self.trajectories = header["trajectories"]
+        self.samples = header["samples"]
+        layout, self.nbytes = _layout(self.trajectories, self.samples, header_size)
+        for name, (offset, shape) in layout.items():
+            setattr(self, name, np.memmap(path, dtype=DTYPE, mode=mode, offset=offset, shape=shape))
+
+    @classmethod
+    def create(cls, path, t_vals, trajectories, metadata=None):
+        # Reserva el archivo completo; las trayectorias se escriben luego por tramos con write()
+        t_vals = np.asarray(t_vals, dtype=float)
+        if t_vals.ndim != 1 or t_vals.size < 2:
+            raise ValueError("La malla de tiempo debe tener al menos 2 muestras")
+        if trajectories < 1:
+            raise ValueError("El archivo debe tener al menos una trayectoria")
+        header = {
+            "version": VERSION,
+            "trajectories": int(trajectories),
+            "samples": int(t_vals.size),
+            "parameters": list(PARAMETERS),
+            "columns": list(COLUMNS),
+            "metadata": metadata or {},
+        }
+        encoded = _encode_header(header)
+        _, size = _layout(header["trajectories"], header["samples"], len(encoded))
+        with open(path, "wb") as file:
+            file.write(encoded)
+            file.truncate(size)
+        trajectory_file = cls(path, header, len(encoded), "r+")
+        trajectory_file.t[:] = t_vals
+        return trajectory_file
+
+    @classmethod
+    def open(cls, path, writable=False):
+        with open(path, "rb") as file:
+            magic, length = _PREFIX.unpack(file.read(_PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} no es un archivo de trayectorias")
+            header = json.loads(file.read(length).decode("utf-8"))
+        if header.get("version") != VERSION:
+            raise ValueError(f"Versión de archivo de trayectorias no soportada: {header.get('version')}")
+        header_size = -(-(_PREFIX.size + length) // ALIGNMENT) * ALIGNMENT
+        # Antes de mapear: np.memmap sobre un archivo corto falla con un mensaje poco útil
+        _, expected = _layout(header["trajectories"], header["samples"], header_size)
+        actual = os.path.getsize(path)
+        if actual < expected:
+            raise ValueError(f"{path} está incompleto ({actual} de {expected} bytes)")
+        return cls(path, header, header_size, "r+" if writable else "r")
+
+    def write(self, start, parameters, position, velocity, acceleration):
+        # Escribe las filas [start, start + n) directamente en el mapeo
+        stop = start + len(parameters)
+        self.parameters[start:stop] = parameters
+        self.position[start:stop] = position
+        self.velocity[start:stop] = velocity
+        self.acceleration[start:stop] = acceleration
+
+    def write_kinematics(self, start, x0, v0, a):
+        # Filas del MRUV calculadas sobre la malla del archivo, sin pasar por memoria intermedia completa
+        x0, v0, a = (np.asarray(value, dtype=float)[:, None] for value in (x0, v0, a))
+        t_vals = np.array(self.t)
+        self.write(
+            start,
+            np.column_stack((x0[:, 0], v0[:, 0], a[:, 0])),
+            kinematics.position(x0, v0, a, t_vals),
+            kinematics.velocity(v0, a, t_vals),
+            np.broadcast_to(a, (a.shape[0], t_vals.size)),
+        )
+
+    def flush(self):
+        for name in ("parameters", "t") + COLUMNS:
+            getattr(self, name).flush()
+
+    def rows(self, start=0, stop=None, step=1):
+        # Vista sin copia de un tramo de trayectorias: (t, s, v, a)
+        rows = slice(start, stop, step)
+        return self.t, self.position[rows], self.velocity[rows], self.acceleration[rows]
+
+    def curve(self, index, column="position"):
+        # Función vectorizada de una trayectoria (para plot_graph y la animación);
+        # solo se lee esa fila del archivo
+        values = np.array(getattr(self, column)[index])
+        t_vals = np.array(self.t)
+        return lambda times: np.interp(np.asarray(times, dtype=float), t_vals, values, left=np.nan, right=np.nan)
+
+    def sample_rows(self, start, stop, times, column="position"):
+        # Varias trayectorias en los instantes pedidos, con una sola interpolación vectorizada:
+        # arreglo (instantes, trayectorias); solo se leen las filas [start, stop)
+        t_vals = np.array(self.t)
+        times = np.clip(np.asarray(times, dtype=float), t_vals[0], t_vals[-1])
+        index = np.clip(np.searchsorted(t_vals, times, side="right") - 1, 0, t_vals.size - 2)
+        weight = (times - t_vals[index]) / (t_vals[index + 1] - t_vals[index])
+        block = np.array(getattr(self, column)[start:stop])
+        return (block[:, index] * (1 - weight) + block[:, index + 1] * weight).T
+
+    def describe(self, index):
+        x0, v0, a = self.parameters[index].tolist()
+        return f"#{index}: x0={x0:g}, v0={v0:g}, a={a:g}"
+
+
+def write_kinematics(path, x0, v0, a, t_vals, metadata=None, chunk=DEFAULT_CHUNK):
+    # Trayectorias del MRUV para cada terna (x0, v0, a), calculadas y escritas por tramos
+    x0, v0, a = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (x0, v0, a)))
+    x0, v0, a = x0.ravel(), v0.ravel(), a.ravel()
+    trajectory_file = TrajectoryFile.create(path, t_vals, x0.size, {"model": "constant", **(metadata or {})})
+    with span("trayectorias.escribir", trajectories=x0.size, samples=trajectory_file.samples):
+        for start in range(0, x0.size, chunk):
+            rows = slice(start, start + chunk)
+            trajectory_file.write_kinematics(start, x0[rows], v0[rows], a[rows])
+        trajectory_file.flush()
+    return trajectory_file
+
+
+def write_ode(path, trajectory, x0, v0, a, metadata=None):
+    # Resultado de ode.integrate (nodos comunes a todo el lote) en el mismo formato
+    shape = trajectory.positions.shape[1:]
+    x0, v0, a = (np.broadcast_to(np.asarray(value, dtype=float), shape).ravel() for value in (x0, v0, a))
+    trajectory_file = TrajectoryFile.create(path, trajectory.t, x0.size, {"method": trajectory.method, **(metadata or {})})
+    with span("trayectorias.escribir", trajectories=x0.size, samples=trajectory.t.size):
+        trajectory_file.write(
+            0,
+            np.column_stack((x0, v0, a)),
+            trajectory.positions.reshape(trajectory.t.size, -1).T,
+            trajectory.velocities.reshape(trajectory.t.size, -1).T,
+            trajectory.accelerations.reshape(trajectory.t.size, -1).T,
+        )
+        trajectory_file.flush()
+    return trajectory_file
+